@@ -0,0 +1,122 @@
+"""
+Benchmark of the image handoff to the shared OCR service: shared memory against pickling over the socket.
+
+Sends decoded images of several sizes to a process that receives them the way the OCR service does
+(without running OCR), and measures the round trip of each transport. Also checks that no shared
+memory segment is left behind.
+
+Usage:
+    python benchmarks/image_handoff.py
+    python benchmarks/image_handoff.py --repeat 50 --output results/image_handoff.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import multiprocessing
+from pathlib import Path
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claim_processing_pipeline.ocr_service import image_message, read_image_message
+
+# Decoded RGB images: phone photo after resizing, A4 scan at 150 dpi, A4 scan at 300 dpi
+IMAGE_SIZES = {
+    "1024x768": (768, 1024, 3),
+    "a4_150dpi": (1754, 1240, 3),
+    "a4_300dpi": (3508, 2480, 3),
+}
+
+TRANSPORTS = ["pickle", "shared_memory"]
+
+
+def _receiver(address: str):
+    """Receives images like the OCR service and replies with their shape."""
+    with Listener(address) as listener:
+        with listener.accept() as conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    return
+                conn.send(("ok", read_image_message(message).shape))
+
+
+def _shared_memory_segments() -> set[str]:
+    # POSIX shared memory segments are files in /dev/shm on Linux
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+def measure_handoff(conn, image: np.ndarray, transport: str, repeat: int) -> dict:
+    """
+    Hands an image over `repeat` times and returns the round trip latency statistics.
+    """
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with image_message(image, transport) as message:
+            conn.send(message)
+            status, shape = conn.recv()
+        latencies.append(time.perf_counter() - start)
+        assert status == "ok" and tuple(shape) == image.shape
+
+    latencies.sort()
+    return {
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000,
+        "mb_per_second": image.nbytes / 1e6 / statistics.mean(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare shared memory and pickle image handoff to the OCR service")
+    parser.add_argument("--repeat", type=int, default=20, help="Handoffs per image size and transport")
+    parser.add_argument("--output", type=Path, help="Save the measurements as JSON")
+    args = parser.parse_args()
+
+    address = os.path.join(tempfile.mkdtemp(), "handoff.sock")
+    receiver = multiprocessing.Process(target=_receiver, args=(address,), daemon=True)
+    receiver.start()
+    while not os.path.exists(address):
+        time.sleep(0.01)
+
+    segments_before = _shared_memory_segments()
+    results = {}
+    rng = np.random.default_rng(0)
+    with Client(address) as conn:
+        for size_name, shape in IMAGE_SIZES.items():
+            image = rng.integers(0, 256, size=shape, dtype=np.uint8)
+            results[size_name] = {"megabytes": image.nbytes / 1e6}
+            for transport in TRANSPORTS:
+                measure_handoff(conn, image, transport, 2)  # warm up
+                results[size_name][transport] = measure_handoff(conn, image, transport, args.repeat)
+
+            pickled, shared = results[size_name]["pickle"], results[size_name]["shared_memory"]
+            print(
+                f"{size_name:<10} {image.nbytes / 1e6:6.1f} MB   "
+                f"pickle {pickled['p50_ms']:7.2f} ms   shared_memory {shared['p50_ms']:7.2f} ms   "
+                f"speedup x{pickled['p50_ms'] / shared['p50_ms']:.1f}"
+            )
+    receiver.join(timeout=5)
+
+    leaked = _shared_memory_segments() - segments_before
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if leaked:
+        print(f"\nFAILED: shared memory segments left behind: {', '.join(sorted(leaked))}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
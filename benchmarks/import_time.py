@@ -0,0 +1,104 @@
+"""
+Import-time benchmark for the application entry points.
+
+Imports each entry point in a fresh interpreter with `python -X importtime` and fails if it
+takes longer than the budget or loads a heavy dependency (PaddleOCR, Paddle, OpenCV, numpy...)
+that should only be imported lazily, when an image is processed.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --max-seconds 1.0 --output results/import_time.json
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+ENTRY_POINTS = [
+    "claim_processing_pipeline.main",
+    "claim_processing_pipeline.worker",
+    "claim_processing_pipeline.pipeline",
+]
+
+# Dependencies that must not be imported when the application starts
+HEAVY_MODULES = {"paddleocr", "paddle", "paddlex", "cv2", "numpy", "PIL"}
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)$")
+
+
+def measure_import(module: str) -> dict:
+    """
+    Imports a module in a fresh interpreter and parses the `-X importtime` report.
+
+    Returns:
+        Total import time in seconds, the slowest top-level imports and the heavy modules loaded
+    """
+    # The fresh interpreter finds the package in src, like the scripts adding it to sys.path
+    python_path = os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": python_path},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            _, cumulative_us, name = match.groups()
+            imports.append((name, int(cumulative_us)))
+
+    total_us = next(cumulative for name, cumulative in imports if name == module)
+    # Cumulative times include nested imports, so a slow package shows up with its parents
+    slowest = sorted((item for item in imports if item[0] != module), key=lambda item: item[1], reverse=True)
+    return {
+        "seconds": total_us / 1e6,
+        "slowest_imports": {name: cumulative / 1e6 for name, cumulative in slowest[:10]},
+        "heavy_modules": sorted({name.split(".")[0] for name, _ in imports} & HEAVY_MODULES),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure and check the import time of the entry points")
+    parser.add_argument("--max-seconds", type=float, default=1.5, help="Import time budget per entry point")
+    parser.add_argument("--repeat", type=int, default=3, help="Imports per entry point; the fastest one is kept")
+    parser.add_argument("--output", type=Path, help="Save the measurements as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    failures = []
+    for module in ENTRY_POINTS:
+        runs = [measure_import(module) for _ in range(args.repeat)]
+        results[module] = min(runs, key=lambda run: run["seconds"])
+        measurement = results[module]
+
+        print(f"{module}: {measurement['seconds']:.3f}s")
+        for name, seconds in measurement["slowest_imports"].items():
+            print(f"    {name:<40} {seconds:.3f}s")
+
+        if measurement["seconds"] > args.max_seconds:
+            failures.append(f"{module} takes {measurement['seconds']:.3f}s to import (budget {args.max_seconds:.3f}s)")
+        if measurement["heavy_modules"]:
+            failures.append(f"{module} imports {', '.join(measurement['heavy_modules'])} at startup")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if failures:
+        print("\nFAILED:\n" + "\n".join(f"  - {failure}" for failure in failures))
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Open-loop HTTP load test of the claims API.
+
+Submits claims from a corpus (POST /claims/) and lists claims (GET /claims/) on an arrival schedule
+that does not wait for responses, like real clients: a Poisson process at a fixed rate, or steps of
+increasing rate to find the saturation point. Records latency percentiles, error and 429 rates per
+step, and samples /metrics/queue to see whether the backlog keeps growing.
+
+A step is saturated when more than 1% of its submissions are rejected with 429 or fail, or when the
+queue grows by more than a quarter of the claims it accepted. The saturation point is the rate of
+the first saturated step; the rate before it is the sustainable one.
+
+Run it against a local instance answering LLM calls from recordings, so no GPU is needed:
+
+    LLM_MODE=replay CLAIM_WORKERS=4 pdm run app
+    python benchmarks/load_test.py --mode step --start-rate 10 --step-rate 10 --steps 6 --step-seconds 60
+
+Usage:
+    python benchmarks/load_test.py --mode poisson --rate 30 --duration 120 --list-rate 60
+    python benchmarks/load_test.py --mode step --start-rate 10 --step-rate 10 --steps 5 --output results/load_test.json
+"""
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Awaitable
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claim_processing_pipeline.stats import percentile
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+MIME_TYPES = {".md": "text/markdown", ".txt": "text/plain", ".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".webp": "image/webp"}
+
+# Saturation thresholds of a step
+MAX_REJECTED_SHARE = 0.01
+MAX_BACKLOG_GROWTH_SHARE = 0.25
+
+
+def load_corpus(claims_dir: Path) -> list[tuple[str, list[tuple[str, bytes, str]]]]:
+    """Returns the description and documents (name, content, MIME type) of each claim of the corpus."""
+    corpus = []
+    for claim_dir in sorted(d for d in claims_dir.iterdir() if d.is_dir() and d.name.startswith("claim")):
+        description_file = claim_dir / "description.txt"
+        if not description_file.exists():
+            continue
+        documents = [
+            (file.name, file.read_bytes(), MIME_TYPES[file.suffix.lower()])
+            for file in sorted(claim_dir.iterdir())
+            if file.suffix.lower() in MIME_TYPES and file.name != "description.txt"
+        ]
+        corpus.append((description_file.read_text(encoding="utf-8"), documents))
+    return corpus
+
+
+def arrival_times(rate_per_minute: float, start: float, duration: float, rng: random.Random) -> list[float]:
+    """Poisson arrivals: exponential gaps between requests, at the given average rate."""
+    times = []
+    if rate_per_minute <= 0:
+        return times
+    t = start + rng.expovariate(rate_per_minute / 60)
+    while t < start + duration:
+        times.append(t)
+        t += rng.expovariate(rate_per_minute / 60)
+    return times
+
+
+def percentiles(values: list[float]) -> dict:
+    """Nearest-rank p50/p95/p99 of the values."""
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    values = sorted(values)
+    return {"p50": percentile(values, 0.50), "p95": percentile(values, 0.95), "p99": percentile(values, 0.99)}
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, corpus: list, unique: bool, client_id: str):
+        self.client = client
+        self.corpus = corpus
+        self.unique = unique
+        self.client_id = client_id
+        self.run_id = uuid.uuid4().hex[:8]
+        self.requests: list[dict] = []
+        self.queue_samples: list[dict] = []
+        self._submitted = 0
+        self._in_flight = 0
+
+    async def _record(self, kind: str, step: int, send: Awaitable[httpx.Response]):
+        start = time.perf_counter()
+        self._in_flight += 1
+        record = {"kind": kind, "step": step, "sent_at": time.monotonic(), "in_flight": self._in_flight}
+        try:
+            response = await send
+            record["status"] = response.status_code
+        except httpx.HTTPError as e:
+            record["status"] = None
+            record["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            self._in_flight -= 1
+        record["latency"] = time.perf_counter() - start
+        self.requests.append(record)
+
+    async def submit(self, step: int):
+        description, documents = self.corpus[self._submitted % len(self.corpus)]
+        self._submitted += 1
+        # A unique metadata line keeps the API from answering with an earlier identical claim
+        metadata = f"load test {self.run_id} #{self._submitted}" if self.unique else None
+        await self._record("submit", step, self.client.post(
+            "/claims/",
+            data={"description": description, **({"metadata": metadata} if metadata else {})},
+            files=[("files", document) for document in documents],
+            headers={"X-Client-Id": self.client_id},
+        ))
+
+    async def list_claims(self, step: int):
+        await self._record("list", step, self.client.get("/claims/", params={"limit": 50}))
+
+    async def sample_queue(self, interval: float):
+        while True:
+            try:
+                response = await self.client.get("/metrics/queue")
+                if response.status_code == 200:
+                    self.queue_samples.append({"at": time.monotonic(), **response.json()})
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(interval)
+
+    async def run_schedule(self, schedule: list[tuple[float, str, int]]):
+        """Fires each request at its scheduled time, without waiting for earlier responses."""
+        tasks = []
+        for at, kind, step in schedule:
+            await asyncio.sleep(max(0.0, at - time.monotonic()))
+            tasks.append(asyncio.create_task(self.submit(step) if kind == "submit" else self.list_claims(step)))
+        await asyncio.gather(*tasks)
+
+
+def summarize_step(step: int, rate: float, start: float, end: float, test: LoadTest) -> dict:
+    requests = [r for r in test.requests if r["step"] == step]
+    submits = [r for r in requests if r["kind"] == "submit"]
+    lists = [r for r in requests if r["kind"] == "list"]
+    accepted = [r for r in submits if r["status"] in (200, 202)]
+    rejected = [r for r in submits if r["status"] == 429]
+    errors = [r for r in requests if r["status"] is None or (r["status"] >= 400 and r["status"] != 429)]
+
+    samples = [s for s in test.queue_samples if start <= s["at"] <= end]
+    backlog_growth = samples[-1]["pending"] - samples[0]["pending"] if len(samples) >= 2 else None
+
+    sent = len(submits)
+    summary = {
+        "step": step,
+        "offered_per_minute": rate,
+        "submitted": sent,
+        "accepted": len(accepted),
+        "rejected_429_rate": len(rejected) / sent if sent else 0.0,
+        "error_rate": len(errors) / len(requests) if requests else 0.0,
+        "submit_latency_seconds": percentiles([r["latency"] for r in accepted]),
+        "list_latency_seconds": percentiles([r["latency"] for r in lists if r["status"] == 200]),
+        "peak_in_flight": max((r["in_flight"] for r in requests), default=0),
+        "backlog_growth": backlog_growth,
+        "completed_per_minute": samples[-1]["throughput_per_minute"] if samples else None,
+    }
+    summary["saturated"] = (
+        summary["rejected_429_rate"] + summary["error_rate"] > MAX_REJECTED_SHARE
+        or (backlog_growth is not None and backlog_growth > MAX_BACKLOG_GROWTH_SHARE * max(len(accepted), 1))
+    )
+    return summary
+
+
+def print_steps(steps: list[dict]):
+    print(f"\n{'rate/min':>9}{'sent':>7}{'429 %':>8}{'err %':>8}{'submit p50':>12}{'p95':>8}{'p99':>8}{'list p95':>10}{'in flight':>10}{'backlog':>9}{'done/min':>10}")
+    fmt = lambda value, spec: format(value, spec) if value is not None else "-"
+    for step in steps:
+        submit = step["submit_latency_seconds"]
+        print(
+            f"{step['offered_per_minute']:>9.1f}{step['submitted']:>7}"
+            f"{step['rejected_429_rate']:>8.1%}{step['error_rate']:>8.1%}"
+            f"{fmt(submit['p50'], '.3f'):>12}{fmt(submit['p95'], '.3f'):>8}{fmt(submit['p99'], '.3f'):>8}"
+            f"{fmt(step['list_latency_seconds']['p95'], '.3f'):>10}{step['peak_in_flight']:>10}"
+            f"{fmt(step['backlog_growth'], 'd'):>9}{fmt(step['completed_per_minute'], '.1f'):>10}"
+            f"{'  saturated' if step['saturated'] else ''}"
+        )
+
+
+async def run(args: argparse.Namespace) -> dict:
+    corpus = load_corpus(args.claims_dir)
+    if not corpus:
+        raise ValueError(f"No claims found in {args.claims_dir}")
+
+    if args.mode == "poisson":
+        steps = [(args.rate, args.duration)]
+    else:
+        steps = [(args.start_rate + i * args.step_rate, args.step_seconds) for i in range(args.steps)]
+
+    rng = random.Random(args.seed)
+    start = time.monotonic() + 1.0
+    schedule, windows = [], []
+    for index, (rate, duration) in enumerate(steps):
+        schedule += [(at, "submit", index) for at in arrival_times(rate, start, duration, rng)]
+        schedule += [(at, "list", index) for at in arrival_times(args.list_rate, start, duration, rng)]
+        windows.append((rate, start, start + duration))
+        start += duration
+    schedule.sort()
+
+    # Unlimited by default: requests waiting for a pooled connection would count client queueing as API latency
+    max_connections = args.max_connections or None
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        test = LoadTest(client, corpus, not args.allow_duplicates, args.client_id)
+        sampler = asyncio.create_task(test.sample_queue(args.metrics_interval))
+        print(f"Sending {sum(1 for _, kind, _ in schedule if kind == 'submit')} claims over {len(steps)} step(s) to {args.url}")
+        try:
+            await test.run_schedule(schedule)
+        finally:
+            sampler.cancel()
+
+    summaries = [summarize_step(index, rate, begin, end, test) for index, (rate, begin, end) in enumerate(windows)]
+    saturated = next((step for step in summaries if step["saturated"]), None)
+    sustainable = [step["offered_per_minute"] for step in summaries[:summaries.index(saturated) if saturated else None]]
+    return {
+        "url": args.url,
+        "mode": args.mode,
+        "max_connections": max_connections,
+        "corpus": str(args.claims_dir),
+        "steps": summaries,
+        "saturation_per_minute": saturated["offered_per_minute"] if saturated else None,
+        "max_sustained_per_minute": max(sustainable) if sustainable else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load test of the claims API")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the API")
+    parser.add_argument("--claims-dir", type=Path, default=PROJECT_ROOT / "data" / "claims", help="Corpus the submitted claims are taken from")
+    parser.add_argument("--mode", choices=["poisson", "step"], default="poisson", help="Fixed-rate Poisson arrivals, or steps of increasing rate")
+    parser.add_argument("--rate", type=float, default=30, help="Poisson mode: claims submitted per minute")
+    parser.add_argument("--duration", type=float, default=120, help="Poisson mode: seconds of load")
+    parser.add_argument("--start-rate", type=float, default=10, help="Step mode: claims per minute of the first step")
+    parser.add_argument("--step-rate", type=float, default=10, help="Step mode: rate added at each step")
+    parser.add_argument("--steps", type=int, default=5, help="Step mode: number of steps")
+    parser.add_argument("--step-seconds", type=float, default=60, help="Step mode: seconds per step")
+    parser.add_argument("--list-rate", type=float, default=0, help="GET /claims/ requests per minute, alongside the submissions")
+    parser.add_argument("--allow-duplicates", action="store_true", help="Resubmit corpus claims as-is, letting the API deduplicate them")
+    parser.add_argument("--client-id", default="load-test", help="X-Client-Id sent with the submissions")
+    parser.add_argument("--max-connections", type=int, default=0, help="Maximum concurrent HTTP connections (0: one per in-flight request)")
+    parser.add_argument("--timeout", type=float, default=60, help="Request timeout in seconds")
+    parser.add_argument("--metrics-interval", type=float, default=5, help="Seconds between /metrics/queue samples")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the arrival schedule")
+    parser.add_argument("--output", type=Path, help="Save the results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_steps(results["steps"])
+    if results["saturation_per_minute"] is not None:
+        print(f"\nSaturated at {results['saturation_per_minute']:.1f} claims/min")
+    if results["max_sustained_per_minute"] is not None:
+        print(f"Sustained up to {results['max_sustained_per_minute']:.1f} claims/min")
+    peak_in_flight = max(step["peak_in_flight"] for step in results["steps"])
+    if results["max_connections"] and peak_in_flight > results["max_connections"]:
+        print(
+            f"Warning: up to {peak_in_flight} requests were in flight for {results['max_connections']} connections, "
+            "so latencies include time spent waiting for a connection in the client"
+        )
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
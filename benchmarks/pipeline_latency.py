@@ -0,0 +1,358 @@
+"""
+Latency and throughput benchmark of the pipeline stages and of the full pipeline.
+
+Cases:
+    ocr, orientation      one image at a time, for every image of the claims
+    triage                policy section identification, one claim at a time
+    analyse_documents     document type and field extraction of each claim's documents
+    fraud_detection       signature detection on each claim's documents
+    decision              make_decision on each claim
+    pipeline              run_claim_processing_pipeline on every claim, at each --concurrency level
+
+Each case runs in a fresh interpreter, so its peak RSS is its own. The inputs of the analysis, fraud
+detection and decision cases are the stage outputs of a first pipeline run, kept as checkpoints in
+--inputs-dir and reused by later benchmark runs while the upstream stages are unchanged. Fraud detection
+runs on the analysis of every document, also for claims whose pipeline analysis stopped early.
+
+The first --warmup calls of a case are run before the measurements and are not measured again.
+
+Reports p50/p95/p99 latency, throughput and peak RSS per case, and fails when a case regresses
+beyond --threshold compared to a --baseline result file.
+
+Usage:
+    python benchmarks/pipeline_latency.py --limit 5
+    python benchmarks/pipeline_latency.py --cases ocr pipeline --concurrency 1 2 4 --output results/benchmark.json
+    python benchmarks/pipeline_latency.py --baseline results/benchmark.json --threshold 0.2
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from pydantic import TypeAdapter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claim_processing_pipeline.checkpoints import StageCache, StageCheckpoint, analysis_fingerprint, load_doc_reports
+from claim_processing_pipeline.constants import LLM_MODEL, VLM_MODEL
+from claim_processing_pipeline.memory_profile import peak_rss_mb
+from claim_processing_pipeline.schemas import DocReport, ProcessedDoc
+from claim_processing_pipeline.stats import percentile
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+STAGE_CASES = ["ocr", "orientation", "triage", "analyse_documents", "fraud_detection", "decision"]
+ALL_CASES = STAGE_CASES + ["pipeline"]
+
+# Cases whose inputs are the outputs of a previous pipeline run
+CASES_NEEDING_INPUTS = {"analyse_documents", "fraud_detection", "decision"}
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+
+LATENCY_METRICS = ["p50_seconds", "p95_seconds", "p99_seconds"]
+
+
+# ---------------------------------
+# Claims and stage inputs
+# ---------------------------------
+def load_claims(claims_dir: Path, limit: int | None) -> list[tuple[str, str, list[str]]]:
+    """Returns the (name, description, supporting files) of the claims, in the layout used by the evaluation."""
+    claims = []
+    for claim_dir in sorted(d for d in claims_dir.iterdir() if d.is_dir() and d.name.startswith("claim")):
+        description_file = claim_dir / "description.txt"
+        if not description_file.exists():
+            continue
+        files = sorted(
+            str(file.absolute()) for file in claim_dir.iterdir()
+            if file.name not in ["answer.json", "description.txt", ".DS_Store"]
+        )
+        claims.append((claim_dir.name, description_file.read_text(encoding="utf-8").strip(), files))
+    return claims[:limit]
+
+
+def _read_stage_output(inputs_dir: Path, claim_name: str, stage: str):
+    """Returns the output of a stage stored by the preparation run, or None if the stage did not run."""
+    checkpoint_file = inputs_dir / claim_name / f"{stage}.json"
+    if not checkpoint_file.exists():
+        return None
+    with open(checkpoint_file, "r") as f:
+        return StageCheckpoint.model_validate(json.load(f)).output
+
+
+async def prepare_inputs(claims: list[tuple[str, str, list[str]]], inputs_dir: Path):
+    """
+    Runs the pipeline once per claim, checkpointing every stage output in the inputs directory.
+
+    The pipeline stops analysing documents once one is untrustworthy, so the analysis of every document
+    is also checkpointed (as `full_analysis`), to be the input of the fraud detection case.
+    """
+    from claim_processing_pipeline.experts.document_analyser import analyse_documents
+    from claim_processing_pipeline.pipeline import run_claim_processing_pipeline
+
+    for name, description, files in claims:
+        await run_claim_processing_pipeline(
+            claim_id=f"benchmark-{name}",
+            claim_description=description,
+            supporting_filenames=files,
+            checkpoint_dir=inputs_dir / name,
+        )
+
+        processed_docs = _read_stage_output(inputs_dir, name, "process_documents")
+        if processed_docs:
+            docs = TypeAdapter(list[ProcessedDoc]).validate_python(processed_docs)
+            await StageCache(inputs_dir / name).run(
+                "full_analysis",
+                analysis_fingerprint(docs),
+                lambda docs=docs: analyse_documents(docs),
+                list[DocReport],
+                load=load_doc_reports,
+            )
+
+
+def build_calls(
+    case: str,
+    claims: list[tuple[str, str, list[str]]],
+    inputs_dir: Path,
+) -> list[Callable[[], Awaitable]]:
+    """Returns one call per measured item of a case. Inputs are loaded here, outside of the measurements."""
+    if case in ("ocr", "orientation"):
+        from claim_processing_pipeline.experts.images import load_image
+        from claim_processing_pipeline.experts.ocr import _detect_and_correct_orientation, extract_text_from_image
+
+        images = [file for _, _, files in claims for file in files if Path(file).suffix.lower() in IMAGE_EXTENSIONS]
+        if case == "ocr":
+            return [lambda file=file: asyncio.to_thread(extract_text_from_image, file) for file in images]
+
+        decoded = [load_image(Path(file).read_bytes()) for file in images]
+        return [lambda img=img: asyncio.to_thread(_detect_and_correct_orientation, [img]) for img in decoded]
+
+    if case == "triage":
+        from claim_processing_pipeline.experts.applicable_policy_section import identify_policy_section
+
+        return [lambda description=description: identify_policy_section(description) for _, description, _ in claims]
+
+    calls = []
+    for name, description, files in claims:
+        if case == "analyse_documents":
+            from claim_processing_pipeline.experts.document_analyser import analyse_documents
+
+            processed_docs = _read_stage_output(inputs_dir, name, "process_documents")
+            if processed_docs:
+                docs = TypeAdapter(list[ProcessedDoc]).validate_python(processed_docs)
+                calls.append(lambda docs=docs: analyse_documents(docs))
+
+        elif case == "fraud_detection":
+            from claim_processing_pipeline.experts.fraud_detector import detect_fraud
+
+            analysed_docs = _read_stage_output(inputs_dir, name, "full_analysis")
+            if analysed_docs:
+                calls.append(lambda data=analysed_docs: detect_fraud(load_doc_reports(data)))
+
+        elif case == "decision":
+            from claim_processing_pipeline.experts.applicable_policy_section import policy_section_text
+            from claim_processing_pipeline.experts.policy_reasoner import make_decision
+
+            # Only claims that reached the decision stage
+            triage = _read_stage_output(inputs_dir, name, "triage")
+            analysed_docs = _read_stage_output(inputs_dir, name, "fraud_detection")
+            policy_section = policy_section_text(triage["identifier"]) if triage else None
+            if policy_section and analysed_docs is not None:
+                calls.append(
+                    lambda description=description, data=analysed_docs, policy_section=policy_section: make_decision(
+                        claim_description=description,
+                        analysed_docs=load_doc_reports(data),
+                        policy_context=policy_section,
+                    )
+                )
+
+        elif case == "pipeline":
+            from claim_processing_pipeline.pipeline import run_claim_processing_pipeline
+
+            calls.append(
+                lambda name=name, description=description, files=files: run_claim_processing_pipeline(
+                    claim_id=f"benchmark-{name}",
+                    claim_description=description,
+                    supporting_filenames=files,
+                )
+            )
+    return calls
+
+
+# ---------------------------------
+# Measurements
+# ---------------------------------
+async def measure(calls: list[Callable[[], Awaitable]], concurrency: int, warmup: int) -> dict:
+    """
+    Runs the calls with at most `concurrency` of them at the same time. The first `warmup` calls run
+    before, one at a time (model loading, connection setup), and are left out of the measurements, since
+    running them again would hit warm caches.
+
+    Returns:
+        Latency percentiles, throughput and peak RSS
+    """
+    for call in calls[:warmup]:
+        await call()
+    calls = calls[warmup:]
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def timed(call: Callable[[], Awaitable]):
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(call) for call in calls))
+    wall_seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "items": len(latencies),
+        "concurrency": concurrency,
+        "p50_seconds": percentile(latencies, 0.50) if latencies else None,
+        "p95_seconds": percentile(latencies, 0.95) if latencies else None,
+        "p99_seconds": percentile(latencies, 0.99) if latencies else None,
+        "throughput_per_minute": len(latencies) / wall_seconds * 60 if latencies else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_in_subprocess(args: argparse.Namespace, *extra_args: str) -> dict | None:
+    """Runs this script in a fresh interpreter (a single case, or the input preparation) and returns its result."""
+    with tempfile.NamedTemporaryFile(suffix=".json") as result_file:
+        command = [
+            sys.executable, __file__,
+            "--claims-dir", str(args.claims_dir),
+            "--inputs-dir", str(args.inputs_dir),
+            "--warmup", str(args.warmup),
+            "--result-file", result_file.name,
+            *extra_args,
+        ]
+        if args.limit is not None:
+            command += ["--limit", str(args.limit)]
+        completed = subprocess.run(command, stdout=subprocess.DEVNULL)
+        if completed.returncode != 0:
+            return None
+        with open(result_file.name, "r") as f:
+            return json.load(f)
+
+
+def compare_to_baseline(cases: dict, baseline: dict, threshold: float) -> list[str]:
+    """Returns the metrics that regressed by more than the threshold compared to the baseline."""
+    regressions = []
+    for case, result in cases.items():
+        previous = baseline["cases"].get(case)
+        if not previous or not result["items"] or not previous["items"]:
+            continue
+
+        for metric in LATENCY_METRICS + ["peak_rss_mb"]:
+            if result[metric] > previous[metric] * (1 + threshold):
+                regressions.append(f"{case} {metric}: {previous[metric]:.3f} -> {result[metric]:.3f}")
+        if result["throughput_per_minute"] < previous["throughput_per_minute"] * (1 - threshold):
+            regressions.append(
+                f"{case} throughput_per_minute: {previous['throughput_per_minute']:.2f} -> {result['throughput_per_minute']:.2f}"
+            )
+    return regressions
+
+
+def print_results(cases: dict):
+    print(f"\n{'case':<24}{'items':>6}{'p50 s':>10}{'p95 s':>10}{'p99 s':>10}{'per min':>10}{'RSS MB':>10}")
+    for case, result in cases.items():
+        if not result["items"]:
+            print(f"{case:<24}{0:>6}  (no inputs)")
+            continue
+        print(
+            f"{case:<24}{result['items']:>6}"
+            f"{result['p50_seconds']:>10.3f}{result['p95_seconds']:>10.3f}{result['p99_seconds']:>10.3f}"
+            f"{result['throughput_per_minute']:>10.2f}{result['peak_rss_mb']:>10.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the latency and throughput of the pipeline stages and of the full pipeline")
+    parser.add_argument("--cases", nargs="+", choices=ALL_CASES, default=ALL_CASES, help="Cases to run")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 2, 4], help="Concurrency levels of the pipeline case")
+    parser.add_argument("--claims-dir", type=Path, default=PROJECT_ROOT / "data" / "claims", help="Claims to benchmark on")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N claims")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured calls before each case")
+    parser.add_argument(
+        "--inputs-dir",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "claims-benchmark-inputs",
+        help="Where the stage outputs used as inputs of the analysis, fraud detection and decision cases are kept",
+    )
+    parser.add_argument("--output", type=Path, help="Save the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Results of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change counted as a regression")
+    # Used by the subprocess running a single case
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("--run-concurrency", type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    claims = load_claims(args.claims_dir, args.limit)
+
+    if args.prepare:
+        asyncio.run(prepare_inputs(claims, args.inputs_dir))
+        args.result_file.write_text("{}")
+        return
+    if args.run_case:
+        calls = build_calls(args.run_case, claims, args.inputs_dir)
+        # Keep at least one measured call
+        result = asyncio.run(measure(calls, args.run_concurrency, max(0, min(args.warmup, len(calls) - 1))))
+        args.result_file.write_text(json.dumps(result))
+        return
+
+    if CASES_NEEDING_INPUTS & set(args.cases):
+        print(f"Preparing stage inputs in {args.inputs_dir}...")
+        if run_in_subprocess(args, "--prepare") is None:
+            print("✗ Preparing the stage inputs failed")
+            sys.exit(1)
+
+    cases = {}
+    for case in args.cases:
+        for concurrency in (args.concurrency if case == "pipeline" else [1]):
+            name = f"{case}@{concurrency}" if case == "pipeline" else case
+            print(f"Running {name}...")
+            result = run_in_subprocess(args, "--run-case", case, "--run-concurrency", str(concurrency))
+            if result is None:
+                print(f"✗ {name} failed")
+                sys.exit(1)
+            cases[name] = result
+
+    results = {
+        "created_at": datetime.now().isoformat(),
+        "platform": platform.platform(),
+        "models": {"llm": LLM_MODEL, "vlm": VLM_MODEL},
+        "claims": len(claims),
+        "cases": cases,
+    }
+    print_results(cases)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare_to_baseline(cases, json.load(f), args.threshold)
+        if regressions:
+            print(f"\nFAILED: regressions beyond {args.threshold:.0%} of {args.baseline}:")
+            print("\n".join(f"  - {regression}" for regression in regressions))
+            sys.exit(1)
+        print(f"\nOK: no regression beyond {args.threshold:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ Evaluation script for the claim processing pipeline.
 Compares pipeline decisions against ground truth in answer.json files.
 """
 import asyncio
+import argparse
 import json
 from pathlib import Path
 from datetime import datetime
@@ -10,24 +11,109 @@ from datetime import datetime
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from claim_processing_pipeline.pipeline import run_claim_processing_pipeline
+from claim_processing_pipeline import constants, pipeline, prompts, schemas, utils
+from claim_processing_pipeline.checkpoints import code_version, file_digest, fingerprint, source_version
+from claim_processing_pipeline.experts import (
+    applicable_policy_section,
+    document_analyser,
+    document_processor,
+    fraud_detector,
+    policy_reasoner,
+)
+from claim_processing_pipeline.pipeline import ClaimDecision, run_claim_processing_pipeline
+from claim_processing_pipeline.pipeline_config import current_config
+from claim_processing_pipeline.memory_profile import enable_memory_profiling, peak_rss_mb
+from claim_processing_pipeline.tracing import Span
 from claim_processing_pipeline.config import setup_logging
-from evaluation_models import GroundTruth, ClaimEvaluationResult
+from evaluation_models import GroundTruth, ClaimEvaluationResult, ClaimMetrics, iter_results
 
 # Set up logging for the script
 setup_logging("INFO")
 
 
+def evaluation_fingerprint(claim_dir: Path) -> str:
+    """
+    Returns a fingerprint of the evaluation of a claim: its files (description, documents and
+    ground truth) and the pipeline configuration (code, prompts and models, including the
+    overrides of the current `PipelineConfig`).
+    Results evaluated under the same fingerprint are reused when resuming a run.
+    """
+    claim_files = {
+        file.name: file_digest(str(file))
+        for file in sorted(claim_dir.iterdir())
+        if file.is_file() and file.name != ".DS_Store"
+    }
+    return fingerprint(
+        "evaluation",
+        [
+            code_version(module)
+            for module in (
+                pipeline,
+                prompts,
+                schemas,
+                constants,
+                utils,
+                applicable_policy_section,
+                document_processor,
+                document_analyser,
+                fraud_detector,
+                policy_reasoner,
+            )
+        ],
+        source_version("claim_processing_pipeline.experts.ocr"),
+        current_config().model_dump(),
+        claim_files,
+    )
+
+
+def claim_metrics(pipeline_result: ClaimDecision) -> ClaimMetrics:
+    """
+    Extracts the latency and resource metrics of a claim from its pipeline trace and LLM usage.
+    """
+    metrics = ClaimMetrics(stage_status=pipeline_result.stage_status or {})
+
+    if pipeline_result.llm_usage:
+        metrics.llm_calls = pipeline_result.llm_usage.total.calls
+        metrics.prompt_tokens = pipeline_result.llm_usage.total.prompt_tokens
+        metrics.completion_tokens = pipeline_result.llm_usage.total.completion_tokens
+
+    if pipeline_result.trace:
+        trace = Span(**pipeline_result.trace)
+        if "memory" in trace.attributes:
+            metrics.peak_rss_growth_mb = trace.attributes["memory"]["peak_rss_growth_mb"]
+            metrics.peak_rss_mb = trace.attributes["memory"]["peak_rss_mb"]
+
+        for s in trace.iter_spans():
+            if s.kind == "stage" and s.attributes.get("checkpoint") != "reused":
+                metrics.stage_seconds[s.name] = metrics.stage_seconds.get(s.name, 0.0) + s.duration
+            elif s.name in ("orientation", "ocr") and s.kind == "model":
+                metrics.ocr_seconds += s.duration
+                if s.name == "ocr":
+                    metrics.ocr_images += s.attributes.get("batch_size", 1)
+            elif s.name == "ocr_service":
+                metrics.ocr_seconds += s.duration
+                metrics.ocr_images += 1
+
+    return metrics
+
+
 async def evaluate_single_claim(
     claim_dir: Path,
-    results_file: Path
+    results_file: Path | None,
+    timeout: float | None = None,
+    checkpoint_dir: Path | None = None,
+    keep_checkpoint_variants: bool = False
 ) -> ClaimEvaluationResult:
     """
-    Evaluate a single claim and append results to the JSON file.
+    Evaluate a single claim and append results to the JSONL file.
     
     Args:
         claim_dir: Path to the claim directory
-        results_file: Path to the results JSON file
+        results_file: Path to the results JSONL file (None to not save the result)
+        timeout: Seconds after which the pipeline is cancelled and the claim counted as an error
+        checkpoint_dir: Directory to keep the stage checkpoints of the claims in, so stages whose
+            inputs, code and models are unchanged are reused from earlier runs
+        keep_checkpoint_variants: Keep the stage outputs of every configuration evaluated, not only the latest
     
     Returns:
         ClaimEvaluationResult object
@@ -38,6 +124,7 @@ async def evaluate_single_claim(
     print(f"{'='*60}")
     
     start_time = datetime.now()
+    config_fingerprint = evaluation_fingerprint(claim_dir)
     
     # Helper function to create error result
     def create_error_result(error_msg: str, ground_truth: GroundTruth | None = None) -> ClaimEvaluationResult:
@@ -54,14 +141,16 @@ async def evaluate_single_claim(
             decision_match=False,
             match_type="error",
             processing_time_seconds=None,
-            error=error_msg
+            error=error_msg,
+            config_fingerprint=config_fingerprint
         )
     
     # Load ground truth
     answer_file = claim_dir / "answer.json"
     if not answer_file.exists():
         error_result = create_error_result(f"answer.json not found in {claim_dir}")
-        _append_result_to_file(results_file, error_result)
+        if results_file:
+            _append_result_to_file(results_file, error_result)
         return error_result
     
     with open(answer_file, 'r') as f:
@@ -73,7 +162,8 @@ async def evaluate_single_claim(
     description_file = claim_dir / "description.txt"
     if not description_file.exists():
         error_result = create_error_result(f"description.txt not found in {claim_dir}", ground_truth)
-        _append_result_to_file(results_file, error_result)
+        if results_file:
+            _append_result_to_file(results_file, error_result)
         return error_result
     
     description = description_file.read_text(encoding='utf-8').strip()
@@ -86,11 +176,16 @@ async def evaluate_single_claim(
     
     # Run pipeline
     try:
-        pipeline_result = await run_claim_processing_pipeline(
-            claim_id=claim_id,
-            claim_description=description,
-            supporting_filenames=supporting_files,
-            metadata=""
+        pipeline_result = await asyncio.wait_for(
+            run_claim_processing_pipeline(
+                claim_id=claim_id,
+                claim_description=description,
+                supporting_filenames=supporting_files,
+                metadata="",
+                checkpoint_dir=checkpoint_dir / claim_id if checkpoint_dir else None,
+                keep_checkpoint_variants=keep_checkpoint_variants
+            ),
+            timeout=timeout
         )
         
         end_time = datetime.now()
@@ -125,14 +220,21 @@ async def evaluate_single_claim(
             decision_match=decision_match,
             match_type=match_type,
             processing_time_seconds=processing_time,
-            error=None
+            time_saved_seconds=pipeline_result.time_saved_seconds,
+            trace=pipeline_result.trace,
+            llm_usage=pipeline_result.llm_usage.model_dump(),
+            metrics=claim_metrics(pipeline_result),
+            error=None,
+            config_fingerprint=config_fingerprint
         )
         
         print(f"✓ Expected: {ground_truth.decision}, Got: {pipeline_decision}, Match: {match_type}")
+        print(f"  Time saved by concurrent triage/OCR: {pipeline_result.time_saved_seconds or 0:.2f}s")
         
     except Exception as e:
         end_time = datetime.now()
         processing_time = (end_time - start_time).total_seconds()
+        error = f"Timed out after {timeout}s" if isinstance(e, asyncio.TimeoutError) else str(e)
         
         result = ClaimEvaluationResult(
             claim_id=claim_id,
@@ -147,75 +249,138 @@ async def evaluate_single_claim(
             decision_match=False,
             match_type="error",
             processing_time_seconds=processing_time,
-            error=str(e)
+            error=error,
+            config_fingerprint=config_fingerprint
         )
         
-        print(f"✗ Error processing claim: {e}")
+        print(f"✗ Error processing {claim_id}: {error}")
     
     # Append result to file
-    _append_result_to_file(results_file, result)
+    if results_file:
+        _append_result_to_file(results_file, result)
     
     return result
 
 
 def _append_result_to_file(results_file: Path, result: ClaimEvaluationResult):
-    """Append a single result to the JSON results file."""
-    # Read existing results
-    if results_file.exists():
-        with open(results_file, 'r') as f:
-            try:
-                results = json.load(f)
-            except json.JSONDecodeError:
-                results = []
-    else:
-        results = []
-    
-    # Append new result
-    results.append(result.model_dump())
-    
-    # Write back
-    with open(results_file, 'w') as f:
-        json.dump(results, f, indent=2)
+    """Append a single result to the JSONL results file."""
+    with open(results_file, 'a') as f:
+        f.write(json.dumps(result.model_dump()) + "\n")
+
+
+def _load_reusable_results(results_file: Path, claim_dirs: list[Path]) -> dict[str, ClaimEvaluationResult]:
+    """
+    Loads the results of a previous run for the given claims whose files and pipeline configuration
+    are unchanged (see `evaluation_fingerprint`), and rewrites the results file with only those, in
+    claim order, so it holds a single result per claim of the current corpus.
+    Failed claims are not reused, so resuming retries them.
+    """
+    if not results_file.exists():
+        return {}
+
+    fingerprints = {claim_dir.name: evaluation_fingerprint(claim_dir) for claim_dir in claim_dirs}
+    reusable = {}
+    for data in iter_results(results_file):
+        result = ClaimEvaluationResult(**data)
+        if result.config_fingerprint == fingerprints.get(result.claim_id) and result.error is None:
+            reusable[result.claim_id] = result
+
+    tmp_file = results_file.with_suffix(".jsonl.tmp")
+    with open(tmp_file, 'w') as f:
+        for claim_dir in claim_dirs:
+            if claim_dir.name in reusable:
+                f.write(json.dumps(reusable[claim_dir.name].model_dump()) + "\n")
+    tmp_file.replace(results_file)
+    return reusable
 
 
 async def evaluate_all_claims(
     claims_dir: Path,
-    results_file: Path
+    results_file: Path,
+    concurrency: int = 1,
+    claim_timeout: float | None = None,
+    resume: bool = False,
+    checkpoint_dir: Path | None = None
 ) -> list[ClaimEvaluationResult]:
     """
     Evaluate all claims in the claims directory.
+
+    Up to `concurrency` claims run through the pipeline at the same time (they still share the
+    OCR and LLM slots). Each result is appended to the results file as soon as its claim is done,
+    so an interrupted run keeps the results it already produced. The file is therefore in completion
+    order; readers sort the results by claim.
     
     Args:
         claims_dir: Path to directory containing claim folders
-        results_file: Path to save results JSON file
+        results_file: Path to save results JSONL file
+        concurrency: Maximum number of claims evaluated at the same time
+        claim_timeout: Seconds after which a claim is cancelled and counted as an error
+        resume: Keep the results of a previous run made with the same configuration
+            and claim files (see `evaluation_fingerprint`) and only evaluate the remaining claims
+        checkpoint_dir: Directory to keep the stage checkpoints of the claims in (see `evaluate_single_claim`)
     
     Returns:
-        List of ClaimEvaluationResult objects
+        List of ClaimEvaluationResult objects, in claim order
     """
-    # Clear existing results file
-    if results_file.exists():
-        results_file.unlink()
-    
     # Get all claim directories
     claim_dirs = sorted([d for d in claims_dir.iterdir() if d.is_dir() and d.name.startswith("claim")])
+
+    if resume:
+        reusable = _load_reusable_results(results_file, claim_dirs)
+    else:
+        # Clear existing results file
+        results_file.unlink(missing_ok=True)
+        reusable = {}
     
-    print(f"Found {len(claim_dirs)} claims to evaluate")
+    to_evaluate = [claim_dir for claim_dir in claim_dirs if claim_dir.name not in reusable]
     
-    results = []
-    for claim_dir in claim_dirs:
-        result = await evaluate_single_claim(claim_dir, results_file)
-        results.append(result)
+    print(f"Found {len(claim_dirs)} claims, {len(to_evaluate)} to evaluate ({concurrency} at a time)")
     
-    return results
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def evaluate(claim_dir: Path) -> ClaimEvaluationResult:
+        async with semaphore:
+            return await evaluate_single_claim(claim_dir, results_file, claim_timeout, checkpoint_dir)
+
+    new_results = await asyncio.gather(*(evaluate(claim_dir) for claim_dir in to_evaluate))
+
+    results_by_claim = {**reusable, **{result.claim_id: result for result in new_results}}
+    return [results_by_claim[claim_dir.name] for claim_dir in claim_dirs]
 
 
 async def main():
     """Main evaluation function."""
-    # Set up paths
     project_root = Path(__file__).parent.parent
-    claims_dir = project_root / "data" / "claims"
+
+    parser = argparse.ArgumentParser(description="Evaluate the pipeline on all claims against their ground truth")
+    parser.add_argument("--claims-dir", type=Path, default=project_root / "data" / "claims", help="Directory containing the claim folders")
+    parser.add_argument("--concurrency", type=int, default=1, help="Maximum number of claims evaluated at the same time")
+    parser.add_argument("--claim-timeout", type=float, default=None, help="Seconds after which a claim is counted as an error")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Keep the results of the previous run made with the same pipeline configuration and evaluate only the rest",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        type=Path,
+        default=None,
+        help="Keep stage checkpoints here and reuse the stages whose inputs, code and models are unchanged",
+    )
+    parser.add_argument(
+        "--memory-profile",
+        action="store_true",
+        help="Record the memory of each stage and document in the traces (see memory_report.py); use with --concurrency 1",
+    )
+    args = parser.parse_args()
+
+    if args.memory_profile:
+        enable_memory_profiling()
+
+    # Set up paths
+    claims_dir = args.claims_dir
     results_folder = project_root / "results"
-    results_file = results_folder / "evaluation_results.json"
+    results_file = results_folder / "evaluation_results.jsonl"
 
     if not results_folder.is_dir():
         results_folder.mkdir(parents=True)
@@ -224,10 +389,11 @@ async def main():
     print(f"Results file: {results_file}")
     
     # Run evaluation
-    results = await evaluate_all_claims(claims_dir, results_file)
+    results = await evaluate_all_claims(claims_dir, results_file, args.concurrency, args.claim_timeout, args.resume, args.checkpoint_dir)
     
     print(f"\n✓ Evaluation complete: {len(results)} claims processed")
     print(f"✓ Results saved to: {results_file}")
+    print(f"✓ Peak memory (RSS) of the evaluation: {peak_rss_mb():.0f} MB")
     print(f"\nRun 'python scripts/generate_report.py' to generate performance report")
 
 
@@ -1,7 +1,9 @@
 """
 Shared models for evaluation.
 """
-from typing import Literal
+import json
+from pathlib import Path
+from typing import Iterator, Literal
 from pydantic import BaseModel
 
 
@@ -11,6 +13,26 @@ class GroundTruth(BaseModel):
     acceptable_decision: Literal["APPROVE", "DENY", "UNCERTAIN"] | None = None
 
 
+class ClaimMetrics(BaseModel):
+    # Seconds spent in each pipeline stage that ran (reused checkpoints are not counted)
+    stage_seconds: dict[str, float] = {}
+    # Whether each stage was computed or reused from a checkpoint
+    stage_status: dict[str, str] = {}
+
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    # Images run through OCR, and the seconds spent on them (orientation and text recognition)
+    ocr_images: int = 0
+    ocr_seconds: float = 0.0
+
+    # Memory of the claim, from its trace when memory profiling is enabled (see memory_profile):
+    # how much it raised the peak RSS of the process, and that peak once it finished
+    peak_rss_growth_mb: float | None = None
+    peak_rss_mb: float | None = None
+
+
 class ClaimEvaluationResult(BaseModel):
     claim_id: str
     claim_description: str
@@ -34,4 +56,48 @@ class ClaimEvaluationResult(BaseModel):
     
     # Metadata
     processing_time_seconds: float | None
+    time_saved_seconds: float | None = None
+    trace: dict | None = None
+    llm_usage: dict | None = None
+    metrics: ClaimMetrics | None = None
     error: str | None
+
+    # Fingerprint of the claim files and the pipeline code, prompts and models it was evaluated with
+    config_fingerprint: str | None = None
+
+
+def iter_results(results_file: Path) -> Iterator[dict]:
+    """
+    Reads evaluation results one at a time.
+
+    Results are stored as JSONL, one result per line. A last line cut short by an interrupted run
+    is skipped. Files ending in .json are read as the legacy format, a JSON list of results.
+
+    Args:
+        results_file: Path to the results file
+
+    Yields:
+        Each result, as a dict
+    """
+    if results_file.suffix == ".json":
+        with open(results_file, 'r') as f:
+            yield from json.load(f)
+        return
+
+    with open(results_file, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠ Skipping incomplete result line in {results_file}")
+
+
+def find_results_file(results_folder: Path, name: str) -> Path:
+    """Returns the JSONL results file of the given name, or its legacy .json version if only that exists."""
+    results_file = results_folder / f"{name}.jsonl"
+    legacy_file = results_folder / f"{name}.json"
+    if not results_file.exists() and legacy_file.exists():
+        return legacy_file
+    return results_file
@@ -7,7 +7,19 @@ from typing import Literal
 from datetime import datetime
 from pydantic import BaseModel
 
-from evaluation_models import ClaimEvaluationResult
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from evaluation_models import ClaimEvaluationResult, find_results_file, iter_results
+from claim_processing_pipeline.stats import percentile
+
+
+class LatencyStats(BaseModel):
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    max: float
 
 
 class PerformanceReport(BaseModel):
@@ -38,6 +50,29 @@ class PerformanceReport(BaseModel):
     
     # Performance metrics
     avg_processing_time: float | None
+    p50_processing_time: float | None
+    p95_processing_time: float | None
+    stage_latency: dict[str, LatencyStats]
+    
+    # LLM usage per claim
+    avg_llm_calls: float | None
+    avg_prompt_tokens: float | None
+    avg_completion_tokens: float | None
+    total_prompt_tokens: int
+    total_completion_tokens: int
+    
+    # OCR
+    ocr_images: int
+    avg_ocr_seconds_per_image: float | None
+    
+    # Memory, from memory-profiled runs: highest RSS of the evaluation process, and the most
+    # a single claim raised it
+    peak_rss_mb: float | None
+    max_claim_rss_growth_mb: float | None
+    
+    # Stage checkpoint reuse (reused / run stages)
+    cache_hit_rate: float | None
+    stage_cache_hit_rates: dict[str, float]
     
     # Detailed results
     mismatched_claims: list[str]
@@ -46,6 +81,18 @@ class PerformanceReport(BaseModel):
     timestamp: str
 
 
+def latency_stats(values: list[float]) -> LatencyStats:
+    """Summarizes latencies, in seconds."""
+    values = sorted(values)
+    return LatencyStats(
+        count=len(values),
+        mean=sum(values) / len(values),
+        p50=percentile(values, 0.5),
+        p95=percentile(values, 0.95),
+        max=values[-1],
+    )
+
+
 def generate_performance_report(results: list[ClaimEvaluationResult]) -> PerformanceReport:
     """
     Generate a performance report from evaluation results.
@@ -102,6 +149,29 @@ def generate_performance_report(results: list[ClaimEvaluationResult]) -> Perform
     # Performance metrics
     processing_times = [r.processing_time_seconds for r in results if r.processing_time_seconds is not None]
     avg_processing_time = sum(processing_times) / len(processing_times) if processing_times else None
+    processing_stats = latency_stats(processing_times) if processing_times else None
+    
+    # Latency and resource metrics, for the claims that went through the pipeline
+    metrics = [r.metrics for r in results if r.metrics is not None]
+    
+    stage_seconds: dict[str, list[float]] = {}
+    stage_runs: dict[str, list[bool]] = {}
+    for m in metrics:
+        for stage, seconds in m.stage_seconds.items():
+            stage_seconds.setdefault(stage, []).append(seconds)
+        for stage, status in m.stage_status.items():
+            stage_runs.setdefault(stage, []).append(status == "reused")
+    stage_latency = {stage: latency_stats(seconds) for stage, seconds in stage_seconds.items()}
+    stage_cache_hit_rates = {stage: sum(reused) / len(reused) for stage, reused in stage_runs.items()}
+    all_runs = [reused for runs in stage_runs.values() for reused in runs]
+    cache_hit_rate = sum(all_runs) / len(all_runs) if all_runs else None
+    
+    total_prompt_tokens = sum(m.prompt_tokens for m in metrics)
+    total_completion_tokens = sum(m.completion_tokens for m in metrics)
+    ocr_images = sum(m.ocr_images for m in metrics)
+    ocr_seconds = sum(m.ocr_seconds for m in metrics)
+    peak_rss = [m.peak_rss_mb for m in metrics if m.peak_rss_mb is not None]
+    rss_growth = [m.peak_rss_growth_mb for m in metrics if m.peak_rss_growth_mb is not None]
     
     # Detailed results
     mismatched_claims = [r.claim_id for r in results if r.match_type == "mismatch"]
@@ -126,6 +196,20 @@ def generate_performance_report(results: list[ClaimEvaluationResult]) -> Perform
         uncertain_correct=uncertain_correct,
         uncertain_incorrect=uncertain_incorrect,
         avg_processing_time=avg_processing_time,
+        p50_processing_time=processing_stats.p50 if processing_stats else None,
+        p95_processing_time=processing_stats.p95 if processing_stats else None,
+        stage_latency=stage_latency,
+        avg_llm_calls=sum(m.llm_calls for m in metrics) / len(metrics) if metrics else None,
+        avg_prompt_tokens=total_prompt_tokens / len(metrics) if metrics else None,
+        avg_completion_tokens=total_completion_tokens / len(metrics) if metrics else None,
+        total_prompt_tokens=total_prompt_tokens,
+        total_completion_tokens=total_completion_tokens,
+        ocr_images=ocr_images,
+        avg_ocr_seconds_per_image=ocr_seconds / ocr_images if ocr_images else None,
+        peak_rss_mb=max(peak_rss) if peak_rss else None,
+        max_claim_rss_growth_mb=max(rss_growth) if rss_growth else None,
+        cache_hit_rate=cache_hit_rate,
+        stage_cache_hit_rates=stage_cache_hit_rates,
         mismatched_claims=mismatched_claims,
         failed_claims=failed_claims,
         timestamp=datetime.now().isoformat()
@@ -170,6 +254,29 @@ def print_performance_report(report: PerformanceReport):
     if report.avg_processing_time:
         print(f"\n{'Performance Metrics':-^80}")
         print(f"Average Processing Time: {report.avg_processing_time:.2f}s")
+        print(f"Processing Time p50 / p95: {report.p50_processing_time:.2f}s / {report.p95_processing_time:.2f}s")
+    
+    if report.stage_latency:
+        print(f"\n{'Stage Latency':-^80}")
+        print(f"{'Stage':<22}{'Runs':>6}{'Mean':>10}{'p50':>10}{'p95':>10}{'Max':>10}")
+        for stage, stats in report.stage_latency.items():
+            print(f"{stage:<22}{stats.count:>6}{stats.mean:>9.2f}s{stats.p50:>9.2f}s{stats.p95:>9.2f}s{stats.max:>9.2f}s")
+    
+    if report.avg_llm_calls is not None:
+        print(f"\n{'Resource Usage':-^80}")
+        print(f"LLM Calls per Claim: {report.avg_llm_calls:.1f}")
+        print(f"Tokens per Claim: {report.avg_prompt_tokens:.0f} prompt, {report.avg_completion_tokens:.0f} completion")
+        print(f"Total Tokens: {report.total_prompt_tokens} prompt, {report.total_completion_tokens} completion")
+        if report.avg_ocr_seconds_per_image is not None:
+            print(f"OCR Time per Image: {report.avg_ocr_seconds_per_image:.2f}s ({report.ocr_images} images)")
+        if report.peak_rss_mb is not None:
+            print(f"Peak Memory (RSS): {report.peak_rss_mb:.0f} MB, raised by up to {report.max_claim_rss_growth_mb:.1f} MB per claim")
+    
+    if report.cache_hit_rate is not None:
+        print(f"\n{'Stage Checkpoints':-^80}")
+        print(f"Cache Hit Rate: {report.cache_hit_rate:.2%}")
+        for stage, rate in report.stage_cache_hit_rates.items():
+            print(f"  - {stage}: {rate:.2%}")
     
     if report.mismatched_claims:
         print(f"\n{'Mismatched Claims':-^80}")
@@ -189,7 +296,7 @@ def main():
     project_root = Path(__file__).parent.parent
     results_folder = project_root / "results"
     
-    results_file = results_folder / "evaluation_results.json"
+    results_file = find_results_file(results_folder, "evaluation_results")
     report_file = results_folder / "evaluation_report.json"
     
     if not results_file.exists():
@@ -199,10 +306,8 @@ def main():
     
     # Load results
     print(f"Loading results from: {results_file}")
-    with open(results_file, 'r') as f:
-        results_data = json.load(f)
-    
-    results = [ClaimEvaluationResult(**r) for r in results_data]
+    # Results are saved as claims finish
+    results = sorted((ClaimEvaluationResult(**r) for r in iter_results(results_file)), key=lambda r: r.claim_id)
     
     # Generate report
     print(f"Generating report for {len(results)} claims...")
@@ -0,0 +1,241 @@
+"""
+Generates a synthetic claim corpus of any size from the claims in data/claims, for scale testing
+(caching, queueing, storage). The output uses the same layout, so it can be evaluated directly:
+
+    python evaluation/generate_synthetic_claims.py --count 1000 --seed 7 --output data/synthetic
+    python evaluation/evaluate_pipeline.py --claims-dir data/synthetic
+
+Each synthetic claim is based on a source claim, whose answer.json it keeps:
+- the description is reworded (greeting, sign-off, phrasing, reference line), keeping names and dates
+- images are augmented: rotation, scaling, JPEG/WebP recompression and noise
+- some claims get extra documents: augmented copies of their own images, so the ground truth still holds
+- a share of the claims (--duplicate-rate) are exact copies of an earlier synthetic claim
+
+Text documents are copied unchanged, since their content (names, dates, references) drives the decision.
+The same seed always produces the same corpus. manifest.json records how each claim was built.
+"""
+import io
+import json
+import random
+import shutil
+import argparse
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+
+GREETINGS = ["", "Hello,\n\n", "Dear Claims Team,\n\n", "To whom it may concern,\n\n", "Hi,\n\n"]
+
+SIGN_OFFS = ["Sincerely,", "Kind regards,", "Best regards,", "Thank you,", "Regards,"]
+
+# Meaning-preserving rewordings, applied with some probability each
+REWORDINGS = [
+    ("I was unable to", "I could not"),
+    ("I was unable to", "I wasn't able to"),
+    ("due to", "because of"),
+    ("as a result", "consequently"),
+    ("I am kindly requesting", "I would like to request"),
+    ("I am requesting", "I would like to request"),
+    ("I would like to", "I wish to"),
+    ("unforeseen", "unexpected"),
+    ("immediately", "right away"),
+    ("Please find attached", "Attached you will find"),
+    ("I understand", "I am aware"),
+    ("refund", "reimbursement"),
+]
+
+
+# ---------------------------------
+# Descriptions
+# ---------------------------------
+def vary_description(description: str, rng: random.Random, reference: str) -> str:
+    """Rewords a claim description without touching the facts (names, places, dates, amounts)."""
+    text = description
+    for original, replacement in REWORDINGS:
+        if original in text and rng.random() < 0.5:
+            text = text.replace(original, replacement)
+
+    for sign_off in SIGN_OFFS:
+        if sign_off in text:
+            text = text.replace(sign_off, rng.choice(SIGN_OFFS), 1)
+            break
+
+    reference_line = f"\n\nReference: {reference}" if rng.random() < 0.5 else ""
+    return rng.choice(GREETINGS) + text.strip() + reference_line
+
+
+# ---------------------------------
+# Images
+# ---------------------------------
+def augment_image(data: bytes, rng: random.Random) -> tuple[bytes, str, dict]:
+    """
+    Applies a random rotation, scaling, noise and recompression to an image.
+
+    Args:
+        data: Content of the source image file
+        rng: Random generator of the claim
+
+    Returns:
+        The augmented image file content, its extension and the augmentations applied
+    """
+    img = Image.open(io.BytesIO(data)).convert("RGB")
+    applied = {}
+
+    if rng.random() < 0.15:
+        # Upside down or sideways scans, which the orientation model has to correct
+        angle = rng.choice([90, 180, 270])
+        img = img.rotate(angle, expand=True)
+        applied["rotation"] = angle
+    elif rng.random() < 0.5:
+        angle = round(rng.uniform(-4, 4), 1)
+        img = img.rotate(angle, expand=True, fillcolor=(255, 255, 255), resample=Image.Resampling.BICUBIC)
+        applied["rotation"] = angle
+
+    if rng.random() < 0.6:
+        scale = round(rng.uniform(0.5, 1.5), 2)
+        img = img.resize((max(1, int(img.width * scale)), max(1, int(img.height * scale))), Image.Resampling.LANCZOS)
+        applied["scale"] = scale
+
+    if rng.random() < 0.4:
+        sigma = round(rng.uniform(2, 10), 1)
+        noise = np.random.default_rng(rng.getrandbits(32)).normal(0, sigma, (img.height, img.width, 3))
+        img = Image.fromarray(np.clip(np.asarray(img, dtype=np.float32) + noise, 0, 255).astype(np.uint8))
+        applied["noise_sigma"] = sigma
+
+    image_format, extension = rng.choice([("JPEG", ".jpg"), ("WEBP", ".webp"), ("PNG", ".png")])
+    quality = rng.randint(40, 90)
+    output = io.BytesIO()
+    img.save(output, format=image_format, quality=quality)
+    applied["format"] = image_format
+    if image_format != "PNG":
+        applied["quality"] = quality
+
+    return output.getvalue(), extension, applied
+
+
+# ---------------------------------
+# Claims
+# ---------------------------------
+def load_source_claims(source_dir: Path) -> list[Path]:
+    """Returns the source claim directories that have a description and a ground truth."""
+    return sorted(
+        d for d in source_dir.iterdir()
+        if d.is_dir() and d.name.startswith("claim")
+        and (d / "description.txt").exists() and (d / "answer.json").exists()
+    )
+
+
+def build_claim(source: Path, claim_dir: Path, rng: random.Random, extra_documents_rate: float) -> dict:
+    """
+    Writes a synthetic claim based on a source claim.
+
+    Returns:
+        How the claim was built, for the manifest
+    """
+    claim_dir.mkdir(parents=True)
+    shutil.copyfile(source / "answer.json", claim_dir / "answer.json")
+
+    description = (source / "description.txt").read_text(encoding="utf-8")
+    (claim_dir / "description.txt").write_text(vary_description(description, rng, f"SYN-{rng.getrandbits(32):08X}"), encoding="utf-8")
+
+    documents = []
+    images = []
+    for file in sorted(source.iterdir()):
+        if file.name in ["answer.json", "description.txt", ".DS_Store"]:
+            continue
+        if file.suffix.lower() in IMAGE_EXTENSIONS:
+            images.append(file)
+        else:
+            shutil.copyfile(file, claim_dir / file.name)
+            documents.append({"name": file.name, "source": file.name})
+
+    # Extra pages are augmented copies of the claim's own images
+    extra_images = []
+    while images and rng.random() < extra_documents_rate and len(extra_images) < 3:
+        extra_images.append(rng.choice(images))
+
+    for copy, image in enumerate(images + extra_images):
+        data, extension, augmentations = augment_image(image.read_bytes(), rng)
+        name = f"{image.stem}{f' copy {copy - len(images) + 1}' if copy >= len(images) else ''}{extension}"
+        (claim_dir / name).write_bytes(data)
+        documents.append({"name": name, "source": image.name, "augmentations": augmentations})
+
+    return {"source": source.name, "documents": documents}
+
+
+def generate_corpus(
+    source_dir: Path,
+    output_dir: Path,
+    count: int,
+    seed: int,
+    duplicate_rate: float,
+    extra_documents_rate: float,
+) -> list[dict]:
+    """
+    Generates a synthetic claim corpus.
+
+    Args:
+        source_dir: Directory with the source claims
+        output_dir: Directory to write the synthetic claims to (must not exist)
+        count: Number of claims to generate
+        seed: Seed of the generation; the same seed gives the same corpus
+        duplicate_rate: Share of claims that are exact copies of an earlier synthetic claim
+        extra_documents_rate: Chance of adding each extra image to a claim (up to 3)
+
+    Returns:
+        The manifest entry of each claim
+    """
+    sources = load_source_claims(source_dir)
+    if not sources:
+        raise ValueError(f"No claims with description.txt and answer.json found in {source_dir}")
+
+    output_dir.mkdir(parents=True)
+    rng = random.Random(seed)
+    manifest = []
+    for index in range(1, count + 1):
+        claim_dir = output_dir / f"claim {index}"
+        # Each claim gets its own generator, so its content does not depend on how earlier claims were built
+        claim_rng = random.Random(rng.getrandbits(64))
+
+        if manifest and claim_rng.random() < duplicate_rate:
+            original = claim_rng.choice([entry for entry in manifest if "duplicate_of" not in entry])
+            shutil.copytree(output_dir / original["claim"], claim_dir)
+            entry = {"claim": claim_dir.name, "duplicate_of": original["claim"], "source": original["source"]}
+        else:
+            entry = {"claim": claim_dir.name, **build_claim(claim_rng.choice(sources), claim_dir, claim_rng, extra_documents_rate)}
+
+        manifest.append(entry)
+        if index % 100 == 0:
+            print(f"  {index}/{count} claims generated")
+
+    with open(output_dir / "manifest.json", "w") as f:
+        json.dump({"seed": seed, "source": str(source_dir), "duplicate_rate": duplicate_rate, "claims": manifest}, f, indent=2)
+    return manifest
+
+
+def main():
+    project_root = Path(__file__).parent.parent
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic claim corpus from the existing claims")
+    parser.add_argument("--count", type=int, required=True, help="Number of claims to generate")
+    parser.add_argument("--output", type=Path, required=True, help="Directory to write the corpus to (must not exist)")
+    parser.add_argument("--source", type=Path, default=project_root / "data" / "claims", help="Directory with the source claims")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generation")
+    parser.add_argument("--duplicate-rate", type=float, default=0.1, help="Share of claims that are exact copies of an earlier claim")
+    parser.add_argument("--extra-documents-rate", type=float, default=0.3, help="Chance of adding each extra image to a claim (up to 3)")
+    args = parser.parse_args()
+
+    if args.output.exists():
+        print(f"✗ Error: {args.output} already exists")
+        return
+
+    manifest = generate_corpus(args.source, args.output, args.count, args.seed, args.duplicate_rate, args.extra_documents_rate)
+
+    duplicates = sum(1 for entry in manifest if "duplicate_of" in entry)
+    print(f"✓ Generated {len(manifest)} claims ({duplicates} duplicates) in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Script to generate a memory report from evaluation results profiled with --memory-profile.
+
+    python evaluation/evaluate_pipeline.py --memory-profile
+    python evaluation/memory_report.py
+
+Shows which stages and which document types drive memory, the top allocating source lines of each
+stage, and the claims with the highest peaks, to size worker memory limits.
+"""
+import json
+import argparse
+from pathlib import Path
+from datetime import datetime
+from pydantic import BaseModel
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claim_processing_pipeline.constants import DOC_TYPE_SCHEMA_MAPPING
+from claim_processing_pipeline.tracing import Span
+from evaluation_models import ClaimEvaluationResult, find_results_file, iter_results
+
+
+class MemoryStats(BaseModel):
+    runs: int
+    mean_traced_peak_mb: float
+    max_traced_peak_mb: float
+    max_peak_rss_growth_mb: float
+    max_rss_mb: float | None
+
+
+class StageMemory(MemoryStats):
+    # Source lines holding the most memory at the end of the stage, summed over its runs
+    top_allocators: list[dict]
+
+
+class DocumentTypeMemory(MemoryStats):
+    stage: str
+    document_type: str
+
+
+class ClaimMemory(BaseModel):
+    claim_id: str
+    traced_peak_mb: float
+    peak_rss_growth_mb: float
+    peak_rss_mb: float
+
+
+class MemoryReport(BaseModel):
+    profiled_claims: int
+
+    # Highest RSS the evaluation process reached
+    peak_rss_mb: float | None
+
+    stages: dict[str, StageMemory]
+    document_types: list[DocumentTypeMemory]
+    largest_claims: list[ClaimMemory]
+
+    timestamp: str
+
+
+def memory_stats(measurements: list[dict]) -> dict:
+    """Summarizes the memory measurements of several spans."""
+    peaks = [m["traced_peak_mb"] for m in measurements]
+    rss = [m["rss_mb"] for m in measurements if m.get("rss_mb") is not None]
+    return {
+        "runs": len(measurements),
+        "mean_traced_peak_mb": sum(peaks) / len(peaks),
+        "max_traced_peak_mb": max(peaks),
+        "max_peak_rss_growth_mb": max(m["peak_rss_growth_mb"] for m in measurements),
+        "max_rss_mb": max(rss) if rss else None,
+    }
+
+
+def _document_types(trace: Span) -> dict[str, str]:
+    """Returns the type of each document of a claim, as classified by the document analysis stage."""
+    types = {}
+    for s in trace.iter_spans():
+        if s.kind == "document" and "doc_type" in s.attributes:
+            schema = DOC_TYPE_SCHEMA_MAPPING.get(s.attributes["doc_type"])
+            types[s.name] = schema.__name__ if schema else "Other"
+    return types
+
+
+def generate_memory_report(results: list[ClaimEvaluationResult], top_allocators: int = 10) -> MemoryReport:
+    """
+    Generate a memory report from profiled evaluation results.
+
+    Args:
+        results: List of ClaimEvaluationResult objects
+        top_allocators: Number of allocating source lines to keep per stage
+
+    Returns:
+        MemoryReport object
+    """
+    stage_measurements: dict[str, list[dict]] = {}
+    document_measurements: dict[tuple[str, str], list[dict]] = {}
+    claims = []
+
+    for result in results:
+        if not result.trace or "memory" not in result.trace.get("attributes", {}):
+            continue
+        trace = Span(**result.trace)
+        document_types = _document_types(trace)
+
+        claim_memory = trace.attributes["memory"]
+        claims.append(ClaimMemory(
+            claim_id=result.claim_id,
+            traced_peak_mb=claim_memory["traced_peak_mb"],
+            peak_rss_growth_mb=claim_memory["peak_rss_growth_mb"],
+            peak_rss_mb=claim_memory["peak_rss_mb"],
+        ))
+
+        for stage_span in trace.children:
+            if stage_span.kind != "stage" or "memory" not in stage_span.attributes:
+                continue
+            stage_measurements.setdefault(stage_span.name, []).append(stage_span.attributes["memory"])
+
+            for s in stage_span.iter_spans():
+                if s.kind == "document" and "memory" in s.attributes:
+                    document_type = f"{document_types.get(s.name, 'Unclassified')} ({s.attributes.get('file_ext', '')})"
+                    document_measurements.setdefault((stage_span.name, document_type), []).append(s.attributes["memory"])
+
+    stages = {}
+    for stage, measurements in stage_measurements.items():
+        allocators: dict[str, dict] = {}
+        for m in measurements:
+            for allocator in m.get("top_allocators", []):
+                total = allocators.setdefault(allocator["location"], {"location": allocator["location"], "size_mb": 0.0, "count": 0})
+                total["size_mb"] += allocator["size_mb"]
+                total["count"] += allocator["count"]
+        stages[stage] = StageMemory(
+            **memory_stats(measurements),
+            top_allocators=sorted(allocators.values(), key=lambda a: a["size_mb"], reverse=True)[:top_allocators],
+        )
+
+    document_types = sorted(
+        (
+            DocumentTypeMemory(stage=stage, document_type=document_type, **memory_stats(measurements))
+            for (stage, document_type), measurements in document_measurements.items()
+        ),
+        key=lambda d: d.max_traced_peak_mb,
+        reverse=True,
+    )
+
+    return MemoryReport(
+        profiled_claims=len(claims),
+        peak_rss_mb=max((c.peak_rss_mb for c in claims), default=None),
+        stages=dict(sorted(stages.items(), key=lambda item: item[1].max_traced_peak_mb, reverse=True)),
+        document_types=document_types,
+        largest_claims=sorted(claims, key=lambda c: c.traced_peak_mb, reverse=True)[:5],
+        timestamp=datetime.now().isoformat(),
+    )
+
+
+def print_memory_report(report: MemoryReport):
+    """Print a formatted memory report to console."""
+    print("\n" + "="*80)
+    print("MEMORY REPORT")
+    print("="*80)
+    print(f"\nTimestamp: {report.timestamp}")
+    print(f"Profiled Claims: {report.profiled_claims}")
+    if report.peak_rss_mb is not None:
+        print(f"Peak Memory (RSS) of the process: {report.peak_rss_mb:.0f} MB")
+
+    print(f"\n{'Stages':-^80}")
+    print(f"{'Stage':<22}{'Runs':>6}{'Mean peak':>12}{'Max peak':>12}{'RSS growth':>13}{'Max RSS':>11}")
+    for stage, stats in report.stages.items():
+        max_rss = f"{stats.max_rss_mb:.0f} MB" if stats.max_rss_mb is not None else "-"
+        print(
+            f"{stage:<22}{stats.runs:>6}{stats.mean_traced_peak_mb:>9.1f} MB{stats.max_traced_peak_mb:>9.1f} MB"
+            f"{stats.max_peak_rss_growth_mb:>10.1f} MB{max_rss:>11}"
+        )
+
+    if report.document_types:
+        print(f"\n{'Document Types':-^80}")
+        print(f"{'Stage':<20}{'Document type':<30}{'Runs':>6}{'Mean peak':>12}{'Max peak':>12}")
+        for doc in report.document_types:
+            print(f"{doc.stage:<20}{doc.document_type:<30}{doc.runs:>6}{doc.mean_traced_peak_mb:>9.1f} MB{doc.max_traced_peak_mb:>9.1f} MB")
+
+    for stage, stats in report.stages.items():
+        if stats.top_allocators:
+            print(f"\n{f'Top Allocators: {stage}':-^80}")
+            for allocator in stats.top_allocators:
+                print(f"  {allocator['size_mb']:8.2f} MB  {allocator['count']:>8} blocks  {allocator['location']}")
+
+    if report.largest_claims:
+        print(f"\n{'Largest Claims':-^80}")
+        for claim in report.largest_claims:
+            print(
+                f"  - {claim.claim_id}: peak {claim.traced_peak_mb:.1f} MB traced, "
+                f"RSS +{claim.peak_rss_growth_mb:.1f} MB (process peak {claim.peak_rss_mb:.0f} MB)"
+            )
+
+    print("\nPeaks are Python allocations traced by tracemalloc (including numpy arrays), above the memory in use when")
+    print("the stage or document started. RSS growth also covers native memory (OCR models, image buffers).")
+    print("="*80)
+
+
+def main():
+    """Main function."""
+    project_root = Path(__file__).parent.parent
+    results_folder = project_root / "results"
+
+    parser = argparse.ArgumentParser(description="Report the memory of each stage and document type from profiled results")
+    parser.add_argument("--results", type=Path, default=find_results_file(results_folder, "evaluation_results"), help="Results file to read")
+    parser.add_argument("--output", type=Path, default=results_folder / "memory_report.json", help="File to save the report to")
+    parser.add_argument("--top-allocators", type=int, default=10, help="Allocating source lines to show per stage")
+    args = parser.parse_args()
+
+    if not args.results.exists():
+        print(f"✗ Error: {args.results} not found")
+        print("Run evaluate_pipeline.py --memory-profile first to generate results")
+        return
+
+    print(f"Loading results from: {args.results}")
+    results = [ClaimEvaluationResult(**r) for r in iter_results(args.results)]
+
+    report = generate_memory_report(results, args.top_allocators)
+    if not report.profiled_claims:
+        print("✗ Error: no memory measurements found in the results")
+        print("Run evaluate_pipeline.py with --memory-profile")
+        return
+
+    with open(args.output, 'w') as f:
+        json.dump(report.model_dump(), f, indent=2)
+
+    print_memory_report(report)
+
+    print(f"\n✓ Report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Evaluates the pipeline under several configurations (models, think on or off, prompt variants)
+and compares their accuracy, latency and token cost:
+
+    python evaluation/run_ablation.py --matrix ablation.json
+
+The configurations of a claim run one after the other and share its stage checkpoints, whose
+fingerprints include the models and prompts the stage uses. Each distinct stage output, such as the
+OCR of the documents or a triage made with the same model and prompt, is computed once, and only
+the stages that differ are rerun. A reused stage is costed with what it took when it was computed.
+
+Matrix file:
+
+    {
+      "axes": {"think": [false, true], "llm_model": ["qwen3:8b", "llama3.1:8b"]},
+      "configs": {"policy_v2": {"prompts": {"POLICY_EXPERT_PROMPT": "prompts/policy_v2.txt"}}}
+    }
+
+"axes" are expanded into every combination of their values, "configs" adds named configurations.
+Fields are those of `PipelineConfig`; prompt overrides are paths to template files, relative to the
+matrix file. The production configuration is always included, as "baseline".
+"""
+import re
+import sys
+import json
+import asyncio
+import argparse
+import itertools
+from pathlib import Path
+
+from pydantic import BaseModel
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from evaluate_pipeline import evaluate_single_claim
+from evaluation_models import ClaimEvaluationResult
+from generate_report import generate_performance_report, latency_stats
+from claim_processing_pipeline.checkpoints import StageCost
+from claim_processing_pipeline.pipeline_config import PipelineConfig, use_config
+from claim_processing_pipeline.tracing import Span
+
+
+class ConfigSummary(BaseModel):
+    name: str
+    config: PipelineConfig
+    claims: int
+    errors: int
+    accuracy: float
+    exact_accuracy: float
+
+    # Cost of a claim: every stage it needed, whether computed in this run or reused
+    mean_stage_seconds: float | None
+    p95_stage_seconds: float | None
+    llm_calls_per_claim: float | None
+    prompt_tokens_per_claim: float | None
+    completion_tokens_per_claim: float | None
+
+    # Stage outputs computed for this configuration, and shared with a configuration evaluated before it
+    stages_computed: int
+    stages_reused: int
+
+
+# ---------------------------------
+# Matrix
+# ---------------------------------
+def _label(value) -> str:
+    if isinstance(value, dict):
+        return "+".join(f"{name}:{Path(str(path)).stem}" for name, path in value.items()) or "default"
+    return str(value).lower() if isinstance(value, bool) else str(value)
+
+
+def _load_config(overrides: dict, base_dir: Path) -> PipelineConfig:
+    prompts = {
+        name: (base_dir / path).read_text(encoding="utf-8")
+        for name, path in overrides.get("prompts", {}).items()
+    }
+    return PipelineConfig(**{**overrides, "prompts": prompts})
+
+
+def load_matrix(matrix_file: Path) -> dict[str, PipelineConfig]:
+    """
+    Reads the configurations to compare from a matrix file (see the module docstring).
+
+    Returns:
+        The configurations by name, the production one ("baseline") first
+    """
+    with open(matrix_file, "r") as f:
+        matrix = json.load(f)
+
+    configs = {"baseline": PipelineConfig()}
+
+    axes = matrix.get("axes", {})
+    for values in itertools.product(*axes.values()):
+        overrides = dict(zip(axes, values))
+        name = ",".join(f"{field}={_label(value)}" for field, value in overrides.items())
+        configs[name] = _load_config(overrides, matrix_file.parent)
+
+    for name, overrides in matrix.get("configs", {}).items():
+        configs[name] = _load_config(overrides, matrix_file.parent)
+
+    # Drop configurations identical to an earlier one (an axis value equal to the default, for example)
+    unique = {}
+    for name, config in configs.items():
+        if config not in unique.values():
+            unique[name] = config
+    return unique
+
+
+# ---------------------------------
+# Evaluation
+# ---------------------------------
+def claim_cost(result: ClaimEvaluationResult) -> StageCost | None:
+    """Adds up the cost of every stage of a claim, including the stages reused from checkpoints."""
+    if result.error is not None or not result.trace:
+        return None
+
+    total = StageCost()
+    for s in Span(**result.trace).iter_spans():
+        if s.kind == "stage" and "cost" in s.attributes:
+            cost = StageCost(**s.attributes["cost"])
+            total.seconds += cost.seconds
+            total.llm_calls += cost.llm_calls
+            total.prompt_tokens += cost.prompt_tokens
+            total.completion_tokens += cost.completion_tokens
+    return total
+
+
+def _results_file(results_dir: Path, name: str) -> Path:
+    file_name = re.sub(r"[^\w.=,+-]+", "_", name)
+    return results_dir / f"{file_name}.jsonl"
+
+
+async def run_ablation(
+    claims_dir: Path,
+    configs: dict[str, PipelineConfig],
+    checkpoint_dir: Path,
+    results_dir: Path,
+    concurrency: int = 1,
+    claim_timeout: float | None = None
+) -> dict[str, list[ClaimEvaluationResult]]:
+    """
+    Evaluates every claim under every configuration.
+
+    Up to `concurrency` claims run at the same time; the configurations of a claim run one after
+    the other, so each stage output they have in common is computed by the first one and reused
+    by the others. The results of each configuration are appended to its own JSONL file.
+
+    Args:
+        claims_dir: Path to directory containing claim folders
+        configs: Configurations to evaluate, by name
+        checkpoint_dir: Directory to keep the stage checkpoints in; reused across runs
+        results_dir: Directory to write the results of each configuration to
+        concurrency: Maximum number of claims evaluated at the same time
+        claim_timeout: Seconds after which a claim is cancelled and counted as an error
+
+    Returns:
+        The results of each configuration, in claim order
+    """
+    claim_dirs = sorted([d for d in claims_dir.iterdir() if d.is_dir() and d.name.startswith("claim")])
+    print(f"Found {len(claim_dirs)} claims, {len(configs)} configurations ({concurrency} claims at a time)")
+
+    results_dir.mkdir(parents=True, exist_ok=True)
+    for name in configs:
+        _results_file(results_dir, name).unlink(missing_ok=True)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    results = {name: [None] * len(claim_dirs) for name in configs}
+
+    async def evaluate(index: int, claim_dir: Path):
+        async with semaphore:
+            for name, config in configs.items():
+                with use_config(config):
+                    results[name][index] = await evaluate_single_claim(
+                        claim_dir,
+                        _results_file(results_dir, name),
+                        claim_timeout,
+                        checkpoint_dir,
+                        keep_checkpoint_variants=True
+                    )
+
+    await asyncio.gather(*(evaluate(index, claim_dir) for index, claim_dir in enumerate(claim_dirs)))
+    return results
+
+
+def summarize_config(name: str, config: PipelineConfig, results: list[ClaimEvaluationResult]) -> ConfigSummary:
+    """Summarizes the accuracy and cost of a configuration."""
+    report = generate_performance_report(results)
+    costs = [cost for cost in map(claim_cost, results) if cost is not None]
+    seconds = latency_stats([cost.seconds for cost in costs]) if costs else None
+    statuses = [status for r in results if r.metrics for status in r.metrics.stage_status.values()]
+
+    return ConfigSummary(
+        name=name,
+        config=config,
+        claims=report.total_claims,
+        errors=report.failed_evaluations,
+        accuracy=report.accuracy,
+        exact_accuracy=report.exact_accuracy,
+        mean_stage_seconds=seconds.mean if seconds else None,
+        p95_stage_seconds=seconds.p95 if seconds else None,
+        llm_calls_per_claim=sum(cost.llm_calls for cost in costs) / len(costs) if costs else None,
+        prompt_tokens_per_claim=sum(cost.prompt_tokens for cost in costs) / len(costs) if costs else None,
+        completion_tokens_per_claim=sum(cost.completion_tokens for cost in costs) / len(costs) if costs else None,
+        stages_computed=statuses.count("computed"),
+        stages_reused=statuses.count("reused"),
+    )
+
+
+def print_comparison(summaries: list[ConfigSummary]):
+    """Print the comparison table of the configurations."""
+    def number(value: float | None, fmt: str) -> str:
+        return "-" if value is None else format(value, fmt)
+
+    width = max(len("Configuration"), *(len(s.name) for s in summaries)) + 2
+
+    print("\n" + "="*(width + 78))
+    print("ABLATION RESULTS")
+    print("="*(width + 78))
+    print(
+        f"{'Configuration':<{width}}{'Accuracy':>10}{'Exact':>8}{'Errors':>8}"
+        f"{'Mean s':>9}{'p95 s':>9}{'Calls':>7}{'Prompt tok':>12}{'Compl. tok':>12}{'Computed':>10}"
+    )
+    for s in summaries:
+        print(
+            f"{s.name:<{width}}{s.accuracy:>10.2%}{s.exact_accuracy:>8.2%}{s.errors:>8}"
+            f"{number(s.mean_stage_seconds, '.2f'):>9}{number(s.p95_stage_seconds, '.2f'):>9}"
+            f"{number(s.llm_calls_per_claim, '.1f'):>7}{number(s.prompt_tokens_per_claim, '.0f'):>12}"
+            f"{number(s.completion_tokens_per_claim, '.0f'):>12}"
+            f"{f'{s.stages_computed}/{s.stages_computed + s.stages_reused}':>10}"
+        )
+
+    computed = sum(s.stages_computed for s in summaries)
+    reused = sum(s.stages_reused for s in summaries)
+    print(f"\nSeconds and tokens are per claim, counting the stages reused from another configuration.")
+    print(f"Stage outputs computed: {computed}, shared between configurations or runs: {reused}")
+    print("="*(width + 78))
+
+
+async def main():
+    """Main ablation function."""
+    project_root = Path(__file__).parent.parent
+    results_folder = project_root / "results" / "ablation"
+
+    parser = argparse.ArgumentParser(description="Compare the accuracy and cost of several pipeline configurations")
+    parser.add_argument("--matrix", type=Path, required=True, help="JSON file with the configurations to compare")
+    parser.add_argument("--claims-dir", type=Path, default=project_root / "data" / "claims", help="Directory containing the claim folders")
+    parser.add_argument("--checkpoint-dir", type=Path, default=results_folder / "checkpoints", help="Directory to keep the shared stage checkpoints in")
+    parser.add_argument("--concurrency", type=int, default=1, help="Maximum number of claims evaluated at the same time")
+    parser.add_argument("--claim-timeout", type=float, default=None, help="Seconds after which a claim is counted as an error")
+    parser.add_argument("--output", type=Path, default=results_folder / "ablation_report.json", help="Save the comparison as JSON")
+    args = parser.parse_args()
+
+    configs = load_matrix(args.matrix)
+    for name in configs:
+        print(f"  - {name}")
+
+    results = await run_ablation(
+        args.claims_dir, configs, args.checkpoint_dir, results_folder, args.concurrency, args.claim_timeout
+    )
+    summaries = [summarize_config(name, configs[name], results[name]) for name in configs]
+
+    print_comparison(summaries)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump([summary.model_dump() for summary in summaries], f, indent=2)
+    print(f"\n✓ Comparison saved to: {args.output}")
+    print(f"✓ Results of each configuration saved to: {results_folder}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
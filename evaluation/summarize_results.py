@@ -7,6 +7,8 @@ from pathlib import Path
 from typing import Literal
 from pydantic import BaseModel
 
+from evaluation_models import find_results_file, iter_results
+
 
 class SummarizedResult(BaseModel):
     claim_id: str
@@ -25,16 +27,12 @@ def summarize_results(input_file: Path, output_file: Path):
     Create a summarized version of evaluation results.
     
     Args:
-        input_file: Path to full evaluation results JSON
+        input_file: Path to full evaluation results (JSONL, or legacy JSON)
         output_file: Path to save summarized results JSON
     """
-    # Load full results
-    with open(input_file, 'r') as f:
-        full_results = json.load(f)
-    
-    # Extract key fields
+    # Extract key fields, reading the full results one at a time
     summarized = []
-    for result in full_results:
+    for result in iter_results(input_file):
         summary = SummarizedResult(
             claim_id=result["claim_id"],
             claim_description=result["claim_description"],
@@ -48,6 +46,9 @@ def summarize_results(input_file: Path, output_file: Path):
         )
         summarized.append(summary.model_dump())
     
+    # Results are saved as claims finish
+    summarized.sort(key=lambda summary: summary["claim_id"])
+
     # Save summarized results
     with open(output_file, 'w') as f:
         json.dump(summarized, f, indent=2)
@@ -61,7 +62,7 @@ def main():
     project_root = Path(__file__).parent.parent
     results_folder = project_root / "results"
     
-    input_file = results_folder / "evaluation_results.json"
+    input_file = find_results_file(results_folder, "evaluation_results")
     output_file = results_folder / "evaluation_results_summary.json"
     
     if not input_file.exists():
@@ -4,6 +4,7 @@ Test evaluation on a single claim for debugging.
 Usage:
     python scripts/test_single_claim.py 1
     python scripts/test_single_claim.py 8
+    python scripts/test_single_claim.py 8 --memory-profile
 """
 import asyncio
 import json
@@ -13,6 +14,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from evaluate_pipeline import evaluate_single_claim
+from claim_processing_pipeline.memory_profile import enable_memory_profiling
 
 
 async def main():
@@ -25,6 +27,9 @@ async def main():
         sys.exit(1)
     
     claim_number = sys.argv[1]
+    if "--memory-profile" in sys.argv[2:]:
+        # Memory of each stage and document, summarized by memory_report.py --results results/test_single_result.jsonl
+        enable_memory_profiling()
     
     project_root = Path(__file__).parent.parent
     claim_dir = project_root / "data" / "claims" / f"claim {claim_number}"
@@ -39,7 +44,7 @@ async def main():
         sys.exit(1)
     
     results_folder = project_root / "results"
-    results_file = results_folder / "test_single_result.json"
+    results_file = results_folder / "test_single_result.jsonl"
 
     if not results_folder.is_dir():
         results_folder.mkdir(parents=True)
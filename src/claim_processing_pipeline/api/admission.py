@@ -0,0 +1,62 @@
+import math
+import logging
+
+from fastapi import HTTPException, Request
+
+from claim_processing_pipeline.api.jobs import worker_pool
+from claim_processing_pipeline.config import Settings
+
+logger = logging.getLogger(__name__)
+
+settings = Settings.get_settings()
+
+# Bounds of the Retry-After estimate, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 600
+
+
+def client_id(request: Request) -> str:
+    """Identifies the submitting client by its X-Client-Id header, or its address."""
+    return request.headers.get("x-client-id") or (request.client.host if request.client else "unknown")
+
+
+def _retry_after(excess: int) -> int:
+    """Estimates how long it takes the workers to drain `excess` claims at the recent throughput."""
+    throughput = worker_pool.work_queue.throughput()
+    if not throughput:
+        return settings.ADMISSION_RETRY_AFTER_SECONDS
+    return min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, math.ceil(excess / throughput)))
+
+
+def check_admission(client: str):
+    """
+    Rejects a submission with 429 Too Many Requests when the claim backlog is full, overall or for the client.
+
+    The check runs before the documents are stored or any processing is queued. It is not atomic
+    with the enqueue, so concurrent submissions can overshoot the limits slightly.
+
+    Args:
+        client: Client identifier, see `client_id`
+
+    Raises:
+        HTTPException: 429 with a Retry-After header when saturated
+    """
+    if settings.MAX_PENDING_CLAIMS:
+        pending = worker_pool.work_queue.pending()
+        if pending >= settings.MAX_PENDING_CLAIMS:
+            logger.warning(f"Rejecting claim from {client}: {pending} claims pending")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many claims pending, retry later",
+                headers={"Retry-After": str(_retry_after(pending - settings.MAX_PENDING_CLAIMS + 1))},
+            )
+
+    if settings.MAX_PENDING_CLAIMS_PER_CLIENT:
+        pending = worker_pool.work_queue.pending(client)
+        if pending >= settings.MAX_PENDING_CLAIMS_PER_CLIENT:
+            logger.warning(f"Rejecting claim from {client}: client quota reached with {pending} claims pending")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many of your claims pending, retry later",
+                headers={"Retry-After": str(_retry_after(pending - settings.MAX_PENDING_CLAIMS_PER_CLIENT + 1))},
+            )
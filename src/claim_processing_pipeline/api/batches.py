@@ -0,0 +1,257 @@
+import re
+import uuid
+import base64
+import shutil
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, ValidationError
+
+from claim_processing_pipeline.api.admission import check_admission, client_id
+from claim_processing_pipeline.api.idempotency import claim_content_hash, find_existing_claim
+from claim_processing_pipeline.api.jobs import publish_status, worker_pool
+from claim_processing_pipeline.api.models import BatchClaimResult, BatchReport, ClaimResponse
+from claim_processing_pipeline.api.storage import load_claim, save_claims
+from claim_processing_pipeline.api.uploads import StoredUpload
+from claim_processing_pipeline.config import Settings
+from claim_processing_pipeline.constants import CLAIMS_STORAGE_DIR, SUPPORTED_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batches", tags=["batches"])
+
+settings = Settings.get_settings()
+
+BATCHES_DIR = CLAIMS_STORAGE_DIR / "_batches"
+
+# Claims are stored and queued in groups of this size
+BATCH_FLUSH_SIZE = 50
+
+BATCH_ID_PATTERN = re.compile(r"[A-Za-z0-9_.-]{1,128}")
+
+
+class BatchDocument(BaseModel):
+    filename: str
+    # File bytes, base64-encoded
+    content: str
+
+
+class BatchClaim(BaseModel):
+    # Partner identifier of the claim, unique within the batch
+    external_id: str
+    description: str
+    metadata: str | None = None
+    documents: list[BatchDocument] = []
+
+
+async def _iter_lines(request: Request, max_line_bytes: int) -> AsyncIterator[bytes]:
+    """
+    Splits the streamed request body into lines, holding at most one line in memory.
+    Lines are not split further, so a line is rejected with 413 once it exceeds `max_line_bytes`.
+    """
+    buffer = bytearray()
+    async for chunk in request.stream():
+        buffer.extend(chunk)
+        while (newline := buffer.find(b"\n")) != -1:
+            line = bytes(buffer[:newline])
+            del buffer[:newline + 1]
+            yield line
+        if len(buffer) > max_line_bytes:
+            raise HTTPException(status_code=413, detail=f"Manifest line longer than {max_line_bytes} bytes")
+    if buffer:
+        yield bytes(buffer)
+
+
+def _write_documents(claim_dir: Path, documents: list[BatchDocument]) -> list[StoredUpload]:
+    """Decodes and stores the documents of a claim, enforcing the upload size limits."""
+    claim_dir.mkdir(parents=True, exist_ok=True)
+    uploads = []
+    claim_bytes = 0
+    for document in documents:
+        filename = Path(document.filename).name
+        if Path(filename).suffix.lower() not in SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Unsupported file type: {document.filename}")
+
+        content = base64.b64decode(document.content, validate=True)
+        claim_bytes += len(content)
+        if len(content) > settings.MAX_UPLOAD_FILE_BYTES or claim_bytes > settings.MAX_UPLOAD_CLAIM_BYTES:
+            raise ValueError(f"Upload too large: {document.filename}")
+
+        path = claim_dir / filename
+        path.write_bytes(content)
+        uploads.append(StoredUpload(path=str(path), size=len(content), sha256=hashlib.sha256(content).hexdigest()))
+    return uploads
+
+
+def _append_results(batch_id: str, results: list[BatchClaimResult]):
+    BATCHES_DIR.mkdir(exist_ok=True)
+    with open(BATCHES_DIR / f"{batch_id}.jsonl", "a") as f:
+        for result in results:
+            f.write(result.model_dump_json() + "\n")
+
+
+def _load_results(batch_id: str) -> list[BatchClaimResult] | None:
+    results_file = BATCHES_DIR / f"{batch_id}.jsonl"
+    if not results_file.exists():
+        return None
+    with open(results_file, "r") as f:
+        return [BatchClaimResult.model_validate_json(line) for line in f if line.strip()]
+
+
+def _report(batch_id: str, results: list[BatchClaimResult]) -> BatchReport:
+    return BatchReport(
+        batch_id=batch_id,
+        accepted=sum(result.status == "accepted" for result in results),
+        duplicates=sum(result.status == "duplicate" for result in results),
+        rejected=sum(result.status == "rejected" for result in results),
+        results=results,
+    )
+
+
+async def _ingest_claim(
+    batch_id: str,
+    line: int,
+    claim: BatchClaim,
+    accepted_claim_ids: set[str],
+) -> tuple[BatchClaimResult, ClaimResponse | None]:
+    """
+    Stores the documents of a manifest claim and builds its record, unless it was already ingested.
+
+    Args:
+        batch_id: Batch the claim belongs to
+        line: Line of the claim in the manifest
+        claim: Claim read from the line
+        accepted_claim_ids: Claims accepted so far by this upload, including those not stored yet
+    """
+    claim_id = str(uuid.uuid4())
+    claim_dir = CLAIMS_STORAGE_DIR / claim_id
+    try:
+        uploads = await asyncio.to_thread(_write_documents, claim_dir, claim.documents)
+        content_hash = claim_content_hash(claim.description, claim.metadata, uploads)
+        existing_claim_id = await asyncio.to_thread(
+            find_existing_claim, claim_id, content_hash, f"batch:{batch_id}:{claim.external_id}"
+        )
+    except BaseException:
+        await asyncio.to_thread(shutil.rmtree, claim_dir, ignore_errors=True)
+        raise
+
+    if existing_claim_id:
+        await asyncio.to_thread(shutil.rmtree, claim_dir, ignore_errors=True)
+        # An earlier line of this upload with the same content is accepted but not stored until its group is flushed
+        if existing_claim_id in accepted_claim_ids or await asyncio.to_thread(load_claim, existing_claim_id):
+            return BatchClaimResult(line=line, external_id=claim.external_id, claim_id=existing_claim_id, status="duplicate"), None
+
+        # Registered by another upload still storing it, or by one that failed before storing it
+        # (its registration is released once its lease expires, see `ClaimStore.resolve_keys`)
+        error = "An identical claim is being ingested by another upload, send the batch again later"
+        return BatchClaimResult(line=line, external_id=claim.external_id, status="rejected", error=error), None
+
+    record = ClaimResponse(
+        claim_id=claim_id,
+        status="queued",
+        created_at=datetime.now().isoformat(),
+        description=claim.description,
+        metadata=claim.metadata,
+        documents=[upload.path for upload in uploads],
+        document_hashes={upload.path: upload.sha256 for upload in uploads},
+        content_hash=content_hash,
+    )
+    return BatchClaimResult(line=line, external_id=claim.external_id, claim_id=claim_id, status="accepted"), record
+
+
+@router.post("/{batch_id}", response_model=BatchReport)
+async def ingest_batch(batch_id: str, request: Request):
+    """
+    Ingest a batch of claims from an NDJSON manifest: one JSON object per line with `external_id`,
+    `description`, optional `metadata` and `documents` (`filename` and base64 `content`).
+
+    The manifest is streamed: claims are stored as they are read, and queued in groups. Admission is
+    checked before each group, and once the claim backlog is full the upload stops with 429 after
+    queueing the groups read so far.
+    Re-sending a batch (e.g. after an interrupted or rejected upload) skips the claims already ingested,
+    reported as duplicates, so an interrupted batch is resumed by sending it again.
+
+    Each line is held in memory while its claim is parsed and its documents decoded, so a line may be
+    at most the claim upload limit, base64-encoded, plus 1 MB for the rest of the claim.
+    """
+    if not BATCH_ID_PATTERN.fullmatch(batch_id):
+        raise HTTPException(status_code=400, detail="batch_id may only contain letters, digits, '-', '_' and '.'")
+
+    client = client_id(request)
+
+    results: list[BatchClaimResult] = []
+    pending: list[tuple[BatchClaimResult, ClaimResponse | None]] = []
+    seen_external_ids: set[str] = set()
+    accepted_claim_ids: set[str] = set()
+
+    async def flush():
+        records = [record for _, record in pending if record]
+        if records:
+            await asyncio.to_thread(save_claims, [record.model_dump() for record in records])
+            await worker_pool.submit_many([record.claim_id for record in records], client)
+            for record in records:
+                publish_status(record)
+        batch_results = [result for result, _ in pending]
+        await asyncio.to_thread(_append_results, batch_id, batch_results)
+        results.extend(batch_results)
+        pending.clear()
+
+    # A line holds one claim, with its documents base64-encoded (4 bytes for every 3)
+    max_line_bytes = settings.MAX_UPLOAD_CLAIM_BYTES * 4 // 3 + 1024 * 1024
+    line_number = 0
+    try:
+        async for line in _iter_lines(request, max_line_bytes):
+            line_number += 1
+            if not line.strip():
+                continue
+
+            if not pending:
+                # The claims of the previous groups are queued: stop here if the backlog is full
+                try:
+                    await asyncio.to_thread(check_admission, client)
+                except HTTPException as e:
+                    raise HTTPException(
+                        status_code=e.status_code,
+                        detail=f"{e.detail}: stopped before line {line_number}, send the batch again to resume",
+                        headers=e.headers,
+                    )
+
+            claim = None
+            try:
+                claim = BatchClaim.model_validate_json(line)
+                if claim.external_id in seen_external_ids:
+                    raise ValueError(f"Duplicate external_id in batch: {claim.external_id}")
+                seen_external_ids.add(claim.external_id)
+                result, record = await _ingest_claim(batch_id, line_number, claim, accepted_claim_ids)
+                if record:
+                    accepted_claim_ids.add(record.claim_id)
+                pending.append((result, record))
+            except (ValidationError, ValueError, HTTPException) as e:
+                error = e.detail if isinstance(e, HTTPException) else str(e)
+                external_id = claim.external_id if claim else None
+                pending.append((BatchClaimResult(line=line_number, external_id=external_id, status="rejected", error=error), None))
+
+            if len(pending) >= BATCH_FLUSH_SIZE:
+                await flush()
+    finally:
+        # Claims read before an interrupted upload are kept, so re-sending the batch resumes it
+        await flush()
+
+    logger.info(f"Batch {batch_id}: ingested {line_number} line(s)")
+    return _report(batch_id, results)
+
+
+@router.get("/{batch_id}", response_model=BatchReport)
+async def get_batch(batch_id: str):
+    """
+    Per-claim results of all uploads of a batch, in ingestion order.
+    """
+    results = await asyncio.to_thread(_load_results, batch_id) if BATCH_ID_PATTERN.fullmatch(batch_id) else None
+    if results is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return _report(batch_id, results)
@@ -0,0 +1,352 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class ClaimStore(ABC):
+    """Storage of claim records (the `ClaimResponse` of each claim, as a dict)."""
+
+    @abstractmethod
+    def save_claim(self, claim_id: str, claim_data: dict):
+        """Insert or replace a claim."""
+
+    def save_claims(self, claims: list[dict]):
+        """Insert or replace several claims at once."""
+        for claim_data in claims:
+            self.save_claim(claim_data["claim_id"], claim_data)
+
+    @abstractmethod
+    def load_claim(self, claim_id: str) -> dict | None:
+        """Load a claim, or None if it does not exist."""
+
+    @abstractmethod
+    def list_claims(
+        self,
+        status: str | None = None,
+        decision: str | None = None,
+        created_from: str | None = None,
+        created_to: str | None = None,
+        after: tuple[str, str] | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """
+        List claims, newest first.
+
+        Args:
+            status: Only claims with this status
+            decision: Only claims with this decision
+            created_from: Only claims created at or after this ISO timestamp
+            created_to: Only claims created before this ISO timestamp
+            after: (created_at, claim_id) of the last claim of the previous page; only claims listed after it
+            limit: Maximum number of claims returned
+        """
+
+    @abstractmethod
+    def resolve_keys(self, keys: list[str], claim_id: str, content_hash: str, registration_lease: float) -> tuple[str, str]:
+        """
+        Finds the claim a submission belongs to from its deduplication keys, registering new keys.
+
+        The first key already registered decides the owning claim; otherwise the submission owns the
+        keys itself. Keys not registered yet are registered for the owning claim, unless the owner was
+        submitted with different content (a reused idempotency key), in which case nothing is registered.
+
+        Keys are registered before the claim is stored. Keys of a claim still not stored once the
+        registration lease has expired were left by a submission that failed in between: they are
+        released, and the submission registers them for itself.
+
+        Args:
+            keys: Deduplication keys of the submission, most specific first
+            claim_id: Id the submission gets if it is new
+            content_hash: Hash of the submitted content
+            registration_lease: Seconds a registered claim has to be stored before its keys are released
+
+        Returns:
+            (claim_id, content_hash) of the owning claim
+        """
+
+    def flush(self):
+        """Persist writes the store may be holding back."""
+
+
+class FileClaimStore(ClaimStore):
+    """
+    One `claim.json` per claim directory. Listing opens every claim file,
+    so it only suits small deployments.
+    """
+
+    def __init__(self, storage_dir: Path):
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+
+    def save_claim(self, claim_id: str, claim_data: dict):
+        claim_dir = self.storage_dir / claim_id
+        claim_dir.mkdir(exist_ok=True)
+        # Write atomically, so concurrent readers never see a partial file
+        tmp_path = claim_dir / "claim.json.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(claim_data, f, indent=2)
+        tmp_path.replace(claim_dir / "claim.json")
+
+    def load_claim(self, claim_id: str) -> dict | None:
+        claim_file = self.storage_dir / claim_id / "claim.json"
+        if not claim_file.exists():
+            return None
+
+        with open(claim_file, 'r') as f:
+            return json.load(f)
+
+    def list_claims(
+        self,
+        status: str | None = None,
+        decision: str | None = None,
+        created_from: str | None = None,
+        created_to: str | None = None,
+        after: tuple[str, str] | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        claims = []
+        for claim_dir in self.storage_dir.iterdir():
+            if claim_dir.is_dir():
+                claim_file = claim_dir / "claim.json"
+                if claim_file.exists():
+                    try:
+                        with open(claim_file, 'r') as f:
+                            claims.append(json.load(f))
+                    except Exception as e:
+                        logger.error(f"Error loading claim from {claim_file}: {e}")
+
+        claims = [
+            claim for claim in claims
+            if (status is None or claim.get("status") == status)
+            and (decision is None or claim.get("decision") == decision)
+            and (created_from is None or claim["created_at"] >= created_from)
+            and (created_to is None or claim["created_at"] < created_to)
+            and (after is None or (claim["created_at"], claim["claim_id"]) < after)
+        ]
+        claims.sort(key=lambda claim: (claim["created_at"], claim["claim_id"]), reverse=True)
+        return claims[:limit] if limit is not None else claims
+
+    def resolve_keys(self, keys: list[str], claim_id: str, content_hash: str, registration_lease: float) -> tuple[str, str]:
+        # Each key is registered atomically, but not the set of keys of a submission
+        keys_dir = self.storage_dir / "_keys"
+        keys_dir.mkdir(exist_ok=True)
+        key_files = [keys_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.json" for key in keys]
+
+        owner = (claim_id, content_hash)
+        for key_file in key_files:
+            try:
+                registered_at = key_file.stat().st_mtime
+                with open(key_file, 'r') as f:
+                    registered = tuple(json.load(f))
+            except FileNotFoundError:
+                continue
+            if time.time() - registered_at > registration_lease and not (self.storage_dir / registered[0] / "claim.json").exists():
+                logger.warning(f"Releasing the keys of claim {registered[0]}, never stored")
+                try:
+                    # Renaming first, so only one of concurrent submissions releases the key
+                    stale_path = key_file.with_suffix(f".{uuid.uuid4().hex}.stale")
+                    os.rename(key_file, stale_path)
+                    stale_path.unlink()
+                except FileNotFoundError:
+                    pass
+                continue
+            owner = registered
+            break
+        if owner[1] != content_hash:
+            return owner
+
+        for key_file in key_files:
+            tmp_path = key_file.with_suffix(f".{uuid.uuid4().hex}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(list(owner), f)
+            try:
+                # Linking fails if the key was registered in the meantime
+                os.link(tmp_path, key_file)
+            except FileExistsError:
+                pass
+            finally:
+                tmp_path.unlink()
+        return owner
+
+
+class SQLiteClaimStore(ClaimStore):
+    """
+    Claims stored in a SQLite database (WAL mode), indexed by creation date, status and decision.
+
+    Updates of running claims (per-stage progress) are held back and written together every
+    `flush_interval` seconds. Any other update is written immediately, along with the pending
+    ones, so status transitions are never lost. Reads see pending updates.
+    """
+
+    def __init__(self, db_path: Path, flush_interval: float = 0.2):
+        self.db_path = Path(db_path)
+        self.flush_interval = flush_interval
+        self._pending: dict[str, dict] = {}
+        self._lock = threading.RLock()
+        self._flush_timer: threading.Timer | None = None
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS claims (
+                    claim_id TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    decision TEXT,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS claims_created_at ON claims (created_at, claim_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS claims_status ON claims (status, created_at, claim_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS claims_decision ON claims (decision, created_at, claim_id)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS claim_keys (
+                    key TEXT PRIMARY KEY,
+                    claim_id TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _write(self, claims: list[dict]):
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO claims (claim_id, created_at, status, decision, data, updated_at) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (claim_id) DO UPDATE SET
+                    created_at = excluded.created_at, status = excluded.status, decision = excluded.decision,
+                    data = excluded.data, updated_at = excluded.updated_at
+                """,
+                [
+                    (claim["claim_id"], claim["created_at"], claim["status"], claim.get("decision"), json.dumps(claim), now)
+                    for claim in claims
+                ],
+            )
+
+    def save_claim(self, claim_id: str, claim_data: dict):
+        with self._lock:
+            self._pending[claim_id] = claim_data
+            if claim_data.get("status") != "running":
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def save_claims(self, claims: list[dict]):
+        with self._lock:
+            self.flush()
+            self._write(claims)
+
+    def flush(self):
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._pending:
+                self._write(list(self._pending.values()))
+                self._pending = {}
+
+    def load_claim(self, claim_id: str) -> dict | None:
+        with self._lock:
+            if claim_id in self._pending:
+                return self._pending[claim_id]
+
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM claims WHERE claim_id = ?", (claim_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _is_stored(self, conn: sqlite3.Connection, claim_id: str) -> bool:
+        with self._lock:
+            if claim_id in self._pending:
+                return True
+        return conn.execute("SELECT 1 FROM claims WHERE claim_id = ?", (claim_id,)).fetchone() is not None
+
+    def resolve_keys(self, keys: list[str], claim_id: str, content_hash: str, registration_lease: float) -> tuple[str, str]:
+        with self._connect() as conn:
+            # Take the write lock up front so concurrent duplicates resolve to the same claim
+            conn.execute("BEGIN IMMEDIATE")
+            owner = (claim_id, content_hash)
+            for key in keys:
+                row = conn.execute("SELECT claim_id, content_hash, created_at FROM claim_keys WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    continue
+                if time.time() - row[2] > registration_lease and not self._is_stored(conn, row[0]):
+                    logger.warning(f"Releasing the keys of claim {row[0]}, never stored")
+                    conn.execute("DELETE FROM claim_keys WHERE claim_id = ?", (row[0],))
+                    continue
+                owner = tuple(row[:2])
+                break
+            if owner[1] != content_hash:
+                return owner
+
+            conn.executemany(
+                "INSERT OR IGNORE INTO claim_keys (key, claim_id, content_hash, created_at) VALUES (?, ?, ?, ?)",
+                [(key, *owner, time.time()) for key in keys],
+            )
+        return owner
+
+    def list_claims(
+        self,
+        status: str | None = None,
+        decision: str | None = None,
+        created_from: str | None = None,
+        created_to: str | None = None,
+        after: tuple[str, str] | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        self.flush()
+
+        # Keyset pagination: every page is an index range scan, however deep the client pages
+        conditions, params = [], []
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if decision is not None:
+            conditions.append("decision = ?")
+            params.append(decision)
+        if created_from is not None:
+            conditions.append("created_at >= ?")
+            params.append(created_from)
+        if created_to is not None:
+            conditions.append("created_at < ?")
+            params.append(created_to)
+        if after is not None:
+            conditions.append("(created_at, claim_id) < (?, ?)")
+            params.extend(after)
+
+        query = "SELECT data FROM claims"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY created_at DESC, claim_id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [json.loads(data) for data, in rows]
@@ -0,0 +1,123 @@
+import json
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from typing import AsyncIterator
+
+from claim_processing_pipeline.config import Settings
+from claim_processing_pipeline.constants import CLAIMS_STORAGE_DIR
+
+logger = logging.getLogger(__name__)
+
+settings = Settings.get_settings()
+
+# Claim statuses after which no more events are published until the claim is re-queued
+TERMINAL_STATUSES = {"processed", "failed"}
+
+# Subscribers waiting for new events of a claim in this process
+_subscribers: dict[str, set[asyncio.Event]] = defaultdict(set)
+
+
+def _events_file(claim_id: str):
+    return CLAIMS_STORAGE_DIR / claim_id / "events.jsonl"
+
+
+def publish_event(claim_id: str, event: str, data: dict):
+    """
+    Appends an event to the claim's event log and wakes up its subscribers in this process.
+    Subscribers in other processes (e.g. the API, when the claim runs in a worker process) pick it up by polling the log.
+
+    Args:
+        claim_id: Claim the event belongs to
+        event: Event type ("status" or "progress")
+        data: JSON-serializable event payload
+    """
+    append_events(claim_id, [(event, data)])
+    notify_subscribers(claim_id)
+
+
+def append_events(claim_id: str, events: list[tuple[str, dict]]):
+    """
+    Appends (event type, payload) pairs to the claim's event log, without waking up its subscribers.
+    Can run in a worker thread; call `notify_subscribers` from the event loop afterwards.
+    """
+    events_file = _events_file(claim_id)
+    if not events_file.parent.exists():
+        return
+    with open(events_file, "a") as f:
+        f.writelines(json.dumps({"event": event, "data": data}) + "\n" for event, data in events)
+
+
+def notify_subscribers(claim_id: str):
+    """Wakes up the subscribers of a claim in this process to read its new events."""
+    for wakeup in _subscribers.get(claim_id, ()):
+        wakeup.set()
+
+
+def reset_events(claim_id: str):
+    """Clears the event log of a claim before it is processed again."""
+    _events_file(claim_id).unlink(missing_ok=True)
+
+
+def _read_events(claim_id: str, offset: int) -> tuple[list[tuple[int, dict]], int]:
+    """
+    Reads the complete events written after the given byte offset.
+
+    Returns:
+        The (offset after the event, event) pairs, and the offset to resume reading from
+    """
+    events_file = _events_file(claim_id)
+    if not events_file.exists():
+        return [], 0
+
+    with open(events_file, "rb") as f:
+        if offset > f.seek(0, 2):
+            # The log was reset since the last read
+            offset = 0
+        f.seek(offset)
+        events = []
+        for line in f:
+            if not line.endswith(b"\n"):
+                # Event still being written
+                break
+            offset += len(line)
+            events.append((offset, json.loads(line)))
+    return events, offset
+
+
+async def stream_events(claim_id: str, last_event_id: int = 0) -> AsyncIterator[str]:
+    """
+    Streams the events of a claim as Server-Sent Events, from the start of its event log or after
+    `last_event_id` when a client reconnects. The stream ends once the claim is processed or failed.
+
+    Event ids are byte offsets in the event log, so a reconnecting client resumes exactly where it stopped.
+    """
+    wakeup = asyncio.Event()
+    _subscribers[claim_id].add(wakeup)
+    offset = 0
+    last_sent = time.monotonic()
+    try:
+        while True:
+            wakeup.clear()
+            events, offset = await asyncio.to_thread(_read_events, claim_id, offset)
+            for event_id, event in events:
+                # Events the client already received are replayed silently, only to learn whether the claim is done
+                if event_id > last_event_id:
+                    yield f"id: {event_id}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+                    last_sent = time.monotonic()
+                if event["event"] == "status" and event["data"].get("status") in TERMINAL_STATUSES:
+                    return
+
+            if time.monotonic() - last_sent > settings.EVENTS_KEEPALIVE_SECONDS:
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=settings.EVENTS_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _subscribers[claim_id].discard(wakeup)
+        if not _subscribers[claim_id]:
+            del _subscribers[claim_id]
@@ -0,0 +1,60 @@
+import json
+import hashlib
+import logging
+from pathlib import Path
+
+from fastapi import HTTPException
+
+from claim_processing_pipeline.api.storage import resolve_claim_keys
+from claim_processing_pipeline.api.uploads import StoredUpload
+from claim_processing_pipeline.config import Settings
+
+logger = logging.getLogger(__name__)
+
+settings = Settings.get_settings()
+
+
+def claim_content_hash(description: str, metadata: str | None, uploads: list[StoredUpload]) -> str:
+    """
+    Hashes everything the pipeline reads from a submission: the description, the metadata,
+    and the name and bytes of each document (names end up in the prompts).
+    """
+    content = [description, metadata or "", [[Path(upload.path).name, upload.sha256] for upload in uploads]]
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()
+
+
+def find_existing_claim(claim_id: str, content_hash: str, idempotency_key: str | None) -> str | None:
+    """
+    Checks whether a submission repeats an earlier one, by its Idempotency-Key header and,
+    if DEDUPLICATE_CLAIMS is enabled, by its content. A new submission registers its keys.
+
+    Keys are registered before the claim is stored, so the earlier claim may have no record yet
+    while its submission is in progress (see `ClaimStore.resolve_keys` for failed submissions).
+
+    Args:
+        claim_id: Id given to the submission
+        content_hash: Hash of the submitted content
+        idempotency_key: Idempotency-Key header of the request, if any
+
+    Returns:
+        Id of the earlier claim, or None if the submission is new
+
+    Raises:
+        HTTPException: 422 if the idempotency key was used for a submission with different content
+    """
+    keys = []
+    if idempotency_key:
+        keys.append(f"idempotency:{idempotency_key}")
+    if settings.DEDUPLICATE_CLAIMS:
+        keys.append(f"content:{content_hash}")
+    if not keys:
+        return None
+
+    owner_id, owner_hash = resolve_claim_keys(keys, claim_id, content_hash)
+    if owner_hash != content_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different claim submission")
+    if owner_id == claim_id:
+        return None
+
+    logger.info(f"Submission is a duplicate of claim {owner_id}")
+    return owner_id
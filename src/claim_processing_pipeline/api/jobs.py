@@ -0,0 +1,257 @@
+import os
+import socket
+import asyncio
+import logging
+
+from claim_processing_pipeline.api.events import append_events, notify_subscribers, publish_event
+from claim_processing_pipeline.api.models import ClaimResponse
+from claim_processing_pipeline.api.storage import load_claim, save_claim, save_trace
+from claim_processing_pipeline.config import Settings
+from claim_processing_pipeline.constants import CLAIMS_STORAGE_DIR, WORK_QUEUE_DB
+from claim_processing_pipeline.pipeline import run_claim_processing_pipeline
+from claim_processing_pipeline.progress import ProgressEvent
+from claim_processing_pipeline.work_queue import Lease, SQLiteWorkQueue
+
+logger = logging.getLogger(__name__)
+
+settings = Settings.get_settings()
+
+
+# How often each process deletes the finished jobs older than JOB_RETENTION_SECONDS from the queue
+PRUNE_INTERVAL_SECONDS = 3600.0
+
+
+def _status_event(claim: ClaimResponse) -> tuple[str, dict]:
+    return "status", claim.model_dump(include={"status", "decision", "explanation", "error"})
+
+
+def publish_status(claim: ClaimResponse):
+    """Publish the current status of a claim to its event stream."""
+    publish_event(claim.claim_id, *_status_event(claim))
+
+
+def _save_progress(claim_id: str, claim_data: dict, events: list[tuple[str, dict]]):
+    append_events(claim_id, events)
+    save_claim(claim_id, claim_data)
+
+
+async def _save_status(claim: ClaimResponse):
+    """Store a claim and publish its status, writing both in a worker thread."""
+    await asyncio.to_thread(_save_progress, claim.claim_id, claim.model_dump(), [_status_event(claim)])
+    notify_subscribers(claim.claim_id)
+
+
+async def _update_claim(claim_id: str, **fields):
+    """Update fields of a stored claim and publish its new status."""
+    claim_data = await asyncio.to_thread(load_claim, claim_id)
+    if claim_data:
+        await _save_status(ClaimResponse(**{**claim_data, **fields}))
+
+
+class _ProgressRecorder:
+    """
+    Progress callback of a running claim. Events are persisted (event log and per-stage status)
+    in a worker thread, so the pipeline never waits on storage; events arriving while a write is
+    in progress are written together by the next one.
+    """
+
+    def __init__(self, claim: ClaimResponse):
+        self.claim = claim
+        self._events: list[ProgressEvent] = []
+        self._writer: asyncio.Task | None = None
+
+    def __call__(self, event: ProgressEvent):
+        self._events.append(event)
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write())
+
+    async def _write(self):
+        while self._events:
+            events, self._events = self._events, []
+            for event in events:
+                if event.document is None and event.status != "decided":
+                    self.claim.stages[event.stage] = event.status
+            try:
+                await asyncio.to_thread(
+                    _save_progress,
+                    self.claim.claim_id,
+                    self.claim.model_dump(),
+                    [("progress", event.model_dump(exclude_none=True)) for event in events],
+                )
+            except Exception as e:
+                logger.error(f"Failed to save the progress of claim {self.claim.claim_id}: {e}")
+            notify_subscribers(self.claim.claim_id)
+
+    async def flush(self):
+        """Waits until every event received so far is persisted."""
+        if self._writer is not None:
+            await asyncio.shield(self._writer)
+
+
+async def process_claim_job(claim_id: str):
+    """
+    Runs the pipeline for a stored claim, persisting its status and per-stage progress as it goes.
+    Pipeline errors are raised to the caller, which decides whether the claim is retried.
+    """
+    claim_data = await asyncio.to_thread(load_claim, claim_id)
+    if not claim_data:
+        logger.error(f"Claim {claim_id} not found, dropping job")
+        return
+
+    claim = ClaimResponse(**claim_data)
+    claim.status = "running"
+    claim.stages = {}
+    claim.error = None
+    await _save_status(claim)
+
+    progress = _ProgressRecorder(claim)
+    try:
+        pipeline_result = await run_claim_processing_pipeline(
+            claim_id,
+            claim.description,
+            claim.documents,
+            claim.metadata or "",
+            checkpoint_dir=CLAIMS_STORAGE_DIR / claim_id / "stages",
+            on_progress=progress,
+        )
+    finally:
+        # Progress written late would overwrite the final status
+        await progress.flush()
+
+    claim.status = "processed"
+    claim.decision = pipeline_result.decision
+    claim.explanation = pipeline_result.explanation
+    claim.llm_usage = pipeline_result.llm_usage.model_dump()
+    # The trace is stored first, so it is available once the claim shows as processed
+    await asyncio.to_thread(save_trace, claim_id, pipeline_result.trace)
+    await _save_status(claim)
+    logger.info(f"Claim {claim_id} processed: {claim.decision}")
+
+
+class ClaimWorkerPool:
+    """
+    Bounded pool of background workers running the pipeline for claims in the work queue.
+
+    Workers lease claims from the durable queue, heartbeat while the pipeline runs and
+    record the outcome. The same pool runs inside the API process and in standalone
+    worker processes (see `claim_processing_pipeline.worker`), which all share the queue.
+    """
+
+    def __init__(self, num_workers: int, work_queue: SQLiteWorkQueue | None = None):
+        self.num_workers = num_workers
+        # Opened by `start` unless given, so importing the API does not touch the database
+        self.work_queue = work_queue
+        self._name = f"{socket.gethostname()}-{os.getpid()}"
+        self._workers: list[asyncio.Task] = []
+        self._pruner: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+    async def submit(self, claim_id: str, client_id: str | None = None):
+        """Add a stored claim to the work queue."""
+        await asyncio.to_thread(self.work_queue.enqueue, claim_id, client_id)
+        self._wakeup.set()
+
+    async def submit_many(self, claim_ids: list[str], client_id: str | None = None):
+        """Add several stored claims to the work queue at once."""
+        await asyncio.to_thread(self.work_queue.enqueue_many, claim_ids, client_id)
+        self._wakeup.set()
+
+    def queue_depth(self) -> dict[str, int]:
+        return self.work_queue.depth()
+
+    async def start(self):
+        """Open the work queue if needed and start the workers."""
+        if self.work_queue is None:
+            self.work_queue = await asyncio.to_thread(open_work_queue)
+        self._workers = [asyncio.create_task(self._worker(f"{self._name}-{idx}")) for idx in range(self.num_workers)]
+        self._pruner = asyncio.create_task(self._prune_finished_jobs())
+        logger.info(f"Started {self.num_workers} claim worker(s)")
+
+    async def stop(self):
+        """Stop the workers. Claims they were processing are released back to the queue."""
+        tasks = [*self._workers, self._pruner] if self._pruner else self._workers
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._pruner = None
+
+    async def _prune_finished_jobs(self):
+        """Periodically delete the finished jobs kept longer than JOB_RETENTION_SECONDS."""
+        while True:
+            try:
+                pruned = await asyncio.to_thread(self.work_queue.prune, settings.JOB_RETENTION_SECONDS)
+                if pruned:
+                    logger.info(f"Pruned {pruned} finished job(s) from the work queue")
+            except Exception as e:
+                logger.error(f"Failed to prune the work queue: {e}")
+            await asyncio.sleep(PRUNE_INTERVAL_SECONDS)
+
+    async def _worker(self, worker_name: str):
+        while True:
+            lease = await asyncio.to_thread(self.work_queue.lease, worker_name)
+            if lease is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.WORKER_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            logger.info(f"Worker {worker_name} processing claim {lease.claim_id} (attempt {lease.attempts})")
+            await self._run_leased(lease)
+
+    async def _run_leased(self, lease: Lease):
+        """Process a leased claim, keeping the lease alive and recording the outcome in the queue."""
+        if lease.attempts > self.work_queue.max_attempts:
+            # The lease expired on the last attempt (e.g. the worker crashed), give up
+            error = "Processing did not complete within the maximum number of attempts"
+            await asyncio.to_thread(self.work_queue.fail, lease, error)
+            await _update_claim(lease.claim_id, status="failed", error=error)
+            return
+
+        job = asyncio.create_task(process_claim_job(lease.claim_id))
+        heartbeat = asyncio.create_task(self._heartbeat(lease, job))
+        try:
+            await job
+        except asyncio.CancelledError:
+            if heartbeat.done():
+                # The heartbeat cancelled the job: another worker owns the claim now
+                logger.warning(f"Lost the lease on claim {lease.claim_id}, abandoning it")
+                return
+            # The worker itself is shutting down: let the job unwind, then hand the claim back
+            job.cancel()
+            await asyncio.wait([job])
+            await asyncio.to_thread(self.work_queue.release, lease)
+            await _update_claim(lease.claim_id, status="queued")
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.exception(f"Pipeline failed for claim {lease.claim_id}")
+            retrying = await asyncio.to_thread(self.work_queue.fail, lease, error)
+            await _update_claim(lease.claim_id, status="queued" if retrying else "failed", error=error)
+        else:
+            await asyncio.to_thread(self.work_queue.complete, lease)
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, lease: Lease, job: asyncio.Task):
+        """Extend the lease periodically; cancel the job if the lease is lost to another worker."""
+        while True:
+            await asyncio.sleep(self.work_queue.visibility_timeout / 3)
+            if not await asyncio.to_thread(self.work_queue.heartbeat, lease):
+                job.cancel()
+                return
+
+
+def open_work_queue() -> SQLiteWorkQueue:
+    """Open the work queue shared by the API and the worker processes."""
+    return SQLiteWorkQueue(
+        WORK_QUEUE_DB,
+        visibility_timeout=settings.JOB_VISIBILITY_TIMEOUT_SECONDS,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+# Its work queue is opened when the API starts (see `main.lifespan`)
+worker_pool = ClaimWorkerPool(settings.CLAIM_WORKERS)
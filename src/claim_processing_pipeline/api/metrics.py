@@ -0,0 +1,41 @@
+import asyncio
+
+from fastapi import APIRouter
+
+from claim_processing_pipeline.api.jobs import worker_pool
+from claim_processing_pipeline.api.models import QueueMetrics
+from claim_processing_pipeline.config import Settings
+from claim_processing_pipeline.llm_usage import LLMUsageSummary, process_llm_usage
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+settings = Settings.get_settings()
+
+
+@router.get("/llm-usage", response_model=LLMUsageSummary)
+async def get_llm_usage():
+    """
+    LLM token counts and timings accumulated by this process, by stage, model and call.
+    """
+    return process_llm_usage()
+
+
+def _queue_metrics() -> QueueMetrics:
+    work_queue = worker_pool.work_queue
+    pending = work_queue.pending()
+    return QueueMetrics(
+        jobs=work_queue.depth(),
+        pending=pending,
+        max_pending=settings.MAX_PENDING_CLAIMS,
+        utilization=pending / settings.MAX_PENDING_CLAIMS if settings.MAX_PENDING_CLAIMS else None,
+        throughput_per_minute=work_queue.throughput() * 60,
+        oldest_queued_seconds=work_queue.oldest_queued_age(),
+    )
+
+
+@router.get("/queue", response_model=QueueMetrics)
+async def get_queue_metrics():
+    """
+    Depth of the claim work queue, admission capacity in use, throughput and queueing delay.
+    """
+    return await asyncio.to_thread(_queue_metrics)
@@ -1,12 +1,67 @@
 from pydantic import BaseModel
 from typing import Literal
 
+ClaimStatus = Literal["queued", "running", "processed", "failed"]
+
+
 class ClaimResponse(BaseModel):
     claim_id: str
-    status: str
+    status: ClaimStatus
     created_at: str
     description: str
     metadata: str | None = None
     documents: list[str] = []
+    # SHA-256 of each document, by path
+    document_hashes: dict[str, str] = {}
+    # SHA-256 of the description, metadata and documents, used to deduplicate submissions
+    content_hash: str | None = None
     decision: Literal["APPROVE", "DENY", "UNCERTAIN"] | None = None
-    explanation: str | None
+    explanation: str | None = None
+    # Progress of each pipeline stage: running, computed, reused, failed or cancelled
+    stages: dict[str, str] = {}
+    error: str | None = None
+    llm_usage: dict | None = None
+
+
+class ClaimAccepted(BaseModel):
+    claim_id: str
+    status: ClaimStatus
+    message: str
+    status_url: str
+
+
+class ClaimPage(BaseModel):
+    # Claims, newest first, limited to the requested fields
+    items: list[dict]
+    # Pass as `cursor` to get the next page; None on the last page
+    next_cursor: str | None = None
+
+
+class QueueMetrics(BaseModel):
+    # Jobs in the work queue by state (queued, leased, done, dead)
+    jobs: dict[str, int]
+    # Claims queued or being processed, and the admission limit (0 when unlimited)
+    pending: int
+    max_pending: int
+    utilization: float | None = None
+    # Claims completed per minute over the last 10 minutes
+    throughput_per_minute: float
+    oldest_queued_seconds: float | None = None
+
+
+class BatchClaimResult(BaseModel):
+    # Line of the claim in the manifest (1-based)
+    line: int
+    external_id: str | None = None
+    claim_id: str | None = None
+    # accepted: stored and queued, duplicate: already ingested (or submitted), rejected: see error
+    status: Literal["accepted", "duplicate", "rejected"]
+    error: str | None = None
+
+
+class BatchReport(BaseModel):
+    batch_id: str
+    accepted: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    results: list[BatchClaimResult] = []
@@ -1,68 +1,55 @@
-from curses import meta
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Literal
+import asyncio
+import base64
+import hashlib
+import shutil
 import uuid
 import json
+import logging
 from pathlib import Path
 
-from claim_processing_pipeline.api.models import ClaimResponse
-from claim_processing_pipeline.constants import CLAIMS_STORAGE_DIR
-from claim_processing_pipeline.pipeline import run_claim_processing_pipeline
+from claim_processing_pipeline.api.models import ClaimResponse, ClaimAccepted, ClaimPage, ClaimStatus
+from claim_processing_pipeline.api.storage import save_claim, load_claim, load_trace, query_claims
+from claim_processing_pipeline.api.events import reset_events, stream_events
+from claim_processing_pipeline.api.admission import check_admission, client_id
+from claim_processing_pipeline.api.idempotency import claim_content_hash, find_existing_claim
+from claim_processing_pipeline.api.jobs import publish_status, worker_pool
+from claim_processing_pipeline.api.uploads import save_upload
+from claim_processing_pipeline.config import Settings
+from claim_processing_pipeline.constants import CLAIMS_STORAGE_DIR, SUPPORTED_EXTENSIONS
+from claim_processing_pipeline.tracing import Span, to_chrome_trace
 
-router = APIRouter(prefix="/claims", tags=["claims"])
-
-
-# Supported file extensions
-SUPPORTED_EXTENSIONS = {'.md', '.png', '.jpg', '.jpeg', '.webp', '.txt'}
-
-CLAIMS_STORAGE_DIR.mkdir(exist_ok=True)
+logger = logging.getLogger(__name__)
 
+router = APIRouter(prefix="/claims", tags=["claims"])
 
-def _save_claim(claim_id: str, claim_data: dict):
-    """Save a claim to disk."""
-    claim_dir = CLAIMS_STORAGE_DIR / claim_id
-    claim_dir.mkdir(exist_ok=True)
-
-    claim_file = claim_dir / "claim.json"
-    with open(claim_file, 'w') as f:
-        json.dump(claim_data, f, indent=2)
+settings = Settings.get_settings()
 
 
-def _load_claim(claim_id: str) -> dict | None:
-    """Load a claim from disk."""
-    claim_file = CLAIMS_STORAGE_DIR / claim_id / "claim.json"
-    if not claim_file.exists():
-        return None
-    
-    with open(claim_file, 'r') as f:
-        return json.load(f)
-
-
-def _list_all_claims() -> list[dict]:
-    """List all claims from disk."""
-    claims = []
-    for claim_dir in CLAIMS_STORAGE_DIR.iterdir():
-        if claim_dir.is_dir():
-            claim_file = claim_dir / "claim.json"
-            if claim_file.exists():
-                try:
-                    with open(claim_file, 'r') as f:
-                        claims.append(json.load(f))
-                except Exception as e:
-                    print(f"Error loading claim from {claim_file}: {e}")
-    return claims
-
-
-@router.post("/", response_model=dict)
+@router.post("/", response_model=ClaimAccepted, status_code=202)
 async def submit_claim(
+    request: Request,
+    response: Response,
     description: str = Form(..., description="Text description of the incident"),
     metadata: str | None = Form(None, description="General metadata as text (optional)"),
     files: list[UploadFile] = File(default=[], description="Supporting documents (.md, .png, .jpg, .jpeg, .webp)"),
+    idempotency_key: str | None = Header(None, description="Client-chosen key making retries of this submission safe"),
 ):
     """
     Submit a new claim with supporting documents and metadata.
+    The claim is stored and queued for processing; poll GET /claims/{claim_id} for its status.
+
+    Repeating a submission (same Idempotency-Key, or same description, metadata and documents)
+    returns the earlier claim with a 200 instead of processing it again.
+    Returns 429 with a Retry-After header while too many claims are pending.
     """
+    client = client_id(request)
+    await asyncio.to_thread(check_admission, client)
+
     claim_id = str(uuid.uuid4())
     
     # Validate file types
@@ -78,62 +65,207 @@ async def submit_claim(
     # Create claim directory
     claim_dir = CLAIMS_STORAGE_DIR / claim_id
     claim_dir.mkdir(parents=True, exist_ok=True)
-    print(f"Created claim directory: {claim_dir.absolute()}")
+    logger.info(f"Created claim directory: {claim_dir}")
     
-    # Save uploaded files to claim directory
-    document_paths = []
-    for file in files:
-        if file.filename:
-            file_path = claim_dir / file.filename
-            content = await file.read()
-            with open(file_path, "wb") as f:
-                f.write(content)
-            document_paths.append(str(file_path))
-            print(f"Saved file: {file_path}")
+    # Stream uploaded files to the claim directory, enforcing the size limits as they arrive
+    uploads = []
+    claim_bytes = 0
+    try:
+        for file in files:
+            if file.filename:
+                max_bytes = min(settings.MAX_UPLOAD_FILE_BYTES, settings.MAX_UPLOAD_CLAIM_BYTES - claim_bytes)
+                upload = await save_upload(file, claim_dir / Path(file.filename).name, max_bytes)
+                claim_bytes += upload.size
+                uploads.append(upload)
+    except BaseException:
+        await asyncio.to_thread(shutil.rmtree, claim_dir, ignore_errors=True)
+        raise
 
-    # Run pipeline
-    pipeline_result = await run_claim_processing_pipeline(claim_id, description, document_paths, metadata)
+    # Return the earlier claim if this submission is a retry or a duplicate
+    content_hash = claim_content_hash(description, metadata, uploads)
+    try:
+        existing_claim_id = await asyncio.to_thread(find_existing_claim, claim_id, content_hash, idempotency_key)
+    except BaseException:
+        await asyncio.to_thread(shutil.rmtree, claim_dir, ignore_errors=True)
+        raise
+    if existing_claim_id:
+        await asyncio.to_thread(shutil.rmtree, claim_dir, ignore_errors=True)
+        existing_claim = await asyncio.to_thread(load_claim, existing_claim_id)
+        # The earlier submission may still be storing its record
+        existing_status = existing_claim["status"] if existing_claim else "queued"
+        response.status_code = 200
+        return ClaimAccepted(
+            claim_id=existing_claim_id,
+            status=existing_status,
+            message="Duplicate submission, returning the existing claim",
+            status_url=f"/claims/{existing_claim_id}",
+        )
 
-    # Create claim record with pipeline results
+    # Create claim record
     claim = ClaimResponse(
         claim_id=claim_id,
-        status="processed",
+        status="queued",
         created_at= datetime.now().isoformat(),
         description=description,
         metadata=metadata,
-        documents=document_paths,
-        decision=pipeline_result.decision,
-        explanation=pipeline_result.explanation,
+        documents=[upload.path for upload in uploads],
+        document_hashes={upload.path: upload.sha256 for upload in uploads},
+        content_hash=content_hash,
     )
     
-    # Save claim result to disk
-    _save_claim(claim_id, claim.model_dump())
+    # Save claim to disk and queue it for the background workers
+    await asyncio.to_thread(save_claim, claim_id, claim.model_dump())
+    publish_status(claim)
+    await worker_pool.submit(claim_id, client)
     
-    return {
-        "claim_id": claim_id,
-        "status": "processed",
-        "message": "Claim processed successfully",
-        "decision": pipeline_result.decision,
-        "explanation": pipeline_result.explanation,
-    }
+    return ClaimAccepted(
+        claim_id=claim_id,
+        status="queued",
+        message="Claim accepted for processing",
+        status_url=f"/claims/{claim_id}",
+    )
+
+
+@router.post("/{claim_id}/reprocess", response_model=ClaimAccepted, status_code=202)
+async def reprocess_claim(claim_id: str, request: Request):
+    """
+    Re-decide a stored claim, rerunning only the pipeline stages whose inputs, code or model changed.
+    The claim is queued again; its stages report "reused" or "computed" once processed.
+    """
+    claim_data = await asyncio.to_thread(load_claim, claim_id)
+    if not claim_data:
+        raise HTTPException(status_code=404, detail="Claim not found")
+
+    claim = ClaimResponse(**claim_data)
+    if claim.status in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Claim is already {claim.status}")
+
+    client = client_id(request)
+    await asyncio.to_thread(check_admission, client)
+
+    claim.status = "queued"
+    await asyncio.to_thread(save_claim, claim_id, claim.model_dump())
+    await asyncio.to_thread(reset_events, claim_id)
+    publish_status(claim)
+    await worker_pool.submit(claim_id, client)
+
+    return ClaimAccepted(
+        claim_id=claim_id,
+        status="queued",
+        message="Claim queued for reprocessing",
+        status_url=f"/claims/{claim_id}",
+    )
+
+
+@router.get("/{claim_id}/events")
+async def get_claim_events(claim_id: str, last_event_id: int = Header(0)):
+    """
+    Stream the progress of a claim as Server-Sent Events until it is processed or failed.
+
+    `status` events report claim status changes (with the decision once processed), and `progress`
+    events report stage and per-document transitions, including early decisions such as a DENY
+    for an out of scope claim. Reconnecting clients send the Last-Event-ID header to resume.
+    """
+    if not await asyncio.to_thread(load_claim, claim_id):
+        raise HTTPException(status_code=404, detail="Claim not found")
+
+    return StreamingResponse(
+        stream_events(claim_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{claim_id}/trace", response_model=dict)
+async def get_claim_trace(claim_id: str, format: Literal["tree", "chrome"] = "tree"):
+    """
+    Retrieve the per-stage timing trace of the last pipeline run of a claim.
+    Use format=chrome for the Chrome Trace Event format (open it in Perfetto or speedscope).
+    """
+    trace = await asyncio.to_thread(load_trace, claim_id)
+    if not trace:
+        raise HTTPException(status_code=404, detail="Trace not found")
+
+    if format == "chrome":
+        return to_chrome_trace(Span.model_validate(trace))
+    return trace
 
 
 @router.get("/{claim_id}", response_model=ClaimResponse)
 async def get_claim(claim_id: str):
     """
-    Retrieve a specific claim by ID.
+    Retrieve a specific claim by ID, including its status (queued, running, processed or failed)
+    and the progress of each pipeline stage.
     """
-    claim_data = _load_claim(claim_id)
+    claim_data = await asyncio.to_thread(load_claim, claim_id)
     if not claim_data:
         raise HTTPException(status_code=404, detail="Claim not found")
     
     return ClaimResponse(**claim_data)
 
 
-@router.get("/", response_model=list[ClaimResponse])
-async def list_claims():
+def _encode_cursor(claim: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps([claim["created_at"], claim["claim_id"]]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        created_at, claim_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(created_at), str(claim_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _created_at_bound(value: datetime | None) -> str | None:
+    """Converts a date filter to the format of the stored created_at (local time, no timezone)."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat()
+
+
+@router.get("/", response_model=ClaimPage)
+async def list_claims(
+    status: ClaimStatus | None = Query(None, description="Only claims with this status"),
+    decision: Literal["APPROVE", "DENY", "UNCERTAIN"] | None = Query(None, description="Only claims with this decision"),
+    created_from: datetime | None = Query(None, description="Only claims created at or after this date"),
+    created_to: datetime | None = Query(None, description="Only claims created before this date"),
+    fields: str | None = Query(None, description="Comma-separated fields to return (e.g. claim_id,status,decision). Defaults to all"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of claims per page"),
+    if_none_match: str | None = Header(None),
+):
     """
-    List all processed claims.
+    List claims, newest first, one page at a time.
+    Responses carry an ETag; send it back in If-None-Match to get a 304 when the page did not change.
     """
-    claims = _list_all_claims()
-    return [ClaimResponse(**claim) for claim in claims]
+    projection = None
+    if fields:
+        projection = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = projection - set(ClaimResponse.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        projection.add("claim_id")
+
+    # Fetch one extra claim to know whether there is a next page
+    claims = await asyncio.to_thread(
+        query_claims,
+        status=status,
+        decision=decision,
+        created_from=_created_at_bound(created_from),
+        created_to=_created_at_bound(created_to),
+        after=_decode_cursor(cursor) if cursor else None,
+        limit=limit + 1,
+    )
+    page = ClaimPage(
+        items=[ClaimResponse(**claim).model_dump(include=projection) for claim in claims[:limit]],
+        next_cursor=_encode_cursor(claims[limit - 1]) if len(claims) > limit else None,
+    )
+
+    response = JSONResponse(page.model_dump(), headers={"Cache-Control": "no-cache"})
+    etag = f'"{hashlib.sha256(response.body).hexdigest()[:32]}"'
+    if if_none_match and etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    response.headers["ETag"] = etag
+    return response
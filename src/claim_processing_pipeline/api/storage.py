@@ -0,0 +1,75 @@
+import os
+import json
+import atexit
+import logging
+
+from claim_processing_pipeline.api.claim_store import ClaimStore, FileClaimStore, SQLiteClaimStore
+from claim_processing_pipeline.config import Settings
+from claim_processing_pipeline.constants import CLAIMS_DB, CLAIMS_STORAGE_DIR
+
+logger = logging.getLogger(__name__)
+
+settings = Settings.get_settings()
+
+CLAIMS_STORAGE_DIR.mkdir(exist_ok=True)
+
+
+def get_claim_store() -> ClaimStore:
+    """Return the claim store selected by the CLAIM_STORE setting."""
+    if settings.CLAIM_STORE == "file":
+        return FileClaimStore(CLAIMS_STORAGE_DIR)
+    return SQLiteClaimStore(CLAIMS_DB, flush_interval=settings.CLAIM_STORE_FLUSH_INTERVAL_SECONDS)
+
+
+claim_store = get_claim_store()
+atexit.register(claim_store.flush)
+
+
+def _write_json(path, data):
+    """Write JSON atomically, so concurrent readers never see a partial file."""
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def save_claim(claim_id: str, claim_data: dict):
+    """Save a claim."""
+    claim_store.save_claim(claim_id, claim_data)
+
+
+def save_claims(claims: list[dict]):
+    """Save several claims at once."""
+    claim_store.save_claims(claims)
+
+
+def load_claim(claim_id: str) -> dict | None:
+    """Load a claim."""
+    return claim_store.load_claim(claim_id)
+
+
+def resolve_claim_keys(keys: list[str], claim_id: str, content_hash: str) -> tuple[str, str]:
+    """Find the claim owning the deduplication keys of a submission. See `ClaimStore.resolve_keys`."""
+    return claim_store.resolve_keys(keys, claim_id, content_hash, settings.CLAIM_REGISTRATION_LEASE_SECONDS)
+
+
+def save_trace(claim_id: str, trace: dict | None):
+    """Save the tracing span tree of the last pipeline run of a claim."""
+    if trace is None:
+        return
+    _write_json(CLAIMS_STORAGE_DIR / claim_id / "trace.json", trace)
+
+
+def load_trace(claim_id: str) -> dict | None:
+    """Load the tracing span tree of a claim."""
+    trace_file = CLAIMS_STORAGE_DIR / claim_id / "trace.json"
+    if not trace_file.exists():
+        return None
+
+    with open(trace_file, 'r') as f:
+        return json.load(f)
+
+
+def query_claims(**filters) -> list[dict]:
+    """List claims, newest first. See `ClaimStore.list_claims` for the filters."""
+    return claim_store.list_claims(**filters)
@@ -0,0 +1,61 @@
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import HTTPException, UploadFile
+from pydantic import BaseModel
+
+from claim_processing_pipeline.constants import UPLOAD_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class StoredUpload(BaseModel):
+    path: str
+    size: int
+    sha256: str
+
+
+def _write_chunk(f: BinaryIO, digest, chunk: bytes):
+    f.write(chunk)
+    digest.update(chunk)
+
+
+async def save_upload(file: UploadFile, destination: Path, max_bytes: int) -> StoredUpload:
+    """
+    Streams an upload to disk in fixed-size chunks, hashing it on the way.
+    Disk writes run in a worker thread so large uploads do not stall the event loop.
+
+    Args:
+        file: Uploaded file
+        destination: Path to write the file to
+        max_bytes: Maximum number of bytes accepted for this file
+
+    Returns:
+        Where the file was stored, with its size and SHA-256 digest
+
+    Raises:
+        HTTPException: 413 as soon as the upload exceeds max_bytes (the partial file is removed)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    f = await asyncio.to_thread(open, destination, "wb")
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Upload too large: {file.filename} exceeds the {max_bytes} bytes allowed for it",
+                )
+            await asyncio.to_thread(_write_chunk, f, digest, chunk)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(destination.unlink, missing_ok=True)
+        raise
+    await asyncio.to_thread(f.close)
+
+    logger.info(f"Saved file: {destination} ({size} bytes)")
+    return StoredUpload(path=str(destination), size=size, sha256=digest.hexdigest())
@@ -0,0 +1,290 @@
+import os
+import json
+import asyncio
+import inspect
+import hashlib
+import importlib.util
+import logging
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Awaitable, Callable, Literal, TypeVar
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from claim_processing_pipeline.experts import (
+    applicable_policy_section,
+    document_analyser,
+    document_processor,
+    fraud_detector,
+    policy_reasoner,
+)
+from claim_processing_pipeline.constants import (
+    DOC_TYPE_SCHEMA_MAPPING,
+    ORIENTATION_MODEL,
+    OCR_LANG,
+)
+from claim_processing_pipeline.pipeline_config import current_config
+from claim_processing_pipeline.schemas import DocReport, ProcessedDoc
+from claim_processing_pipeline import schemas, utils
+from claim_processing_pipeline.tracing import Span, span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+StageStatus = Literal["computed", "reused"]
+
+
+class StageCost(BaseModel):
+    """What computing a stage took. Kept with its checkpoint, so a reused stage can still be costed."""
+    seconds: float = 0.0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @classmethod
+    def from_span(cls, stage_span: Span) -> "StageCost":
+        """Measures a stage from its span and the LLM calls recorded under it."""
+        cost = cls(seconds=stage_span.duration)
+        for s in stage_span.iter_spans():
+            if s.kind == "model" and "prompt_tokens" in s.attributes:
+                cost.llm_calls += 1
+                cost.prompt_tokens += s.attributes["prompt_tokens"]
+                cost.completion_tokens += s.attributes["completion_tokens"]
+        return cost
+
+
+class StageCheckpoint(BaseModel):
+    stage: str
+    fingerprint: str
+    created_at: str
+    output: Any
+    cost: StageCost | None = None
+
+
+# ---------------------------------
+# Fingerprints
+# ---------------------------------
+def fingerprint(*parts: Any) -> str:
+    """Returns a stable hash of the given JSON-serializable parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def code_version(module: ModuleType) -> str:
+    """Returns a hash of a module's source code, so code changes invalidate its checkpoints."""
+    return hashlib.sha256(inspect.getsource(module).encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def source_version(module_name: str) -> str:
+    """Same as code_version, without importing the module (and its heavy dependencies)."""
+    spec = importlib.util.find_spec(module_name)
+    return hashlib.sha256(Path(spec.origin).read_bytes()).hexdigest()
+
+
+def file_digest(filename: str) -> str:
+    """Returns the sha256 of a file's content, or "missing" if it cannot be read."""
+    digest = hashlib.sha256()
+    try:
+        with open(filename, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    except OSError:
+        return "missing"
+    return digest.hexdigest()
+
+
+def triage_fingerprint(claim_description: str) -> str:
+    return fingerprint(
+        "triage",
+        claim_description,
+        current_config().prompt("IDENTIFY_POLICY_SECTION_PROMPT"),
+        code_version(applicable_policy_section),
+        code_version(utils),
+        [current_config().llm_model, current_config().think],
+    )
+
+
+def documents_fingerprint(filenames: list[str]) -> str:
+    return fingerprint(
+        "process_documents",
+        [(filename, file_digest(filename)) for filename in filenames],
+        code_version(document_processor),
+        source_version("claim_processing_pipeline.experts.ocr"),
+        [ORIENTATION_MODEL, OCR_LANG],
+    )
+
+
+def analysis_fingerprint(processed_docs: list[ProcessedDoc]) -> str:
+    return fingerprint(
+        "analyse_documents",
+        [doc.model_dump(exclude={"id"}) for doc in processed_docs],
+        current_config().prompt("DOC_TYPE_PROMPT"),
+        current_config().prompt("ANALYSE_DOCUMENTS_PROMPT"),
+        code_version(document_analyser),
+        code_version(schemas),
+        code_version(utils),
+        [current_config().llm_model, current_config().think],
+    )
+
+
+def fraud_fingerprint(analysed_docs: list[DocReport]) -> str:
+    return fingerprint(
+        "fraud_detection",
+        [doc.model_dump(exclude={"id"}, mode="json") for doc in analysed_docs],
+        current_config().prompt("SIGNATURE_DETECTION_PROMPT"),
+        code_version(fraud_detector),
+        code_version(utils),
+        current_config().vlm_model,
+    )
+
+
+def decision_fingerprint(
+    claim_description: str,
+    analysed_docs: list[DocReport],
+    policy_context: str,
+    metadata: str,
+) -> str:
+    return fingerprint(
+        "decision",
+        claim_description,
+        metadata or "",
+        policy_context,
+        [doc.model_dump(exclude={"id"}, mode="json") for doc in analysed_docs],
+        current_config().prompt("POLICY_EXPERT_PROMPT"),
+        code_version(policy_reasoner),
+        code_version(utils),
+        [current_config().llm_model, current_config().think],
+    )
+
+
+# ---------------------------------
+# Serialization helpers
+# ---------------------------------
+def load_doc_reports(data: list[dict]) -> list[DocReport]:
+    """
+    Restores document reports from their JSON form.
+    Extracted fields are re-validated with the schema of the stored document type,
+    since every extraction schema would otherwise accept any dict.
+    """
+    doc_reports = []
+    for item in data:
+        extracted_fields = item.get("extracted_fields")
+        doc_report = DocReport.model_validate({**item, "extracted_fields": None})
+        if extracted_fields is not None and doc_report.doc_type in DOC_TYPE_SCHEMA_MAPPING:
+            doc_report.extracted_fields = DOC_TYPE_SCHEMA_MAPPING[doc_report.doc_type].model_validate(extracted_fields)
+        doc_reports.append(doc_report)
+    return doc_reports
+
+
+# ---------------------------------
+# Stage cache
+# ---------------------------------
+class StageCache:
+    """
+    Persists the output of each pipeline stage for one claim, keyed by a fingerprint
+    of the stage inputs, code and model. A stage is only recomputed when its fingerprint changes.
+    Without a checkpoint directory every stage is computed and nothing is persisted.
+
+    Only the latest output of each stage is kept, unless keep_variants is set: then the output of
+    every fingerprint is kept, so pipeline configurations compared on the same claims share the
+    stages they have in common whatever order they run in.
+    """
+
+    def __init__(self, checkpoint_dir: Path | None = None, keep_variants: bool = False):
+        self.checkpoint_dir = checkpoint_dir
+        self.keep_variants = keep_variants
+        self.stage_status: dict[str, StageStatus] = {}
+
+    def _checkpoint_file(self, stage: str, stage_fingerprint: str) -> Path:
+        if self.keep_variants:
+            return self.checkpoint_dir / stage / f"{stage_fingerprint[:16]}.json"
+        return self.checkpoint_dir / f"{stage}.json"
+
+    # _read and _write do file I/O, so `run` calls them in a worker thread
+    def _read(self, stage: str, stage_fingerprint: str) -> StageCheckpoint | None:
+        checkpoint_file = self._checkpoint_file(stage, stage_fingerprint)
+        if not checkpoint_file.exists():
+            return None
+        try:
+            with open(checkpoint_file, "r") as f:
+                return StageCheckpoint.model_validate(json.load(f))
+        except (OSError, json.JSONDecodeError, ValidationError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {checkpoint_file}: {e}")
+            return None
+
+    def _write(self, checkpoint: StageCheckpoint):
+        checkpoint_file = self._checkpoint_file(checkpoint.stage, checkpoint.fingerprint)
+        checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = checkpoint_file.with_suffix(".json.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(checkpoint.model_dump(), f, indent=2)
+        os.replace(tmp_file, checkpoint_file)
+
+    async def run(
+        self,
+        stage: str,
+        stage_fingerprint: str,
+        compute: Callable[[], Awaitable[T]],
+        output_type: Any,
+        load: Callable[[Any], T] | None = None,
+    ) -> T:
+        """
+        Returns the stored output of a stage if its fingerprint is unchanged, otherwise computes and stores it.
+
+        Args:
+            stage: Stage name, also used as checkpoint file name
+            stage_fingerprint: Fingerprint of the stage inputs, code and model
+            compute: Coroutine function producing the stage output
+            output_type: Type of the stage output, used to (de)serialize it
+            load: Optional custom loader for the stored JSON output
+
+        Returns:
+            The stage output
+        """
+        adapter = TypeAdapter(output_type)
+
+        with span(stage, kind="stage") as stage_span:
+            if self.checkpoint_dir is not None:
+                checkpoint = await asyncio.to_thread(self._read, stage, stage_fingerprint)
+                if checkpoint and checkpoint.fingerprint == stage_fingerprint:
+                    try:
+                        output = (load or adapter.validate_python)(checkpoint.output)
+                        self.stage_status[stage] = "reused"
+                        if stage_span:
+                            stage_span.attributes["checkpoint"] = "reused"
+                            if checkpoint.cost:
+                                stage_span.attributes["cost"] = checkpoint.cost.model_dump()
+                        logger.info(f"Reusing checkpoint for stage '{stage}'")
+                        return output
+                    except (ValidationError, KeyError, TypeError) as e:
+                        logger.warning(f"Checkpoint for stage '{stage}' could not be loaded, recomputing: {e}")
+
+            output = await compute()
+            self.stage_status[stage] = "computed"
+            if stage_span:
+                stage_span.attributes["checkpoint"] = "computed"
+                cost = StageCost.from_span(stage_span)
+                stage_span.attributes["cost"] = cost.model_dump()
+            else:
+                cost = None
+
+        if self.checkpoint_dir is not None:
+            await asyncio.to_thread(
+                self._write,
+                StageCheckpoint(
+                    stage=stage,
+                    fingerprint=stage_fingerprint,
+                    created_at=datetime.now().isoformat(),
+                    output=adapter.dump_python(output, mode="json"),
+                    cost=cost,
+                ),
+            )
+        return output
@@ -0,0 +1,82 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import weakref
+from contextlib import asynccontextmanager
+from typing import Callable, TypeVar
+
+from claim_processing_pipeline.config import Settings
+from claim_processing_pipeline.tracing import span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+settings = Settings.get_settings()
+
+# One set of semaphores per event loop (asyncio primitives cannot be shared across loops)
+_loop_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_semaphore(name: str, limit: int) -> asyncio.Semaphore:
+    """Return the semaphore guarding the named resource for the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphores = _loop_semaphores.setdefault(loop, {})
+    if name not in semaphores:
+        semaphores[name] = asyncio.Semaphore(max(1, limit))
+    return semaphores[name]
+
+
+@asynccontextmanager
+async def llm_slot():
+    """
+    Holds one of the LLM slots while the block runs.
+    The slot is released as soon as the block exits, including on cancellation.
+    """
+    semaphore = _get_semaphore("llm", settings.LLM_MAX_CONCURRENCY)
+    with span("llm_queue", kind="queue"):
+        await semaphore.acquire()
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+async def run_in_ocr_slot(func: Callable[..., T], *args) -> T:
+    """
+    Runs blocking OCR work in a worker thread while holding an OCR slot.
+
+    Threads cannot be interrupted, so if the caller is cancelled the slot is
+    released only once the thread finishes its current image. This keeps
+    cancelled work from oversubscribing the OCR models.
+
+    Args:
+        func: Blocking function to run
+        *args: Positional arguments for func
+
+    Returns:
+        The return value of func
+    """
+    semaphore = _get_semaphore("ocr", settings.OCR_MAX_CONCURRENCY)
+    with span("ocr_queue", kind="queue"):
+        await semaphore.acquire()
+
+    loop = asyncio.get_running_loop()
+    try:
+        ctx = contextvars.copy_context()
+        future = loop.run_in_executor(None, functools.partial(ctx.run, func, *args))
+    except BaseException:
+        semaphore.release()
+        raise
+
+    def _release(done: asyncio.Future):
+        semaphore.release()
+        # Mark the outcome as retrieved in case the caller was cancelled meanwhile
+        if not done.cancelled():
+            done.exception()
+
+    future.add_done_callback(_release)
+    return await asyncio.shield(future)
@@ -1,4 +1,5 @@
 import logging
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,6 +7,73 @@ class Settings(BaseSettings):
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     LOG_LEVEL: str = "INFO"
+
+    # Maximum number of OCR jobs and LLM calls allowed to run at the same time
+    # (the OCR models of a process run one call at a time, see `experts.ocr`)
+    OCR_MAX_CONCURRENCY: int = 1
+    LLM_MAX_CONCURRENCY: int = 2
+
+    # LLM calls go to Ollama (live), go to Ollama and are recorded (record), or are answered from
+    # the recordings without Ollama (replay), e.g. for load tests. Replayed calls take their recorded
+    # duration multiplied by the latency scale (0 answers immediately)
+    LLM_MODE: Literal["live", "record", "replay"] = "live"
+    LLM_REPLAY_LATENCY_SCALE: float = 1.0
+
+    # Shared OCR service (Unix socket path, or TCP port on localhost) used instead of loading the OCR
+    # models in every process. The service batches the images received within the batch window.
+    # Decoded images are handed to it in shared memory, or pickled over the socket.
+    # Messages are pickles, so a TCP socket requires the authkey shared by the service and its clients
+    OCR_SERVICE_ADDRESS: str | None = None
+    OCR_SERVICE_TRANSPORT: Literal["shared_memory", "pickle"] = "shared_memory"
+    OCR_SERVICE_AUTHKEY: str = ""
+    OCR_SERVICE_MAX_BATCH: int = 8
+    OCR_SERVICE_BATCH_WINDOW_SECONDS: float = 0.05
+
+    # Memory profiling: records the tracemalloc peak, top allocators and RSS of each stage and
+    # document in the claim trace. Slows processing down, especially with top allocators (0 skips them)
+    MEMORY_PROFILE: bool = False
+    MEMORY_PROFILE_TOP_ALLOCATORS: int = 5
+
+    # Number of background workers running the pipeline for submitted claims
+    # (0 runs the API only, with claims processed by separate worker processes)
+    CLAIM_WORKERS: int = 2
+
+    # Where claim records are kept: an indexed SQLite database, or one claim.json per claim directory.
+    # Progress updates of running claims are written to SQLite in batches at this interval
+    CLAIM_STORE: Literal["sqlite", "file"] = "sqlite"
+    CLAIM_STORE_FLUSH_INTERVAL_SECONDS: float = 0.2
+
+    # Submissions identical to an earlier claim (same description, metadata and documents)
+    # return that claim instead of running the pipeline again
+    DEDUPLICATE_CLAIMS: bool = True
+    # A submission (or batch group) must store its claims within this time after registering them;
+    # registrations left by a failed submission are released after it, so a retry is processed
+    CLAIM_REGISTRATION_LEASE_SECONDS: float = 300.0
+
+    # Admission control: submissions are rejected with 429 while this many claims are queued or
+    # being processed, overall or for the submitting client (X-Client-Id header, or address). 0 disables a limit
+    MAX_PENDING_CLAIMS: int = 100
+    MAX_PENDING_CLAIMS_PER_CLIENT: int = 0
+    # Retry-After sent with 429 responses until the claim throughput can be measured
+    ADMISSION_RETRY_AFTER_SECONDS: int = 30
+
+    # Work queue: a claim leased by a worker is handed to another one if not heartbeated within
+    # the visibility timeout, and failed claims are retried up to the maximum number of attempts
+    JOB_VISIBILITY_TIMEOUT_SECONDS: float = 600.0
+    JOB_MAX_ATTEMPTS: int = 3
+    WORKER_POLL_INTERVAL_SECONDS: float = 1.0
+    # Finished (done or dead) jobs are deleted from the queue after this time; keep it above the
+    # 10 minute window the throughput used by Retry-After and /metrics/queue is measured over
+    JOB_RETENTION_SECONDS: float = 86400.0
+
+    # Upload limits, checked while the files are streamed to disk
+    MAX_UPLOAD_FILE_BYTES: int = 20 * 1024 * 1024
+    MAX_UPLOAD_CLAIM_BYTES: int = 50 * 1024 * 1024
+
+    # Claim event streams check for events written by other processes at this interval,
+    # and send a keepalive comment when idle for longer than the keepalive interval
+    EVENTS_POLL_INTERVAL_SECONDS: float = 0.5
+    EVENTS_KEEPALIVE_SECONDS: float = 15.0
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -9,6 +9,25 @@ from claim_processing_pipeline.schemas import (
 )
 
 CLAIMS_STORAGE_DIR = Path("in-memory-storage")
+CLAIMS_DB = CLAIMS_STORAGE_DIR / "claims.sqlite3"
+WORK_QUEUE_DB = CLAIMS_STORAGE_DIR / "work_queue.sqlite3"
+
+# LLM responses recorded with LLM_MODE=record, replayed with LLM_MODE=replay
+LLM_RECORDINGS_FILE = CLAIMS_STORAGE_DIR / "llm_recordings.jsonl"
+
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Supported document file extensions
+SUPPORTED_EXTENSIONS = {'.md', '.png', '.jpg', '.jpeg', '.webp', '.txt'}
+
+# ---------------------------------
+# Models
+# ---------------------------------
+LLM_MODEL = "qwen3:8b"
+VLM_MODEL = "qwen2.5vl:7b-q4_K_M"
+ORIENTATION_MODEL = "PP-LCNet_x1_0_doc_ori"
+OCR_LANG = "la"
 
 # ---------------------------------
 # Policy
@@ -1,14 +1,21 @@
-from claim_processing_pipeline.experts.applicable_policy_section import find_applicable_policy_section
+from claim_processing_pipeline.experts.applicable_policy_section import (
+    find_applicable_policy_section,
+    identify_policy_section,
+    policy_section_text,
+)
 from claim_processing_pipeline.experts.document_processor import process_documents
-from claim_processing_pipeline.experts.document_analyser import analyse_documents
+from claim_processing_pipeline.experts.document_analyser import analyse_documents, iter_document_reports
 from claim_processing_pipeline.experts.fraud_detector import detect_fraud
 from claim_processing_pipeline.experts.policy_reasoner import make_decision
 
 
 __all__ = [
     "find_applicable_policy_section",
+    "identify_policy_section",
+    "policy_section_text",
     "process_documents",
     "analyse_documents",
+    "iter_document_reports",
     "detect_fraud",
     "make_decision",
 ]
\ No newline at end of file
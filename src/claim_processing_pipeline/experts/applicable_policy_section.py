@@ -1,6 +1,6 @@
 import logging
 
-from claim_processing_pipeline.prompts import IDENTIFY_POLICY_SECTION_PROMPT
+from claim_processing_pipeline.pipeline_config import current_config
 from claim_processing_pipeline.constants import SCENARIO_POLICY_SECTION_MAPPING, EXCLUSIONS_SECTION
 from claim_processing_pipeline.utils import call_ollama_structured
 from claim_processing_pipeline.schemas import RelevantPolicySectionChoice
@@ -8,6 +8,36 @@ from claim_processing_pipeline.schemas import RelevantPolicySectionChoice
 logger = logging.getLogger(__name__)
 
 
+async def identify_policy_section(claim_description: str) -> RelevantPolicySectionChoice:
+    """
+    Uses LLM to choose which covered scenario (A, B, C) the claim falls under, or D if none.
+
+    Args:
+        claim_description: Text description of the insurance claim
+
+    Returns:
+        The chosen scenario identifier and a short explanation
+    """
+    section_choice = await call_ollama_structured(
+        current_config().prompt("IDENTIFY_POLICY_SECTION_PROMPT").format(claim=claim_description),
+        response_model=RelevantPolicySectionChoice,
+        span_name="policy_section_choice",
+    )
+
+    logger.info(f"Identified policy section: {section_choice.identifier}")
+    logger.debug(f"Explanation: {section_choice.short_explanation}")
+    return section_choice
+
+
+def policy_section_text(covered_scenario_identifier: str) -> str | None:
+    """
+    Returns the policy text (section and exclusions) for a scenario identifier, or None for out of scope claims.
+    """
+    if covered_scenario_identifier == "D":
+        return None
+    return f"{SCENARIO_POLICY_SECTION_MAPPING[covered_scenario_identifier]}\n\n{EXCLUSIONS_SECTION}"
+
+
 async def find_applicable_policy_section(claim_description: str) -> tuple[str | None, str]:
     """
     Identifies which policy section applies to the claim based on the description.
@@ -23,20 +53,5 @@ async def find_applicable_policy_section(claim_description: str) -> tuple[str |
         - Policy section text with requirements and covered scenarios
         - Explanation of why this section was chosen
     """    
-    section_choice = await call_ollama_structured(
-        IDENTIFY_POLICY_SECTION_PROMPT.format(claim=claim_description),
-        response_model=RelevantPolicySectionChoice,
-    )
-    
-    covered_scenario_identifier = section_choice.identifier
-    explanation = section_choice.short_explanation
-    
-    logger.info(f"Identified policy section: {covered_scenario_identifier}")
-    logger.debug(f"Explanation: {explanation}")
-
-    if covered_scenario_identifier == "D":
-        policy = None
-    else:
-        policy = f"{SCENARIO_POLICY_SECTION_MAPPING[covered_scenario_identifier]}\n\n{EXCLUSIONS_SECTION}"
-
-    return policy, explanation
+    section_choice = await identify_policy_section(claim_description)
+    return policy_section_text(section_choice.identifier), section_choice.short_explanation
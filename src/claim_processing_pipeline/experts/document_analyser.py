@@ -1,5 +1,9 @@
 import re
+import asyncio
 import logging
+from contextlib import aclosing
+from pathlib import Path
+from typing import AsyncIterator
 
 from claim_processing_pipeline.schemas import ProcessedDoc, DocReport
 from claim_processing_pipeline.utils import (
@@ -7,11 +11,9 @@ from claim_processing_pipeline.utils import (
     call_ollama_chat,
     call_ollama_structured,
 )
-from claim_processing_pipeline.prompts import (
-    DOC_TYPE_PROMPT,
-    ANALYSE_DOCUMENTS_PROMPT
-)
+from claim_processing_pipeline.pipeline_config import current_config
 from claim_processing_pipeline.constants import DOC_TYPE_SCHEMA_MAPPING
+from claim_processing_pipeline.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -24,9 +26,10 @@ async def _identify_document_type(doc: ProcessedDoc) -> int:
         Document type code (1-7)
     """
     response = await call_ollama_chat(
-        prompt=DOC_TYPE_PROMPT.format(
+        prompt=current_config().prompt("DOC_TYPE_PROMPT").format(
             document=f"Document name:{doc.name}\nContent:{doc.text}"
         ),
+        span_name="classification",
     )
 
     match = re.search(r"\d+", response)
@@ -57,11 +60,12 @@ async def _extract_structured_fields(doc: ProcessedDoc, doc_type: int):
     logger.info(f"Extracting structured fields using schema: {chosen_schema.__name__}")
     
     extracted_fields = await call_ollama_structured(
-        ANALYSE_DOCUMENTS_PROMPT.format(
+        current_config().prompt("ANALYSE_DOCUMENTS_PROMPT").format(
             document=f"Document name: {doc.name}\nContent: {doc.text}",
             schema=model_to_class_string(chosen_schema)
         ),
         response_model=chosen_schema,
+        span_name="extraction",
     )
     logger.info(f"Extracted fields: {extracted_fields}")
     return extracted_fields
@@ -83,6 +87,70 @@ def _assess_trustworthiness(doc: ProcessedDoc, requires_official_issuer: bool) -
     return trustworthy
 
 
+async def _analyse_document(doc: ProcessedDoc) -> DocReport:
+    """
+    Classifies a single document, extracts its structured fields and assesses its trustworthiness.
+    """
+    logger.info(f"Analyzing document: {doc.name}")
+    
+    with span(Path(doc.name).name, kind="document", file_ext=doc.file_ext) as doc_span:
+        # Identify document type
+        doc_type = await _identify_document_type(doc)
+        if doc_span:
+            doc_span.attributes["doc_type"] = doc_type
+        
+        # Determine if that type of document requires an official issuer (types 1-5)
+        requires_official_issuer = doc_type not in [6, 7]
+        logger.info(f"Requires official issuer: {requires_official_issuer}")
+
+        # Extract structured fields
+        extracted_fields = await _extract_structured_fields(doc, doc_type)
+
+        # Assess trustworthiness
+        trustworthy = _assess_trustworthiness(doc, requires_official_issuer)
+
+    # Build document report
+    doc_report = DocReport(**doc.model_dump())
+    doc_report.doc_type = doc_type
+    doc_report.requires_official_issuer = requires_official_issuer
+    doc_report.extracted_fields = extracted_fields
+    doc_report.trustworthy = trustworthy
+    return doc_report
+
+
+async def iter_document_reports(processed_docs: list[ProcessedDoc]) -> AsyncIterator[tuple[int, DocReport]]:
+    """
+    Analyzes documents concurrently and yields each report as soon as it is ready.
+
+    Untrustworthy documents are always text files, which skip field extraction, so their
+    verdict is reported right after classification. Consumers can stop iterating as soon
+    as a verdict decides the claim; closing the iterator cancels all pending analysis.
+    Wrap it in `contextlib.aclosing` so the cancellation happens deterministically.
+
+    Args:
+        processed_docs: List of documents with extracted text content
+        
+    Yields:
+        Tuples of (index of the document in processed_docs, document report), in completion order
+    """
+    logger.info(f"Analyzing {len(processed_docs)} document(s)")
+    tasks = [asyncio.create_task(_analyse_document(doc)) for doc in processed_docs]
+    doc_index = {task: idx for idx, task in enumerate(tasks)}
+    pending = set(tasks)
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=doc_index.__getitem__):
+                yield doc_index[task], task.result()
+    finally:
+        if pending:
+            logger.info(f"Cancelling analysis of {len(pending)} remaining document(s)")
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
 async def analyse_documents(processed_docs: list[ProcessedDoc]) -> list[DocReport]:
     """
     Analyzes processed documents to identify their type, extract structured fields, and assess trustworthiness.
@@ -104,31 +172,12 @@ async def analyse_documents(processed_docs: list[ProcessedDoc]) -> list[DocRepor
         - Trustworthiness flag based on format validation
         - Whether document requires official issuer verification (all except proof of booking)
     """
-    logger.info(f"Analyzing {len(processed_docs)} document(s)")
-    doc_reports = []
-
-    for doc in processed_docs:
-        logger.info(f"Analyzing document: {doc.name}")
-        
-        # Identify document type
-        doc_type = await _identify_document_type(doc)
-        
-        # Determine if that type of document requires an official issuer (types 1-5)
-        requires_official_issuer = doc_type not in [6, 7]
-        logger.info(f"Requires official issuer: {requires_official_issuer}")
-
-        # Extract structured fields
-        extracted_fields = await _extract_structured_fields(doc, doc_type)
-
-        # Assess trustworthiness
-        trustworthy = _assess_trustworthiness(doc, requires_official_issuer)
+    indexed_reports = []
+    async with aclosing(iter_document_reports(processed_docs)) as reports:
+        async for idx, doc_report in reports:
+            indexed_reports.append((idx, doc_report))
 
-        # Build document report
-        doc_report = DocReport(**doc.model_dump())
-        doc_report.requires_official_issuer = requires_official_issuer
-        doc_report.extracted_fields = extracted_fields
-        doc_report.trustworthy = trustworthy
-        doc_reports.append(doc_report)
+    doc_reports = [doc_report for _, doc_report in sorted(indexed_reports, key=lambda item: item[0])]
 
     logger.info(f"Document analysis complete: {len(doc_reports)} documents analyzed")
     logger.info(f"Results: {doc_reports}")
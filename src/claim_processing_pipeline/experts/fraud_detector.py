@@ -1,9 +1,12 @@
 import logging
 from pathlib import Path
-from ollama import chat
 
 from claim_processing_pipeline.schemas import DocReport
-from claim_processing_pipeline.prompts import SIGNATURE_DETECTION_PROMPT
+from claim_processing_pipeline.concurrency import llm_slot
+from claim_processing_pipeline.pipeline_config import current_config
+from claim_processing_pipeline.tracing import span
+from claim_processing_pipeline.llm_usage import record_llm_usage
+from claim_processing_pipeline.utils import ollama_chat
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +26,7 @@ async def detect_fraud(analysed_docs: list[DocReport]) -> list[DocReport]:
         Updated list of document reports with fraud detection results
     """
     logger.info(f"Running fraud detection on {len(analysed_docs)} document(s)")
+    config = current_config()
     
     for doc in analysed_docs:
         doc.fraud_detection = "Nothing to report"
@@ -32,14 +36,18 @@ async def detect_fraud(analysed_docs: list[DocReport]) -> list[DocReport]:
             try:
                 # Use vision LM to detect signature presence
                 image_path = str(Path(doc.name).absolute())
-                response = chat(
-                    model="qwen2.5vl:7b-q4_K_M",
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant for insurance document analysis."},
-                        {"role": "user", "content": SIGNATURE_DETECTION_PROMPT, "images": [image_path]}
-                    ],
-                    options={"temperature": 0}
-                )
+                with span(Path(doc.name).name, kind="document", file_ext=doc.file_ext), \
+                        span("signature_detection", kind="model", model=config.vlm_model):
+                    async with llm_slot():
+                        response = await ollama_chat(
+                            model=config.vlm_model,
+                            messages=[
+                                {"role": "system", "content": "You are a helpful assistant for insurance document analysis."},
+                                {"role": "user", "content": config.prompt("SIGNATURE_DETECTION_PROMPT"), "images": [image_path]}
+                            ],
+                            options={"temperature": 0}
+                        )
+                    record_llm_usage(response, config.vlm_model)
 
                 content = response.message.content
                 if not content:
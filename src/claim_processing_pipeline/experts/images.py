@@ -0,0 +1,53 @@
+"""
+Image decoding for OCR. Only needs PIL, so processes sending images to the shared OCR service
+can decode them without loading the OCR models.
+"""
+import io
+import logging
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+def _resize_if_needed(img: Image.Image, file_size_kb: float, max_size_kb: float = 500) -> Image.Image:
+    """
+    Resizes image if file size exceeds threshold to reduce memory usage.
+    
+    Args:
+        img: PIL Image object
+        file_size_kb: Original file size in KB
+        max_size_kb: Maximum allowed file size in KB
+        
+    Returns:
+        Resized image if needed, otherwise original image
+    """
+    if file_size_kb <= max_size_kb:
+        return img
+    
+    original_size = img.size
+    size_ratio = max_size_kb / file_size_kb
+    resize_ratio = size_ratio ** 0.5
+    
+    new_size = (int(img.size[0] * resize_ratio), int(img.size[1] * resize_ratio))
+    resized_img = img.resize(new_size, Image.Resampling.LANCZOS)
+    logger.info(f"Resized image {original_size} -> {new_size} ({file_size_kb:.0f}KB -> ~{max_size_kb:.0f}KB)")
+    
+    return resized_img
+
+
+def load_image(data: bytes) -> Image.Image:
+    """
+    Decodes an image file and shrinks it if needed.
+
+    Args:
+        data: Content of the image file
+
+    Returns:
+        RGB image, resized if the file exceeds the size threshold
+    """
+    file_size_kb = len(data) / 1024
+    logger.debug(f"Image file size: {file_size_kb:.1f} KB")
+
+    img = Image.open(io.BytesIO(data)).convert("RGB")
+    return _resize_if_needed(img, file_size_kb)
@@ -0,0 +1,96 @@
+"""
+Image OCR with PaddleOCR. Importing this module loads PaddleOCR, Paddle, OpenCV and numpy,
+so it is only imported when an image document has to be processed.
+"""
+import logging
+import threading
+import numpy as np
+
+from paddleocr import DocImgOrientationClassification, PaddleOCR
+from PIL import Image
+
+from claim_processing_pipeline.experts.images import load_image
+from claim_processing_pipeline.constants import ORIENTATION_MODEL, OCR_LANG
+from claim_processing_pipeline.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Loaded once per process, on first use
+_models: tuple[DocImgOrientationClassification, PaddleOCR] | None = None
+_models_lock = threading.Lock()
+# Paddle predictors are not thread-safe: calls from the OCR executor threads run one at a time,
+# so OCR_MAX_CONCURRENCY above 1 only overlaps image decoding (use the OCR service to batch images)
+_predict_lock = threading.Lock()
+
+
+def _get_models() -> tuple[DocImgOrientationClassification, PaddleOCR]:
+    """Returns the orientation and OCR models, loading them on first use. They are shared by all calls in the process."""
+    global _models
+    with _models_lock:
+        if _models is None:
+            logger.info("Loading OCR models...")
+            _models = (DocImgOrientationClassification(model_name=ORIENTATION_MODEL), PaddleOCR(lang=OCR_LANG))
+        return _models
+
+
+def _detect_and_correct_orientation(images: list[Image.Image]) -> list[Image.Image]:
+    """
+    Detects the orientation of images and rotates them to upright position if needed.
+    
+    Args:
+        images: PIL Image objects
+        
+    Returns:
+        Images rotated where correction was needed
+    """
+    logger.debug("Detecting orientation...")
+    cls_model, _ = _get_models()
+
+    with _predict_lock, span("orientation", kind="model", model=ORIENTATION_MODEL, batch_size=len(images)):
+        results = cls_model.predict([np.array(img) for img in images])
+
+    upright_images = []
+    for img, result in zip(images, results):
+        angle = int(result["label_names"][0])
+        if angle != 0:
+            img = img.rotate(angle, expand=True)
+            logger.info(f"Rotated image by {angle}°")
+        upright_images.append(img)
+    return upright_images
+
+
+def extract_text_from_images(images: list[Image.Image]) -> list[str]:
+    """
+    Extracts text from images using OCR, running each model once for the whole batch.
+    
+    Args:
+        images: Decoded images (see `load_image`)
+        
+    Returns:
+        Extracted text content of each image
+    """
+    images = _detect_and_correct_orientation(images)
+
+    logger.info(f"Running OCR on {len(images)} image(s)...")
+    _, ocr = _get_models()
+    with _predict_lock, span("ocr", kind="model", model=f"PaddleOCR-{OCR_LANG}", batch_size=len(images)):
+        ocr_results = ocr.predict([np.array(img) for img in images])
+
+    contents = ["\n".join(result["rec_texts"]) for result in ocr_results]
+    logger.info(f"Extracted {[len(content) for content in contents]} chars from OCR")
+    return contents
+
+
+def extract_text_from_image(filename: str) -> str:
+    """
+    Extracts text from image using OCR with preprocessing.
+    
+    Args:
+        filename: Path to image file
+        
+    Returns:
+        Extracted text content
+    """
+    with open(filename, "rb") as f:
+        img = load_image(f.read())
+    return extract_text_from_images([img])[0]
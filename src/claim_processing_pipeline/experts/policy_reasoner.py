@@ -2,7 +2,7 @@ import logging
 
 from claim_processing_pipeline.utils import call_ollama_structured
 from claim_processing_pipeline.schemas import DocReport
-from claim_processing_pipeline.prompts import POLICY_EXPERT_PROMPT
+from claim_processing_pipeline.pipeline_config import current_config
 from claim_processing_pipeline.schemas import DecisionResults
 
 logger = logging.getLogger(__name__)
@@ -43,13 +43,14 @@ async def make_decision(
     document_analysis_report = "\n\n--------\n\n".join(docs_ctx)
 
     decision_results = await call_ollama_structured(
-        POLICY_EXPERT_PROMPT.format(
+        current_config().prompt("POLICY_EXPERT_PROMPT").format(
             policy=policy_context,
             claim=claim_description,
             document_analysis_report=document_analysis_report,
             metadata=f"Metadata:\n{metadata}" if metadata else "",
         ),
         response_model=DecisionResults,
+        span_name="decision",
     )
 
     logger.info(f"Policy expert decision: {decision_results.decision}")
@@ -0,0 +1,146 @@
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from pydantic import BaseModel, Field, computed_field
+
+from claim_processing_pipeline.tracing import current_span, current_stage
+
+logger = logging.getLogger(__name__)
+
+_NANOSECONDS = 1e9
+
+
+class LLMCallUsage(BaseModel):
+    stage: str | None = None
+    call: str | None = None
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_seconds: float = 0.0
+    load_seconds: float = 0.0
+    prompt_eval_seconds: float = 0.0
+    eval_seconds: float = 0.0
+
+
+class LLMUsageTotals(BaseModel):
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_seconds: float = 0.0
+    load_seconds: float = 0.0
+    prompt_eval_seconds: float = 0.0
+    eval_seconds: float = 0.0
+
+    @computed_field
+    @property
+    def prefill_share(self) -> float:
+        """Fraction of model time spent evaluating the prompt."""
+        busy = self.prompt_eval_seconds + self.eval_seconds
+        return self.prompt_eval_seconds / busy if busy else 0.0
+
+    def add(self, usage: LLMCallUsage):
+        self.calls += 1
+        self.prompt_tokens += usage.prompt_tokens
+        self.completion_tokens += usage.completion_tokens
+        self.total_seconds += usage.total_seconds
+        self.load_seconds += usage.load_seconds
+        self.prompt_eval_seconds += usage.prompt_eval_seconds
+        self.eval_seconds += usage.eval_seconds
+
+
+class LLMUsageSummary(BaseModel):
+    total: LLMUsageTotals = Field(default_factory=LLMUsageTotals)
+    by_stage: dict[str, LLMUsageTotals] = Field(default_factory=dict)
+    by_model: dict[str, LLMUsageTotals] = Field(default_factory=dict)
+    by_call: dict[str, LLMUsageTotals] = Field(default_factory=dict)
+
+    def add(self, usage: LLMCallUsage):
+        self.total.add(usage)
+        self.by_stage.setdefault(usage.stage or "unknown", LLMUsageTotals()).add(usage)
+        self.by_model.setdefault(usage.model, LLMUsageTotals()).add(usage)
+        self.by_call.setdefault(usage.call or "unknown", LLMUsageTotals()).add(usage)
+
+
+def summarize_llm_usage(calls: list[LLMCallUsage]) -> LLMUsageSummary:
+    """Aggregates individual LLM calls by stage, by model and by call (span name)."""
+    summary = LLMUsageSummary()
+    for usage in calls:
+        summary.add(usage)
+    return summary
+
+
+# Calls of the claim currently being processed, and totals since the process started
+_claim_calls: ContextVar[list[LLMCallUsage] | None] = ContextVar("claim_llm_calls", default=None)
+_process_summary = LLMUsageSummary()
+_process_lock = threading.Lock()
+
+
+@contextmanager
+def collect_llm_usage() -> Iterator[list[LLMCallUsage]]:
+    """Collects every LLM call made inside the block (including in tasks started from it)."""
+    calls: list[LLMCallUsage] = []
+    token = _claim_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        _claim_calls.reset(token)
+
+
+def process_llm_usage() -> LLMUsageSummary:
+    """Returns a copy of the LLM usage accumulated by this process."""
+    with _process_lock:
+        return _process_summary.model_copy(deep=True)
+
+
+def record_llm_usage(response: Any, model: str) -> LLMCallUsage:
+    """
+    Records the token counts and timings Ollama reports for a chat response.
+    The call is tagged with the current stage and span, attached to the current span,
+    and added to the claim and process aggregates.
+
+    Args:
+        response: Ollama chat response
+        model: Name of the model that was called
+
+    Returns:
+        The recorded usage
+    """
+    call_span = current_span()
+    usage = LLMCallUsage(
+        stage=current_stage(),
+        call=call_span.name if call_span else None,
+        model=model,
+        prompt_tokens=getattr(response, "prompt_eval_count", None) or 0,
+        completion_tokens=getattr(response, "eval_count", None) or 0,
+        total_seconds=(getattr(response, "total_duration", None) or 0) / _NANOSECONDS,
+        load_seconds=(getattr(response, "load_duration", None) or 0) / _NANOSECONDS,
+        prompt_eval_seconds=(getattr(response, "prompt_eval_duration", None) or 0) / _NANOSECONDS,
+        eval_seconds=(getattr(response, "eval_duration", None) or 0) / _NANOSECONDS,
+    )
+
+    logger.info(
+        f"LLM usage - model: {model}, stage: {usage.stage}, prompt tokens: {usage.prompt_tokens}, "
+        f"completion tokens: {usage.completion_tokens}, prefill: {usage.prompt_eval_seconds:.2f}s, "
+        f"generation: {usage.eval_seconds:.2f}s, load: {usage.load_seconds:.2f}s"
+    )
+
+    if call_span:
+        call_span.attributes.update(
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            load_seconds=usage.load_seconds,
+            prompt_eval_seconds=usage.prompt_eval_seconds,
+            eval_seconds=usage.eval_seconds,
+        )
+
+    claim_calls = _claim_calls.get()
+    if claim_calls is not None:
+        claim_calls.append(usage)
+
+    with _process_lock:
+        _process_summary.add(usage)
+
+    return usage
@@ -1,18 +1,34 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from claim_processing_pipeline.api.routers import router
+from claim_processing_pipeline.api.metrics import router as metrics_router
+from claim_processing_pipeline.api.batches import router as batches_router
+from claim_processing_pipeline.api.jobs import worker_pool
 from claim_processing_pipeline.config import Settings, setup_logging
 
 # Set up logging at application startup
 settings = Settings.get_settings()
 setup_logging(settings.LOG_LEVEL)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the work queue and run the claim workers for the lifetime of the application."""
+    await worker_pool.start()
+    yield
+    await worker_pool.stop()
+
+
 app = FastAPI(
     title="Claim Processing API",
     description="API for submitting and managing insurance claims",
+    lifespan=lifespan,
 )
 
 app.include_router(router)
+app.include_router(batches_router)
+app.include_router(metrics_router)
 
 if __name__ == "__main__":
     uvicorn.run("claim_processing_pipeline.main:app", host=settings.API_HOST, port=settings.API_PORT)
@@ -0,0 +1,180 @@
+"""
+Per-claim memory profiling.
+
+When enabled (MEMORY_PROFILE, or `enable_memory_profiling` in the evaluation scripts), every stage
+and document span of a claim trace gets a "memory" attribute, and the claim root span one for the
+whole claim:
+
+- traced_peak_mb: highest Python memory (tracemalloc, which includes numpy arrays) above what was
+  allocated when the span opened
+- traced_retained_mb: memory still allocated when the span closed
+- rss_mb, peak_rss_mb: resident set size of the process when the span closed, and its highest value so far
+- peak_rss_growth_mb: how much the span raised the highest RSS of the process. Unlike tracemalloc,
+  RSS includes native allocations (Paddle tensors, decoded images, Ollama client buffers)
+- top_allocators: source lines that allocated the most memory still held when the span closed
+
+Spans running at the same time (triage and OCR, concurrent documents, other claims) share their
+peaks, so for a clean attribution profile one claim at a time.
+"""
+import sys
+import logging
+import resource
+import threading
+import tracemalloc
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Iterator, Literal
+
+from pydantic import BaseModel
+
+from claim_processing_pipeline.config import Settings
+from claim_processing_pipeline.tracing import Span
+
+logger = logging.getLogger(__name__)
+
+settings = Settings.get_settings()
+
+_MB = 1024 * 1024
+
+_enabled = settings.MEMORY_PROFILE
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, in KB on Linux
+    return peak / _MB if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb() -> float | None:
+    """Current resident set size of this process, in MB (None where /proc is not available)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * resource.getpagesize() / _MB
+
+
+def enable_memory_profiling():
+    """Profiles the memory of every claim processed from now on in this process."""
+    global _enabled
+    _enabled = True
+
+
+def memory_profiling_enabled() -> bool:
+    return _enabled
+
+
+class _SpanMemory(BaseModel):
+    traced_start: int
+    traced_peak: int
+    rss_peak_start: float
+    snapshot: Any = None
+
+
+# Measurements of the spans currently open, across all the claims of the process: tracemalloc has a
+# single peak, so every interval's peak is credited to each span open during it before it is reset
+_open_spans: dict[int, _SpanMemory] = {}
+_open_spans_lock = threading.Lock()
+
+
+def _collect_peak():
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for measurement in _open_spans.values():
+        measurement.traced_peak = max(measurement.traced_peak, peak)
+
+
+def _take_snapshot(top_allocators: int) -> tracemalloc.Snapshot | None:
+    if not top_allocators:
+        return None
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        # Measurements recorded on the spans of earlier documents
+        tracemalloc.Filter(False, __file__),
+    ])
+
+
+def _top_allocators(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, limit: int) -> list[dict]:
+    allocators = []
+    for stat in after.compare_to(before, "lineno")[:limit]:
+        if stat.size_diff <= 0:
+            break
+        frame = stat.traceback[0]
+        allocators.append({
+            "location": f"{'/'.join(Path(frame.filename).parts[-2:])}:{frame.lineno}",
+            "size_mb": stat.size_diff / _MB,
+            "count": stat.count_diff,
+        })
+    return allocators
+
+
+class MemoryProfiler:
+    """
+    Span listener recording the memory of the stages and documents of a claim on their spans.
+    Created when the claim starts; `finish` (or the `recording` block) records the memory of the
+    claim itself on its root span.
+    """
+
+    def __init__(self, top_allocators: int = settings.MEMORY_PROFILE_TOP_ALLOCATORS):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            logger.info("Started tracing memory allocations")
+        self.top_allocators = top_allocators
+        self._spans: dict[int, _SpanMemory] = {}
+        self._claim = self._open()
+
+    def _open(self) -> _SpanMemory:
+        snapshot = _take_snapshot(self.top_allocators)
+        with _open_spans_lock:
+            _collect_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            measurement = _SpanMemory(traced_start=current, traced_peak=current, rss_peak_start=peak_rss_mb(), snapshot=snapshot)
+            _open_spans[id(measurement)] = measurement
+        return measurement
+
+    def _close(self, measurement: _SpanMemory) -> dict:
+        with _open_spans_lock:
+            _collect_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            _open_spans.pop(id(measurement), None)
+
+        rss_peak = peak_rss_mb()
+        memory = {
+            "traced_peak_mb": (measurement.traced_peak - measurement.traced_start) / _MB,
+            "traced_retained_mb": (current - measurement.traced_start) / _MB,
+            "rss_mb": current_rss_mb(),
+            "peak_rss_mb": rss_peak,
+            "peak_rss_growth_mb": rss_peak - measurement.rss_peak_start,
+        }
+        if measurement.snapshot is not None:
+            memory["top_allocators"] = _top_allocators(measurement.snapshot, _take_snapshot(self.top_allocators), self.top_allocators)
+        return memory
+
+    def __call__(self, phase: Literal["start", "end"], s: Span):
+        if s.kind not in ("stage", "document"):
+            return
+        if phase == "start":
+            self._spans[id(s)] = self._open()
+        elif id(s) in self._spans:
+            s.attributes["memory"] = self._close(self._spans.pop(id(s)))
+
+    def finish(self, root: Span):
+        """
+        Records the memory of the whole claim on the root span of its trace, and stops measuring
+        the spans of the claim still open.
+        """
+        with _open_spans_lock:
+            for measurement in self._spans.values():
+                _open_spans.pop(id(measurement), None)
+        self._spans.clear()
+        root.attributes["memory"] = self._close(self._claim)
+
+    @contextmanager
+    def recording(self, root: Span) -> Iterator[None]:
+        """Calls `finish` when the block exits, including when the claim fails or is cancelled."""
+        try:
+            yield
+        finally:
+            self.finish(root)
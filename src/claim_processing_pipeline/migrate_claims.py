@@ -0,0 +1,71 @@
+"""
+Copies claims stored as per-claim `claim.json` files into the SQLite claim store.
+
+    python -m claim_processing_pipeline.migrate_claims --storage-dir in-memory-storage
+
+Claims already in the database are overwritten with the file version, so the migration can be rerun.
+Claim directories (documents, traces, checkpoints) are left in place: only the claim records move.
+"""
+import argparse
+import logging
+from pathlib import Path
+
+from claim_processing_pipeline.api.claim_store import FileClaimStore, SQLiteClaimStore
+from claim_processing_pipeline.api.models import ClaimResponse
+from claim_processing_pipeline.config import setup_logging
+from claim_processing_pipeline.constants import CLAIMS_DB, CLAIMS_STORAGE_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_claims(storage_dir: Path, db_path: Path, batch_size: int = 500) -> int:
+    """
+    Migrates the claim.json files of a storage directory into a SQLite claim store.
+
+    Args:
+        storage_dir: Directory containing one sub-directory per claim
+        db_path: SQLite database to write the claims to
+        batch_size: Number of claims written per transaction
+
+    Returns:
+        Number of claims migrated
+    """
+    source = FileClaimStore(storage_dir)
+    target = SQLiteClaimStore(db_path)
+
+    migrated = 0
+    batch = []
+    for claim_data in source.list_claims():
+        try:
+            batch.append(ClaimResponse(**claim_data).model_dump())
+        except Exception as e:
+            logger.error(f"Skipping invalid claim {claim_data.get('claim_id')}: {e}")
+            continue
+
+        if len(batch) >= batch_size:
+            target.save_claims(batch)
+            migrated += len(batch)
+            batch = []
+
+    if batch:
+        target.save_claims(batch)
+        migrated += len(batch)
+
+    logger.info(f"Migrated {migrated} claim(s) from {storage_dir} to {db_path}")
+    return migrated
+
+
+def main():
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Migrate claim.json files into the SQLite claim store")
+    parser.add_argument("--storage-dir", type=Path, default=CLAIMS_STORAGE_DIR, help="Directory with one sub-directory per claim")
+    parser.add_argument("--db", type=Path, default=CLAIMS_DB, help="SQLite database to write the claims to")
+    parser.add_argument("--batch-size", type=int, default=500, help="Claims written per transaction")
+    args = parser.parse_args()
+
+    migrate_claims(args.storage_dir, args.db, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
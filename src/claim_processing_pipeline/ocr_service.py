@@ -0,0 +1,264 @@
+"""
+Shared OCR service.
+
+Every process running the pipeline (API with CLAIM_WORKERS > 0, standalone workers) otherwise loads
+its own copy of the PaddleOCR models. This service loads them once and serves all of them, grouping
+the images it receives at the same time into a single batch per model call:
+
+    python -m claim_processing_pipeline.ocr_service --address /tmp/claims-ocr.sock
+
+Processes started with OCR_SERVICE_ADDRESS set to the same address send their images to it instead
+of running OCR themselves. The address is a Unix socket path (only accessible to the user running
+the service), or a TCP port on localhost ("9000", or "host:port" for another interface).
+
+Messages are unpickled on both ends, so whoever can connect can run code in the service. A TCP socket
+is only used with OCR_SERVICE_AUTHKEY set, which every connection must prove it knows.
+
+Images are decoded by the sending process and handed over in shared memory: only the name of the
+segment crosses the socket. The sender owns the segment and unlinks it once the service replied,
+the service only copies it out. With OCR_SERVICE_TRANSPORT=pickle the decoded image is sent over
+the socket instead.
+"""
+import os
+import time
+import queue
+import logging
+import argparse
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Iterator, Literal
+
+import numpy as np
+
+from claim_processing_pipeline.config import Settings, setup_logging
+
+logger = logging.getLogger(__name__)
+
+settings = Settings.get_settings()
+
+
+def parse_address(address: str) -> str | tuple[str, int]:
+    """Returns the socket address for a Unix socket path, a port (on localhost) or a host:port string."""
+    if address.isdigit():
+        return "127.0.0.1", int(address)
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit() and "/" not in address:
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+def _authkey(socket_address: str | tuple[str, int]) -> bytes | None:
+    """
+    Returns the key connections are authenticated with. Required for TCP sockets, which any local
+    user (or any host, on another interface) can connect to.
+    """
+    authkey = settings.OCR_SERVICE_AUTHKEY.encode() or None
+    if authkey is None and isinstance(socket_address, tuple):
+        raise ValueError("OCR_SERVICE_AUTHKEY must be set to use the OCR service over TCP")
+    return authkey
+
+
+@contextmanager
+def image_message(image: np.ndarray, transport: Literal["shared_memory", "pickle"]) -> Iterator[tuple]:
+    """
+    Builds the message handing a decoded image to the service.
+
+    With shared memory, the image is copied to a new segment that is unlinked when the context
+    exits, whether or not the service replied.
+
+    Args:
+        image: Decoded image
+        transport: "shared_memory" to send only the segment name, "pickle" to send the image itself
+
+    Yields:
+        The message to send
+    """
+    if transport == "pickle":
+        yield ("array", image)
+        return
+
+    shm = shared_memory.SharedMemory(create=True, size=max(image.nbytes, 1))
+    try:
+        np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)[:] = image
+        yield ("shared_memory", shm.name, image.shape, image.dtype.str)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def read_image_message(message: tuple) -> np.ndarray:
+    """Returns a copy of the image handed over by `image_message`, detaching from its shared memory."""
+    if message[0] == "array":
+        return message[1]
+
+    _, name, shape, dtype = message
+    shm = shared_memory.SharedMemory(name=name)
+    # The sender owns the segment: keep this process's resource tracker from unlinking it
+    resource_tracker.unregister(shm._name, "shared_memory")
+    try:
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+
+
+def request_ocr(filename: str) -> str:
+    """
+    Extracts the text of an image through the OCR service.
+
+    Args:
+        filename: Path to image file
+
+    Returns:
+        Extracted text content
+    """
+    from claim_processing_pipeline.experts.images import load_image
+
+    with open(filename, "rb") as f:
+        image = np.asarray(load_image(f.read()))
+
+    socket_address = parse_address(settings.OCR_SERVICE_ADDRESS)
+    with image_message(image, settings.OCR_SERVICE_TRANSPORT) as message:
+        with Client(socket_address, authkey=_authkey(socket_address)) as conn:
+            conn.send(message)
+            status, payload = conn.recv()
+
+    if status != "ok":
+        raise RuntimeError(f"OCR service failed on {filename}: {payload}")
+    return payload
+
+
+def _serve_connection(conn: Connection, requests: queue.Queue):
+    """Forwards the images received on a connection to the OCR thread and sends back the results."""
+    from PIL import Image
+
+    with conn:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                return
+
+            result = Future()
+            try:
+                # Copied out right away, so the sender can release its shared memory as soon as it gets a reply
+                requests.put((Image.fromarray(read_image_message(message)), result))
+                text = result.result()
+            except Exception as e:
+                reply = ("error", f"{type(e).__name__}: {e}")
+            else:
+                reply = ("ok", text)
+
+            try:
+                conn.send(reply)
+            except (EOFError, OSError):
+                return
+
+
+def _next_batch(requests: queue.Queue, max_batch: int, batch_window: float) -> list[tuple]:
+    """Waits for a request, then collects the ones arriving within the batch window."""
+    batch = [requests.get()]
+    deadline = time.monotonic() + batch_window
+    try:
+        while len(batch) < max_batch:
+            batch.append(requests.get(timeout=max(deadline - time.monotonic(), 0)))
+    except queue.Empty:
+        pass
+    return batch
+
+
+def _run_ocr(requests: queue.Queue, max_batch: int, batch_window: float):
+    """Runs OCR on batches of queued images, one batch at a time."""
+    from claim_processing_pipeline.experts.ocr import extract_text_from_images
+
+    while True:
+        images = _next_batch(requests, max_batch, batch_window)
+
+        logger.info(f"Running OCR on a batch of {len(images)} image(s)")
+        try:
+            texts = extract_text_from_images([image for image, _ in images])
+        except Exception as e:
+            # Find the images that fail instead of failing the whole batch
+            logger.warning(f"OCR failed on a batch of {len(images)} image(s), retrying one by one: {e}")
+            for image, result in images:
+                try:
+                    result.set_result(extract_text_from_images([image])[0])
+                except Exception as e:
+                    result.set_exception(e)
+            continue
+
+        for (_, result), text in zip(images, texts):
+            result.set_result(text)
+
+
+def serve(address: str, max_batch: int, batch_window: float):
+    """
+    Loads the OCR models and serves OCR requests until the process is interrupted.
+
+    Args:
+        address: Unix socket path, port on localhost, or host:port
+        max_batch: Maximum number of images per model call
+        batch_window: Seconds to wait for more images once one is received
+
+    Raises:
+        ValueError: If the address is a TCP socket and OCR_SERVICE_AUTHKEY is not set
+    """
+    from claim_processing_pipeline.experts.ocr import _get_models
+
+    socket_address = parse_address(address)
+    authkey = _authkey(socket_address)
+
+    # Load the models before accepting requests, so the first claims do not pay for it
+    _get_models()
+
+    if isinstance(socket_address, str) and os.path.exists(socket_address):
+        # Left behind by a previous run
+        os.unlink(socket_address)
+
+    requests: queue.Queue = queue.Queue()
+    threading.Thread(target=_run_ocr, args=(requests, max_batch, batch_window), daemon=True).start()
+
+    with Listener(socket_address, authkey=authkey) as listener:
+        if isinstance(socket_address, str):
+            os.chmod(socket_address, 0o600)
+        logger.info(f"OCR service listening on {socket_address}")
+        while True:
+            try:
+                conn = listener.accept()
+            except KeyboardInterrupt:
+                break
+            except Exception as e:
+                logger.warning(f"Rejected OCR service connection: {e}")
+                continue
+            threading.Thread(target=_serve_connection, args=(conn, requests), daemon=True).start()
+
+
+def main():
+    setup_logging(settings.LOG_LEVEL)
+
+    parser = argparse.ArgumentParser(description="Run the shared OCR service")
+    parser.add_argument(
+        "--address",
+        default=settings.OCR_SERVICE_ADDRESS,
+        required=settings.OCR_SERVICE_ADDRESS is None,
+        help="Unix socket path, port on localhost, or host:port (TCP requires OCR_SERVICE_AUTHKEY)",
+    )
+    parser.add_argument("--max-batch", type=int, default=settings.OCR_SERVICE_MAX_BATCH, help="Maximum images per model call")
+    parser.add_argument(
+        "--batch-window",
+        type=float,
+        default=settings.OCR_SERVICE_BATCH_WINDOW_SECONDS,
+        help="Seconds to wait for more images before running a batch",
+    )
+    args = parser.parse_args()
+
+    try:
+        serve(args.address, args.max_batch, args.batch_window)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,86 @@
-from typing import Literal
+from pathlib import Path
+from typing import Awaitable, Callable, Literal, TypeVar
 from pydantic import BaseModel
+import asyncio
 import logging
+import time
+from contextlib import aclosing, nullcontext
 
 from claim_processing_pipeline.experts import (
-    find_applicable_policy_section,
+    identify_policy_section,
+    policy_section_text,
     process_documents,
-    analyse_documents,
+    iter_document_reports,
     detect_fraud,
     make_decision,
 )
+from claim_processing_pipeline.checkpoints import (
+    StageCache,
+    StageStatus,
+    load_doc_reports,
+    triage_fingerprint,
+    documents_fingerprint,
+    analysis_fingerprint,
+    fraud_fingerprint,
+    decision_fingerprint,
+)
+from claim_processing_pipeline.tracing import combine_listeners, start_trace
+from claim_processing_pipeline.memory_profile import MemoryProfiler, memory_profiling_enabled
+from claim_processing_pipeline.progress import ProgressEvent, decided_event, progress_listener
+from claim_processing_pipeline.llm_usage import (
+    LLMUsageSummary,
+    collect_llm_usage,
+    summarize_llm_usage,
+)
+from claim_processing_pipeline.schemas import (
+    DecisionResults,
+    DocReport,
+    ProcessedDoc,
+    RelevantPolicySectionChoice,
+)
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 class ClaimDecision(BaseModel):
     decision: Literal["APPROVE", "DENY", "UNCERTAIN"] | None = None
     explanation: str | None
     policy_context: str | None = None
     processed_documents: list[dict] | None = None
+    time_saved_seconds: float | None = None
+    stage_status: dict[str, StageStatus] | None = None
+    trace: dict | None = None
+    llm_usage: LLMUsageSummary | None = None
+
+
+async def _timed(coro: Awaitable[T]) -> tuple[T, float]:
+    """Awaits a coroutine and returns its result together with the elapsed seconds."""
+    start = time.perf_counter()
+    result = await coro
+    return result, time.perf_counter() - start
+
+
+async def _analyse_until_untrustworthy(claim_id: str, processed_docs: list[ProcessedDoc]) -> list[DocReport]:
+    """
+    Analyses documents and stops once one of them is untrustworthy, cancelling the remaining calls.
+    Returns the reports gathered so far, in input order.
+
+    Only text documents can be untrustworthy, so the analysis stops once all of them are classified
+    rather than at the first untrustworthy one to finish: the claim is then always denied because of
+    the first untrustworthy document in input order, whatever order the model calls finish in.
+    """
+    unclassified_text_docs = {idx for idx, doc in enumerate(processed_docs) if doc.file_ext in [".txt", ".md"]}
+    indexed_analysis = []
+    async with aclosing(iter_document_reports(processed_docs)) as doc_reports:
+        async for idx, doc in doc_reports:
+            indexed_analysis.append((idx, doc))
+            unclassified_text_docs.discard(idx)
+            if not unclassified_text_docs and any(not report.trustworthy for _, report in indexed_analysis):
+                logger.info(f"Claim {claim_id}: untrustworthy document found, skipping remaining analysis")
+                break
+
+    return [doc for _, doc in sorted(indexed_analysis, key=lambda item: item[0])]
 
 
 async def run_claim_processing_pipeline(
@@ -24,57 +88,137 @@ async def run_claim_processing_pipeline(
     claim_description: str,
     supporting_filenames: list[str],
     metadata: str = "",
+    checkpoint_dir: Path | None = None,
+    on_progress: Callable[[ProgressEvent], None] | None = None,
+    keep_checkpoint_variants: bool = False,
 ) -> ClaimDecision:
-
-    decision=None
-    explanation=None
-    
-    policy_section, explanation = await find_applicable_policy_section(claim_description)
-    if not policy_section:
-        decision = "DENY"
-        full_document_analysis = []
-    else:
-        processed_docs = await process_documents(supporting_filenames)
-        document_analysis = await analyse_documents(processed_docs)
-
-        for doc in document_analysis:
-            if not doc.trustworthy:
-                decision = "DENY"
-                explanation = f"Supporting document that requires official issuer is in invalid format (free text): {doc.name}"
-                full_document_analysis = document_analysis
-
-        if not decision:
-            # 3. Call fraud detection
-            full_document_analysis = await detect_fraud(document_analysis)
-
-            # for doc in full_document_analysis:
-            #     if doc.missing_signature:
-            #         decision = "DENY"
-            #         explanation = f"Missing signature in supporting document that requires official issuer verification: {doc.name}"
+    """
+    Runs the full claim processing pipeline.
+
+    When a checkpoint directory is given, each stage output is persisted there and reused on
+    later runs for as long as the stage inputs, code and model are unchanged, so re-processing
+    a claim only reruns the stages affected by a change. With keep_checkpoint_variants, the outputs
+    of earlier configurations are kept next to the latest one (see `StageCache`).
+
+    The models and prompts used are those of the current pipeline configuration (see `use_config`).
+
+    If on_progress is given, it is called every time a stage or a document within a stage starts
+    or finishes, and when a stage decides the claim early (out of scope claim, untrustworthy document).
+
+    With memory profiling enabled, the trace records the memory of each stage and document (see `memory_profile`).
+    """
+    profiler = MemoryProfiler() if memory_profiling_enabled() else None
+    listener = combine_listeners(progress_listener(on_progress) if on_progress else None, profiler)
+    with (
+        start_trace("claim", listener=listener, claim_id=claim_id) as trace,
+        profiler.recording(trace) if profiler else nullcontext(),
+        collect_llm_usage() as llm_calls,
+    ):
+        decision=None
+        explanation=None
+        time_saved = 0.0
+        cache = StageCache(checkpoint_dir, keep_variants=keep_checkpoint_variants)
+
+        # 1. Policy triage and document processing are independent, so start both at once
+        start = time.perf_counter()
+        triage_task = asyncio.create_task(_timed(cache.run(
+            "triage",
+            triage_fingerprint(claim_description),
+            lambda: identify_policy_section(claim_description),
+            RelevantPolicySectionChoice,
+        )))
+        documents_task = asyncio.create_task(_timed(cache.run(
+            "process_documents",
+            documents_fingerprint(supporting_filenames),
+            lambda: process_documents(supporting_filenames),
+            list[ProcessedDoc],
+        )))
+
+        try:
+            section_choice, triage_time = await triage_task
+            policy_section = policy_section_text(section_choice.identifier)
+            explanation = section_choice.short_explanation
+            if policy_section:
+                processed_docs, documents_time = await documents_task
+                time_saved = max(0.0, triage_time + documents_time - (time.perf_counter() - start))
+        finally:
+            triage_task.cancel()
+            if not documents_task.done():
+                # Out of scope claim (or failed triage): drop the in-flight OCR and free its slots
+                documents_task.cancel()
+                logger.info(f"Claim {claim_id}: cancelled in-flight document processing")
+            await asyncio.gather(triage_task, documents_task, return_exceptions=True)
+
+        if not policy_section:
+            decision = "DENY"
+            full_document_analysis = []
+            if on_progress:
+                on_progress(decided_event("triage", decision, explanation))
+        else:
+            logger.info(f"Claim {claim_id}: running triage and document processing concurrently saved {time_saved:.2f}s")
+
+            # 2. Analyse documents, stopping as soon as one of them forces a DENY
+            document_analysis = await cache.run(
+                "analyse_documents",
+                analysis_fingerprint(processed_docs),
+                lambda: _analyse_until_untrustworthy(claim_id, processed_docs),
+                list[DocReport],
+                load=load_doc_reports,
+            )
+            full_document_analysis = document_analysis
+
+            for doc in document_analysis:
+                if not doc.trustworthy:
+                    decision = "DENY"
+                    explanation = f"Supporting document that requires official issuer is in invalid format (free text): {doc.name}"
+                    if on_progress:
+                        on_progress(decided_event("analyse_documents", decision, explanation))
+                    break
 
             if not decision:
-                # 4. Call policy expert
-                decision_result = await make_decision(
-                    claim_description=claim_description,
-                    analysed_docs=full_document_analysis,
-                    policy_context=policy_section,
-                    metadata=metadata,
+                # 3. Call fraud detection
+                full_document_analysis = await cache.run(
+                    "fraud_detection",
+                    fraud_fingerprint(document_analysis),
+                    lambda: detect_fraud(document_analysis),
+                    list[DocReport],
+                    load=load_doc_reports,
                 )
 
-                decision = decision_result.decision
-                explanation = decision_result.short_explanation
+                # for doc in full_document_analysis:
+                #     if doc.missing_signature:
+                #         decision = "DENY"
+                #         explanation = f"Missing signature in supporting document that requires official issuer verification: {doc.name}"
+
+                if not decision:
+                    # 4. Call policy expert
+                    decision_result = await cache.run(
+                        "decision",
+                        decision_fingerprint(claim_description, full_document_analysis, policy_section, metadata),
+                        lambda: make_decision(
+                            claim_description=claim_description,
+                            analysed_docs=full_document_analysis,
+                            policy_context=policy_section,
+                            metadata=metadata,
+                        ),
+                        DecisionResults,
+                    )
+
+                    decision = decision_result.decision
+                    explanation = decision_result.short_explanation
 
     # Convert DocReport objects to dicts for JSON serialization
     processed_docs_dict = [doc.model_dump() for doc in full_document_analysis]
 
     decision = ClaimDecision(
-        decision=decision, 
+        decision=decision,
         explanation=explanation,
         policy_context=policy_section,
-        processed_documents=processed_docs_dict
+        processed_documents=processed_docs_dict,
+        time_saved_seconds=time_saved,
+        stage_status=cache.stage_status,
+        trace=trace.model_dump(),
+        llm_usage=summarize_llm_usage(llm_calls),
     )
 
     return decision
-
-    
-
@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from pydantic import BaseModel, Field, field_validator
+
+from claim_processing_pipeline import prompts
+from claim_processing_pipeline.constants import LLM_MODEL, VLM_MODEL
+
+
+class PipelineConfig(BaseModel):
+    """
+    Models, reasoning mode and prompts the pipeline runs with. The defaults are the production
+    configuration; other configurations are compared against it by evaluation/run_ablation.py.
+    """
+    llm_model: str = LLM_MODEL
+    vlm_model: str = VLM_MODEL
+    # Passed to Ollama on every LLM call (not on the vision model, which does not support it)
+    think: bool = False
+    # Prompt templates replacing the ones in prompts.py, by constant name (e.g. POLICY_EXPERT_PROMPT)
+    prompts: dict[str, str] = Field(default_factory=dict)
+
+    @field_validator("prompts")
+    @classmethod
+    def _known_prompts(cls, value: dict[str, str]) -> dict[str, str]:
+        unknown = [name for name in value if not name.endswith("_PROMPT") or not hasattr(prompts, name)]
+        if unknown:
+            raise ValueError(f"Unknown prompts: {', '.join(unknown)}")
+        return value
+
+    def prompt(self, name: str) -> str:
+        """Returns the prompt template of the given name, as overridden by this configuration."""
+        return self.prompts.get(name, getattr(prompts, name))
+
+
+_pipeline_config: ContextVar[PipelineConfig] = ContextVar("pipeline_config", default=PipelineConfig())
+
+
+def current_config() -> PipelineConfig:
+    """Returns the configuration of the pipeline run in progress (the production one by default)."""
+    return _pipeline_config.get()
+
+
+@contextmanager
+def use_config(config: PipelineConfig) -> Iterator[PipelineConfig]:
+    """Runs the pipeline calls made inside the block (including in tasks started from it) with the given configuration."""
+    token = _pipeline_config.set(config)
+    try:
+        yield config
+    finally:
+        _pipeline_config.reset(token)
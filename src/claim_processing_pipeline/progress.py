@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import Any, Callable, Literal
+
+from pydantic import BaseModel
+
+from claim_processing_pipeline.tracing import Span, SpanListener, current_stage
+
+# "decided" reports an outcome known before the pipeline completes, such as an early DENY
+ProgressStatus = Literal["running", "computed", "reused", "failed", "cancelled", "decided"]
+
+
+class ProgressEvent(BaseModel):
+    stage: str
+    status: ProgressStatus
+    timestamp: str
+    # Set for the progress of a single document within the stage
+    document: str | None = None
+    details: dict[str, Any] | None = None
+
+
+def _span_status(s: Span) -> ProgressStatus:
+    if "error" in s.attributes:
+        return "cancelled" if s.attributes["error"].startswith("CancelledError") else "failed"
+    return s.attributes.get("checkpoint", "computed")
+
+
+def decided_event(stage: str, decision: str, explanation: str | None) -> ProgressEvent:
+    """Builds the event reporting that a stage decided the claim before the pipeline completed."""
+    return ProgressEvent(
+        stage=stage,
+        status="decided",
+        timestamp=datetime.now().isoformat(),
+        details={"decision": decision, "explanation": explanation},
+    )
+
+
+def progress_listener(on_progress: Callable[[ProgressEvent], None]) -> SpanListener:
+    """
+    Builds a span listener that reports stage and per-document transitions of a pipeline run as progress events.
+
+    Args:
+        on_progress: Callback receiving one event each time a stage or a document within a stage starts or finishes
+    """
+    def listener(phase: Literal["start", "end"], s: Span):
+        if s.kind == "stage":
+            on_progress(ProgressEvent(
+                stage=s.name,
+                status="running" if phase == "start" else _span_status(s),
+                timestamp=datetime.now().isoformat(),
+            ))
+        elif s.kind == "document" and current_stage():
+            details = {k: v for k, v in s.attributes.items() if k != "error"}
+            on_progress(ProgressEvent(
+                stage=current_stage(),
+                status="running" if phase == "start" else _span_status(s),
+                timestamp=datetime.now().isoformat(),
+                document=s.name,
+                details=details or None,
+            ))
+
+    return listener
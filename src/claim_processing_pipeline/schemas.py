@@ -64,7 +64,7 @@ DocumentType = Union[None, MedicalReport, PoliceReport, PersonalEmergencyReport,
 # Structured LLM output schemas
 # ---------------------------------
 class RelevantPolicySectionChoice(BaseModel):
-    identifier: str
+    identifier: Literal["A", "B", "C", "D"]
     short_explanation: str
 
 class RelevantSectionChoice(BaseModel):
@@ -87,6 +87,7 @@ class ProcessedDoc(BaseModel):
     file_ext: str
 
 class DocReport(ProcessedDoc):
+    doc_type: int | None = None
     requires_official_issuer: bool | None = None
     trustworthy: bool | None = None
     fraud_detection: str | None = None
@@ -0,0 +1,16 @@
+import math
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile: the smallest value with at least `fraction` of the values at or below it.
+
+    Args:
+        sorted_values: Values in ascending order (at least one)
+        fraction: Percentile as a fraction, e.g. 0.95 for p95
+
+    Returns:
+        The percentile value
+    """
+    index = math.ceil(fraction * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, index))]
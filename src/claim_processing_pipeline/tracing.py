@@ -0,0 +1,172 @@
+import time
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Literal
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+SpanKind = Literal["claim", "stage", "document", "model", "queue"]
+
+
+class Span(BaseModel):
+    name: str
+    kind: SpanKind
+    start_time: float
+    end_time: float | None = None
+    # Task or thread the span ran on; spans on the same lane are strictly nested
+    lane: str
+    attributes: dict[str, Any] = Field(default_factory=dict)
+    children: list["Span"] = Field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        end_time = self.end_time if self.end_time is not None else time.time()
+        return end_time - self.start_time
+
+    def iter_spans(self) -> Iterator["Span"]:
+        """Yields this span and all its descendants, depth first."""
+        yield self
+        for child in self.children:
+            yield from child.iter_spans()
+
+
+# Called with ("start" | "end", span) whenever a span of the trace opens or closes
+SpanListener = Callable[[Literal["start", "end"], Span], None]
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_current_stage: ContextVar[str | None] = ContextVar("current_stage", default=None)
+_span_listener: ContextVar[SpanListener | None] = ContextVar("span_listener", default=None)
+
+
+def _current_lane() -> str:
+    """Identifies the asyncio task (or thread, outside the event loop) the caller runs on."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return f"task-{id(task)}"
+    return f"thread-{threading.get_ident()}"
+
+
+def current_span() -> Span | None:
+    """Returns the innermost open span, or None if no trace is active."""
+    return _current_span.get()
+
+
+def current_stage() -> str | None:
+    """Returns the name of the innermost open stage span, or None outside of a stage."""
+    return _current_stage.get()
+
+
+def combine_listeners(*listeners: SpanListener | None) -> SpanListener | None:
+    """Returns a listener notifying each of the given ones in turn, or None if none is given."""
+    active = [listener for listener in listeners if listener is not None]
+    if len(active) <= 1:
+        return active[0] if active else None
+
+    def listener(phase: Literal["start", "end"], s: Span):
+        for each in active:
+            each(phase, s)
+
+    return listener
+
+
+def _notify(phase: Literal["start", "end"], s: Span):
+    listener = _span_listener.get()
+    if listener is None:
+        return
+    try:
+        listener(phase, s)
+    except Exception as e:
+        logger.error(f"Span listener failed on {phase} of '{s.name}': {e}")
+
+
+@contextmanager
+def start_trace(name: str, listener: SpanListener | None = None, **attributes) -> Iterator[Span]:
+    """
+    Opens the root span of a new trace. Spans opened inside the block, including in tasks
+    and worker threads started from it, are attached to this trace.
+
+    Args:
+        name: Name of the root span
+        listener: Optional callback notified when spans of this trace open and close
+        **attributes: Extra attributes stored on the root span
+    """
+    root = Span(name=name, kind="claim", start_time=time.time(), lane=_current_lane(), attributes=attributes)
+    token = _current_span.set(root)
+    listener_token = _span_listener.set(listener)
+    try:
+        yield root
+    finally:
+        root.end_time = time.time()
+        _current_span.reset(token)
+        _span_listener.reset(listener_token)
+
+
+@contextmanager
+def span(name: str, kind: SpanKind, **attributes) -> Iterator[Span | None]:
+    """
+    Opens a child span of the current span. Does nothing (yields None) if no trace is active.
+
+    Args:
+        name: Span name (stage name, document name, model call...)
+        kind: Span category
+        **attributes: Extra attributes stored on the span
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = Span(name=name, kind=kind, start_time=time.time(), lane=_current_lane(), attributes=attributes)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    stage_token = _current_stage.set(name) if kind == "stage" else None
+    _notify("start", child)
+    try:
+        yield child
+    except BaseException as e:
+        child.attributes["error"] = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        raise
+    finally:
+        child.end_time = time.time()
+        _current_span.reset(token)
+        if stage_token is not None:
+            _current_stage.reset(stage_token)
+        _notify("end", child)
+
+
+def to_chrome_trace(root: Span) -> dict:
+    """
+    Exports a span tree in the Chrome Trace Event format, which can be opened as a
+    flamegraph in Perfetto (ui.perfetto.dev), speedscope or chrome://tracing.
+
+    Args:
+        root: Root span of the trace
+
+    Returns:
+        JSON-serializable trace document
+    """
+    lanes: dict[str, int] = {}
+    events = []
+    for s in root.iter_spans():
+        tid = lanes.setdefault(s.lane, len(lanes) + 1)
+        events.append({
+            "name": s.name,
+            "cat": s.kind,
+            "ph": "X",
+            "ts": round((s.start_time - root.start_time) * 1e6),
+            "dur": round(s.duration * 1e6),
+            "pid": 1,
+            "tid": tid,
+            "args": s.attributes,
+        })
+
+    events.append({"name": "process_name", "ph": "M", "pid": 1, "args": {"name": root.name}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
@@ -1,13 +1,29 @@
 import json
+import asyncio
+import hashlib
 import logging
-from typing import get_type_hints, Literal, Type, Union, TypeVar
+import threading
+from typing import get_type_hints, Any, Literal, Type, Union, TypeVar
 from pydantic import BaseModel
-from ollama import chat
+from ollama import AsyncClient, ChatResponse
+
+from claim_processing_pipeline.concurrency import llm_slot
+from claim_processing_pipeline.config import Settings
+from claim_processing_pipeline.constants import LLM_RECORDINGS_FILE
+from claim_processing_pipeline.pipeline_config import current_config
+from claim_processing_pipeline.tracing import current_span, span
+from claim_processing_pipeline.llm_usage import record_llm_usage
 
 logger = logging.getLogger(__name__)
 
+settings = Settings.get_settings()
+
 T = TypeVar("T", bound=BaseModel)
 
+# Recorded responses by request key and by kind of call, loaded on the first replayed call
+_recordings: tuple[dict[str, dict], dict[str, list[dict]]] | None = None
+_recordings_lock = threading.Lock()
+
 
 def model_to_class_string(model_cls: type[BaseModel]) -> str:
     """
@@ -28,21 +44,165 @@ def model_to_class_string(model_cls: type[BaseModel]) -> str:
     return "\n".join(lines)
 
 
+def _request_keys(request: dict[str, Any]) -> tuple[str, str]:
+    """
+    Returns the key of a chat request, and the key of its kind of call: the model, the output format
+    and the span the call is made in. Images are keyed by content, so copies of a file match.
+    """
+    messages = []
+    for message in request.get("messages", []):
+        message = dict(message)
+        if "images" in message:
+            digests = []
+            for image in message["images"]:
+                try:
+                    with open(image, "rb") as f:
+                        digests.append(hashlib.sha256(f.read()).hexdigest())
+                except OSError:
+                    digests.append(str(image))
+            message["images"] = digests
+        messages.append(message)
+
+    call_span = current_span()
+    call_kind = [request.get("model"), request.get("format"), call_span.name if call_span else None]
+    kind_key = hashlib.sha256(json.dumps(call_kind, sort_keys=True).encode()).hexdigest()
+    request_key = hashlib.sha256(
+        json.dumps([kind_key, messages, request.get("options"), request.get("think")], sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return request_key, kind_key
+
+
+def _load_recordings() -> tuple[dict[str, dict], dict[str, list[dict]]]:
+    global _recordings
+    with _recordings_lock:
+        if _recordings is None:
+            by_request, by_kind = {}, {}
+            if LLM_RECORDINGS_FILE.exists():
+                with open(LLM_RECORDINGS_FILE, "r") as f:
+                    for line in f:
+                        if line.strip():
+                            recording = json.loads(line)
+                            by_request[recording["request_key"]] = recording["response"]
+                            by_kind.setdefault(recording["kind_key"], []).append(recording["response"])
+            logger.info(f"Loaded {len(by_request)} recorded LLM responses from {LLM_RECORDINGS_FILE}")
+            _recordings = (by_request, by_kind)
+        return _recordings
+
+
+def _append_recording(recording: dict):
+    LLM_RECORDINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with _recordings_lock, open(LLM_RECORDINGS_FILE, "a") as f:
+        f.write(json.dumps(recording) + "\n")
+
+
+def _synthetic_value(schema: dict[str, Any], defs: dict[str, Any]) -> Any:
+    """Returns the simplest value valid for a JSON schema (defaults, first enum value, empty strings and lists)."""
+    if "$ref" in schema:
+        return _synthetic_value(defs[schema["$ref"].split("/")[-1]], defs)
+    if "default" in schema:
+        return schema["default"]
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    for combinator in ("anyOf", "oneOf", "allOf"):
+        if combinator in schema:
+            return _synthetic_value(schema[combinator][0], defs)
+
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        schema_type = schema_type[0]
+    if schema_type == "object":
+        return {name: _synthetic_value(field, defs) for name, field in schema.get("properties", {}).items()}
+    if schema_type == "array":
+        return []
+    if schema_type in ("integer", "number"):
+        return schema.get("minimum", 0)
+    if schema_type == "boolean":
+        return False
+    if schema_type == "null":
+        return None
+    return ""
+
+
+def _synthetic_response(request: dict[str, Any]) -> dict:
+    """
+    Stand-in response for a kind of call that was never recorded: a schema-valid placeholder for
+    structured calls, and a placeholder text otherwise.
+    """
+    schema = request.get("format")
+    if isinstance(schema, dict):
+        content = json.dumps(_synthetic_value(schema, schema.get("$defs", {})))
+    else:
+        content = "Replayed placeholder response"
+    return {"model": request.get("model") or "", "message": {"role": "assistant", "content": content}, "done": True}
+
+
+async def ollama_chat(**request: Any) -> ChatResponse:
+    """
+    Sends a chat request to Ollama, or replays a recorded response, depending on LLM_MODE:
+    - live: calls Ollama
+    - record: calls Ollama and appends the request key and response to the recordings file
+    - replay: answers from the recordings without Ollama, after the recorded duration
+      (scaled by LLM_REPLAY_LATENCY_SCALE). A request that was not recorded gets a recorded
+      response of the same kind of call, so varied claims (e.g. synthetic ones) can be replayed too,
+      or a placeholder answered immediately if that kind of call was never recorded.
+
+    Args:
+        **request: Arguments of `AsyncClient.chat`
+
+    Returns:
+        The chat response
+    """
+    if settings.LLM_MODE == "live":
+        return await AsyncClient().chat(**request)
+
+    # Reads and hashes the images of the request; the thread sees the current span (context is copied)
+    request_key, kind_key = await asyncio.to_thread(_request_keys, request)
+
+    if settings.LLM_MODE == "record":
+        response = await AsyncClient().chat(**request)
+        recording = {"request_key": request_key, "kind_key": kind_key, "response": response.model_dump(mode="json")}
+        await asyncio.to_thread(_append_recording, recording)
+        return response
+
+    by_request, by_kind = await asyncio.to_thread(_load_recordings)
+    recorded = by_request.get(request_key)
+    if recorded is None:
+        candidates = by_kind.get(kind_key)
+        if candidates:
+            # Same request, same stand-in response
+            recorded = candidates[int(request_key, 16) % len(candidates)]
+        else:
+            logger.warning(f"No recorded LLM response for this kind of call (model: {request.get('model')}), replaying a placeholder")
+            recorded = _synthetic_response(request)
+
+    response = ChatResponse.model_validate(recorded)
+    await asyncio.sleep((response.total_duration or 0) / 1e9 * settings.LLM_REPLAY_LATENCY_SCALE)
+    return response
+
+
 async def call_ollama_chat(
     prompt: str,
-    model: str = "qwen3:8b",
-    think=False,
+    model: str | None = None,
+    think: bool | None = None,
+    span_name: str = "chat",
 ) -> str:
     """
     Helper function to call local Ollama model using OpenAI-compatible API.
     
     Args:
         prompt: The prompt to send the model
-        model: Name of the Ollama model to use
+        model: Name of the Ollama model to use (defaults to the LLM of the current pipeline configuration)
+        think: Whether the model reasons before answering (defaults to the current pipeline configuration)
+        span_name: Name of the tracing span recorded for the call
     
     Returns:
         The model's response content as a string
     """
+    config = current_config()
+    model = model or config.llm_model
+    think = config.think if think is None else think
     try:
         messages=[
             {"role": "system", "content": "You are a helpful insurance claim assistant."},
@@ -52,7 +212,10 @@ async def call_ollama_chat(
         logger.info(f"Calling Ollama chat - model: {model}, think: {think}")
         logger.info(f"Prompt: {prompt[200:]}..." if len(prompt) > 200 else f"Prompt: {prompt}")
 
-        response = chat(model, messages=messages, think=think)
+        with span(span_name, kind="model", model=model, think=think):
+            async with llm_slot():
+                response = await ollama_chat(model=model, messages=messages, think=think)
+            record_llm_usage(response, model)
         content = response.message.content
 
         if not content:
@@ -73,8 +236,9 @@ async def call_ollama_chat(
 async def call_ollama_structured(
     prompt: str,
     response_model: Type[T],
-    model: str = "qwen3:8b",
-    think=False,
+    model: str | None = None,
+    think: bool | None = None,
+    span_name: str | None = None,
 ) -> T:
     """
     Helper function to call local Ollama model with structured output using Pydantic models.
@@ -82,11 +246,16 @@ async def call_ollama_structured(
     Args:
         prompt: The prompt to send the model
         response_model: Pydantic model class defining the expected output structure
-        model: Name of the Ollama model to use
+        model: Name of the Ollama model to use (defaults to the LLM of the current pipeline configuration)
+        think: Whether the model reasons before answering (defaults to the current pipeline configuration)
+        span_name: Name of the tracing span recorded for the call (defaults to the response model name)
     
     Returns:
         Instance of the response_model with parsed data
     """
+    config = current_config()
+    model = model or config.llm_model
+    think = config.think if think is None else think
     messages=[
         {"role": "system", "content": "You are a helpful travel insurance claim assistant. Always respond with valid JSON."},
         {"role": "user", "content": prompt}
@@ -96,13 +265,16 @@ async def call_ollama_structured(
     logger.info(f"Prompt: {prompt}..." if len(prompt) > 200 else f"Prompt: {prompt}")
 
     try:
-        response = chat(
-            model=model,
-            messages=messages,
-            format=response_model.model_json_schema(),
-            options={"temperature": 0},
-            think=think,
-        )
+        with span(span_name or response_model.__name__, kind="model", model=model, think=think):
+            async with llm_slot():
+                response = await ollama_chat(
+                    model=model,
+                    messages=messages,
+                    format=response_model.model_json_schema(),
+                    options={"temperature": 0},
+                    think=think,
+                )
+            record_llm_usage(response, model)
         
         content = response.message.content
         if not content:
@@ -0,0 +1,259 @@
+import time
+import uuid
+import sqlite3
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class Lease(BaseModel):
+    job_id: int
+    claim_id: str
+    attempts: int
+    lease_token: str
+    lease_expires_at: float
+
+
+class SQLiteWorkQueue:
+    """
+    Durable claim work queue stored in a SQLite database.
+
+    Workers lease jobs for a visibility timeout and must heartbeat to keep them. A job whose
+    lease expires (e.g. the worker crashed) becomes visible again and is picked up by another
+    worker. Failed jobs are retried with exponential backoff until max_attempts is reached.
+    Finished jobs stay in the table until they are pruned (see `prune`).
+
+    Any number of worker processes sharing the database file can consume the queue. SQLite
+    file locking is only reliable on a local filesystem, so workers on several hosts need a
+    shared database server implementing the same operations.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        visibility_timeout: float = 600.0,
+        max_attempts: int = 3,
+        retry_backoff: float = 30.0,
+    ):
+        self.db_path = Path(db_path)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    claim_id TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    available_at REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_token TEXT,
+                    lease_expires_at REAL,
+                    last_error TEXT,
+                    client_id TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "client_id" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN client_id TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, available_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (claim_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_client ON jobs (client_id, state)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (state, updated_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        try:
+            conn.execute("PRAGMA busy_timeout=30000")
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction taking the database lock up front, so read-then-update is atomic."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, claim_id: str, client_id: str | None = None) -> int:
+        """Add a claim to the queue and return its job id."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (claim_id, state, available_at, client_id, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?, ?)",
+                (claim_id, now, client_id, now, now),
+            )
+            return cursor.lastrowid
+
+    def enqueue_many(self, claim_ids: list[str], client_id: str | None = None):
+        """Add several claims to the queue in one transaction."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO jobs (claim_id, state, available_at, client_id, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?, ?)",
+                [(claim_id, now, client_id, now, now) for claim_id in claim_ids],
+            )
+
+    def lease(self, owner: str) -> Lease | None:
+        """
+        Lease the oldest available job: a queued job that is due, or a leased job whose lease expired.
+
+        Args:
+            owner: Identifier of the leasing worker, stored for debugging
+
+        Returns:
+            The lease, or None if no job is available
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                """
+                SELECT id, claim_id, attempts FROM jobs
+                WHERE (state = 'queued' AND available_at <= ?) OR (state = 'leased' AND lease_expires_at <= ?)
+                ORDER BY available_at, id
+                LIMIT 1
+                """,
+                (now, now),
+            ).fetchone()
+            if row is None:
+                return None
+
+            job_id, claim_id, attempts = row
+            lease = Lease(
+                job_id=job_id,
+                claim_id=claim_id,
+                attempts=attempts + 1,
+                lease_token=uuid.uuid4().hex,
+                lease_expires_at=now + self.visibility_timeout,
+            )
+            conn.execute(
+                """
+                UPDATE jobs SET state = 'leased', attempts = ?, lease_owner = ?, lease_token = ?,
+                    lease_expires_at = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                (lease.attempts, owner, lease.lease_token, lease.lease_expires_at, now, job_id),
+            )
+        return lease
+
+    def heartbeat(self, lease: Lease) -> bool:
+        """Extend a lease by the visibility timeout. Returns False if the lease was lost."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND lease_token = ? AND state = 'leased'",
+                (now + self.visibility_timeout, now, lease.job_id, lease.lease_token),
+            )
+        if cursor.rowcount == 1:
+            lease.lease_expires_at = now + self.visibility_timeout
+            return True
+        return False
+
+    def complete(self, lease: Lease) -> bool:
+        """Mark a leased job as done. Returns False if the lease was lost."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = 'done', lease_token = NULL, updated_at = ? WHERE id = ? AND lease_token = ?",
+                (time.time(), lease.job_id, lease.lease_token),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        """
+        Record a failed attempt. The job is retried after a backoff unless it used all its attempts.
+
+        Returns:
+            True if the job will be retried, False if it is now dead
+        """
+        now = time.time()
+        retrying = lease.attempts < self.max_attempts
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                UPDATE jobs SET state = ?, available_at = ?, lease_token = NULL, last_error = ?, updated_at = ?
+                WHERE id = ? AND lease_token = ?
+                """,
+                (
+                    "queued" if retrying else "dead",
+                    now + self.retry_backoff * 2 ** (lease.attempts - 1),
+                    error,
+                    now,
+                    lease.job_id,
+                    lease.lease_token,
+                ),
+            )
+        return retrying
+
+    def release(self, lease: Lease):
+        """Give a leased job back without counting the attempt (e.g. on worker shutdown)."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                UPDATE jobs SET state = 'queued', attempts = attempts - 1, available_at = ?, lease_token = NULL, updated_at = ?
+                WHERE id = ? AND lease_token = ?
+                """,
+                (now, now, lease.job_id, lease.lease_token),
+            )
+
+    def prune(self, older_than: float) -> int:
+        """
+        Delete the jobs that finished (done or dead) more than `older_than` seconds ago.
+
+        Returns:
+            The number of jobs deleted
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE state IN ('done', 'dead') AND updated_at < ?",
+                (time.time() - older_than,),
+            )
+        return cursor.rowcount
+
+    def pending(self, client_id: str | None = None) -> int:
+        """Number of jobs queued or being processed, optionally only those submitted by a client."""
+        query = "SELECT COUNT(*) FROM jobs WHERE state IN ('queued', 'leased')"
+        params = ()
+        if client_id is not None:
+            query += " AND client_id = ?"
+            params = (client_id,)
+        with self._connect() as conn:
+            return conn.execute(query, params).fetchone()[0]
+
+    def throughput(self, window: float = 600.0) -> float:
+        """Jobs completed per second over the last `window` seconds."""
+        with self._connect() as conn:
+            done = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state = 'done' AND updated_at >= ?", (time.time() - window,)
+            ).fetchone()[0]
+        return done / window
+
+    def oldest_queued_age(self) -> float | None:
+        """Seconds the oldest queued job has been waiting, or None if nothing is queued."""
+        with self._connect() as conn:
+            oldest = conn.execute("SELECT MIN(created_at) FROM jobs WHERE state = 'queued'").fetchone()[0]
+        return time.time() - oldest if oldest is not None else None
+
+    def depth(self) -> dict[str, int]:
+        """Number of jobs per state (queued, leased, done, dead)."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
@@ -0,0 +1,52 @@
+"""
+Standalone claim worker process.
+
+Runs the pipeline for claims submitted through the API, pulling them from the shared work queue.
+Start as many worker processes as needed next to an API started with CLAIM_WORKERS=0:
+
+    python -m claim_processing_pipeline.worker --concurrency 2
+"""
+import asyncio
+import argparse
+import logging
+import signal
+
+from claim_processing_pipeline.api.jobs import ClaimWorkerPool
+from claim_processing_pipeline.config import Settings, setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+async def run_worker(concurrency: int):
+    """Process claims from the work queue until the process receives SIGINT or SIGTERM."""
+    pool = ClaimWorkerPool(concurrency)
+    stop = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await pool.start()
+    await stop.wait()
+    logger.info("Shutting down, releasing in-flight claims back to the queue")
+    await pool.stop()
+
+
+def main():
+    settings = Settings.get_settings()
+    setup_logging(settings.LOG_LEVEL)
+
+    parser = argparse.ArgumentParser(description="Run claim processing workers")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=max(settings.CLAIM_WORKERS, 1),
+        help="Number of claims processed at the same time by this process",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run_worker(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()